@@ -0,0 +1,160 @@
+"""Benchmark parsing of a large synthetic execution plan.
+
+Reports the time to parse the plan and the memory held by the parsed
+models, eagerly (``execute_plan_from_json``) and lazily from a decoded dict
+(``compile_plan_data``, fully materialised). The lazy parse is also run with
+copies of the models that keep a ``__dict__`` instead of ``__slots__``, to
+show what the slots save.
+
+Usage:
+    python -m benchmarks.plan_parsing [--instances N] [--params N] [--flows N]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+from unittest.mock import patch
+
+from keycase_agent.models import execute_plan
+from keycase_agent.models.execute_plan import (
+    compile_execution_plan,
+    compile_plan_data,
+    execute_plan_from_json,
+)
+
+SLOTTED_MODELS = ("Param", "KeywordInstance", "FlowStep", "FlowConnection", "Flow")
+
+
+def build_plan(instances: int, params: int, flows: int) -> Dict[str, Any]:
+    """Build a plan with linearly connected steps spread over flows."""
+    keyword_instances = [
+        {
+            "id": i,
+            "keywordName": f"keyword_{i % 50}",
+            "keywordId": i % 50,
+            "name": f"Instance {i}",
+            "params": [
+                {
+                    "id": i * params + p,
+                    "name": f"param_{p}",
+                    "direction": "output" if p == 0 else "input",
+                    "type": "string",
+                    "isMandatory": p % 2 == 0,
+                    "value": f"value-{i}-{p}",
+                }
+                for p in range(params)
+            ],
+        }
+        for i in range(instances)
+    ]
+    per_flow = max(1, instances // flows)
+    plan_flows = []
+    for f in range(flows):
+        ids = range(f * per_flow, min(instances, (f + 1) * per_flow))
+        plan_flows.append(
+            {
+                "id": f,
+                "name": f"Flow {f}",
+                "steps": [
+                    {"id": i, "instanceId": i, "sequenceOrder": n}
+                    for n, i in enumerate(ids)
+                ],
+                "connections": [
+                    {
+                        "id": i,
+                        "fromStepId": i - 1,
+                        "toStepId": i,
+                        "fromParamId": (i - 1) * params,
+                        "toParamId": i * params + 1,
+                    }
+                    for i in ids
+                    if i > f * per_flow and params > 1
+                ],
+            }
+        )
+    return {"keywordInstances": keyword_instances, "flows": plan_flows}
+
+
+def measure(label: str, parse: Callable[[], Any]) -> None:
+    """Print the time taken by ``parse`` and the memory its result holds.
+
+    Timing and memory are measured in separate calls because tracing
+    allocations slows parsing down considerably.
+    """
+    gc.collect()
+    started = time.perf_counter()
+    parse()
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    result = parse()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<28} {elapsed * 1000:9.1f} ms  "
+        f"held {held / 2**20:8.1f} MiB  peak {peak / 2**20:8.1f} MiB"
+    )
+    del result
+
+
+def parse_lazy_fully(plan_data: Dict[str, Any]) -> Any:
+    plan = compile_plan_data(plan_data)
+    plan.keyword_instances
+    list(plan.flows)
+    return plan
+
+
+def without_slots(cls: type) -> type:
+    """Copy a slotted class as one storing its attributes in ``__dict__``."""
+    slots = set(cls.__slots__)
+    namespace = {
+        name: value
+        for name, value in cls.__dict__.items()
+        if name not in slots and name not in ("__slots__", "__dict__", "__weakref__")
+    }
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+@contextmanager
+def models_without_slots() -> Iterator[None]:
+    """Make the plan parser build models without ``__slots__``."""
+    with patch.multiple(
+        execute_plan,
+        **{name: without_slots(getattr(execute_plan, name)) for name in SLOTTED_MODELS},
+    ):
+        yield
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instances", type=int, default=40_000)
+    parser.add_argument("--params", type=int, default=5)
+    parser.add_argument("--flows", type=int, default=200)
+    args = parser.parse_args()
+
+    plan_data = build_plan(args.instances, args.params, args.flows)
+    plan_json = json.dumps(plan_data)
+    print(
+        f"Plan: {args.instances} instances, {args.instances * args.params} params, "
+        f"{args.flows} flows, {len(plan_json) / 2**20:.1f} MiB of JSON"
+    )
+
+    measure(
+        "eager from JSON string",
+        lambda: compile_execution_plan(*execute_plan_from_json(plan_json)),
+    )
+    measure(
+        "lazy from dict (first flow)", lambda: compile_plan_data(plan_data).flows[0]
+    )
+    measure("lazy from dict (all)", lambda: parse_lazy_fully(plan_data))
+    with models_without_slots():
+        measure("lazy, no __slots__ (all)", lambda: parse_lazy_fully(plan_data))
+
+
+if __name__ == "__main__":
+    main()
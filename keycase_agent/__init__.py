@@ -41,7 +41,10 @@ from .exceptions import (
     KeycaseError,
     KeywordDefinitionError,
     ParameterValidationError,
+    StepCancelledError,
+    StepTimeoutError,
 )
+from .execution_context import get_cancellation_token
 from .execution_manager import ExecutionManager
 from .loader import load_keywords
 from .models.execution_result import ExecutionResultData, FlowResult, StatusEnum
@@ -75,11 +78,15 @@ __all__ = [
     # Schema utilities
     "get_keyword_schema",
     "get_all_keyword_schemas",
+    # Execution context
+    "get_cancellation_token",
     # Exceptions
     "KeycaseError",
     "KeywordDefinitionError",
     "ParameterValidationError",
     "ExecutionError",
+    "StepTimeoutError",
+    "StepCancelledError",
     "AuthenticationError",
     # Models
     "ExecutionResultData",
@@ -1,32 +1,71 @@
 """Main Keycase Agent orchestrator module."""
 
-import json
 import logging
 import os
 import signal
-import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from .auth import AuthService
 from .event_handler import EventHandler
+from .exceptions import ResultRejectedError
 from .execution_manager import ExecutionManager
+from .inbound_dispatcher import DEFAULT_INBOUND_QUEUE_SIZE, InboundDispatcher
+from .models.execute_plan import CompiledPlan, compile_plan_data
 from .models.websocket_event_types import WebSocketEventType
+from .plan_cache import DEFAULT_PLAN_CACHE_SIZE, PlanCache
+from .result_spool import (
+    DEFAULT_SPOOL_FILE,
+    FSYNC_ALWAYS,
+    ResultSpool,
+    SpoolReplayer,
+)
+from .result_stream import (
+    DEFAULT_STREAM_CHUNK_SIZE,
+    RESULT_UPLOAD_SINGLE,
+    RESULT_UPLOAD_STREAM,
+    ResultStreamer,
+)
+from .result_uploader import (
+    UPLOAD_CLOSE_RUN,
+    UPLOAD_FLOW_RESULTS,
+    UPLOAD_RESULT,
+    ResultUploader,
+    UploadJob,
+)
 from .state_tracker import AgentStateTracker
-from .utils.auth_helper import auth_request, auth_request_with_details
-from .utils.event_sender import configure_batching, send_event, status_update
-from .websocket_client import WebSocketClient
+from .utils import json_codec
+from .utils.auth_helper import auth_request_with_details
+from .utils.event_sender import (
+    DEFAULT_MAX_QUEUE_EVENTS,
+    OVERFLOW_DROP_OLDEST,
+    EventSender,
+)
+from .utils.http_client import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    HttpClient,
+)
+from .utils.log_values import LogValue
+from .websocket_client import COMPRESSION_OFF, WebSocketClient
 
 logger = logging.getLogger(__name__)
 
 # Constants
-MAX_RESULT_RETRIES = 3
-INITIAL_RETRY_INTERVAL_SECONDS = 2
-MAX_FAILED_RESULTS_ENTRIES = 100
 FAILED_RESULTS_DIR = "failed_results"
 
 # Error codes that indicate the result was already processed (treat as success)
 ALREADY_COMPLETED_CODES = {5002}  # "Execution run is already completed"
+# Client errors worth retrying; any other 4xx rejects the result for good
+RETRYABLE_CLIENT_ERRORS = {408, 429}
+# Rejected credentials; the token is refreshed and the upload retried
+AUTH_ERRORS = {401, 403}
+# Endpoint of each upload kind, below /projects/{project}/runs/{run}/results
+RESULT_UPLOAD_PATHS = {
+    UPLOAD_RESULT: "",
+    UPLOAD_FLOW_RESULTS: "/flows",
+    UPLOAD_CLOSE_RUN: "/close",
+}
 
 
 class KeycaseAgent:
@@ -48,6 +87,23 @@ class KeycaseAgent:
             - AGENT_VERSION: Agent version (optional)
             - AGENT_CAPABILITIES: List of capabilities (optional)
             - AGENT_TAGS: List of tags (optional)
+            - MAX_PARALLEL_STEPS: Concurrent independent steps per flow (optional)
+            - MAX_PARALLEL_FLOWS: Concurrent flows per run (optional)
+            - MAX_CONCURRENT_RUNS: Runs the agent accepts at once (optional)
+            - EXECUTION_LOG_VERBOSITY: off, summary or full (optional)
+            - EVENT_QUEUE_MAX_EVENTS: Bound of the outgoing event queue (optional)
+            - EVENT_QUEUE_OVERFLOW: Event queue overflow policy (optional)
+            - WS_COMPRESSION: off or deflate (optional)
+            - HTTP_POOL_SIZE: Keep-alive connections for REST calls (optional)
+            - HTTP_TIMEOUT: REST response timeout in seconds (optional)
+            - RESULT_SPOOL_FSYNC: always, normal or off (optional)
+            - PLAN_CACHE_SIZE: Execution plans cached in memory (optional)
+            - PLAN_CACHE_DIR: Directory persisting cached plans (optional)
+            - INBOUND_QUEUE_MAX_MESSAGES: Incoming messages queued per lane
+              (optional)
+            - RESULT_UPLOAD_MODE: single or stream (optional)
+            - RESULT_STREAM_CHUNK_SIZE: Flow results per streamed chunk
+              (optional)
     """
 
     def __init__(self, config: Dict[str, Any]) -> None:
@@ -57,13 +113,29 @@ class KeycaseAgent:
         self.agent_version = config.get("AGENT_VERSION", "1.0.0")
         self.capabilities: List[str] = config.get("AGENT_CAPABILITIES", [])
         self.tags: List[str] = config.get("AGENT_TAGS", [])
+        self.ws_compression: str = config.get("WS_COMPRESSION", COMPRESSION_OFF)
 
         # These will be set after authentication
         self.agent_id: Optional[int] = None
         self.ws_url: Optional[str] = None
 
         # Initialize components
-        self.state_tracker = AgentStateTracker()
+        self.http_client = HttpClient(
+            pool_size=config.get("HTTP_POOL_SIZE", DEFAULT_POOL_SIZE),
+            timeout=(
+                DEFAULT_CONNECT_TIMEOUT,
+                config.get("HTTP_TIMEOUT", DEFAULT_READ_TIMEOUT),
+            ),
+        )
+        self.event_sender = EventSender(
+            max_queue_events=config.get(
+                "EVENT_QUEUE_MAX_EVENTS", DEFAULT_MAX_QUEUE_EVENTS
+            ),
+            overflow_policy=config.get("EVENT_QUEUE_OVERFLOW", OVERFLOW_DROP_OLDEST),
+        )
+        self.state_tracker = AgentStateTracker(
+            max_slots=config.get("MAX_CONCURRENT_RUNS", 1)
+        )
         self.auth_service = AuthService(
             http_url=self.http_url,
             agent_token=self.agent_token,
@@ -71,16 +143,61 @@ class KeycaseAgent:
             version=self.agent_version,
             capabilities=self.capabilities,
             tags=self.tags,
+            http_client=self.http_client,
+        )
+        self.result_uploader = ResultUploader(
+            upload=self._upload_submitted, on_give_up=self._on_upload_given_up
+        )
+        # Streamed runs upload flow results as they complete
+        self.result_streamer: Optional[ResultStreamer] = None
+        if config.get("RESULT_UPLOAD_MODE", RESULT_UPLOAD_SINGLE) == (
+            RESULT_UPLOAD_STREAM
+        ):
+            self.result_streamer = ResultStreamer(
+                self.result_uploader,
+                on_give_up=self._on_upload_given_up,
+                chunk_size=config.get(
+                    "RESULT_STREAM_CHUNK_SIZE", DEFAULT_STREAM_CHUNK_SIZE
+                ),
+            )
+        results_dir = os.path.join(os.getcwd(), FAILED_RESULTS_DIR)
+        self.result_spool = ResultSpool(
+            os.path.join(results_dir, DEFAULT_SPOOL_FILE),
+            fsync_policy=config.get("RESULT_SPOOL_FSYNC", FSYNC_ALWAYS),
+        )
+        self.spool_replayer = SpoolReplayer(self.result_spool, self._upload_result)
+        self.plan_cache = PlanCache(
+            max_entries=config.get("PLAN_CACHE_SIZE", DEFAULT_PLAN_CACHE_SIZE),
+            directory=config.get("PLAN_CACHE_DIR"),
         )
         self.execution_manager = ExecutionManager(
             send_result_callback=self._send_result,
             update_status_callback=self._update_status,
+            max_parallel_steps=config.get("MAX_PARALLEL_STEPS", 1),
+            max_parallel_flows=config.get("MAX_PARALLEL_FLOWS", 1),
+            execution_log_verbosity=config.get("EXECUTION_LOG_VERBOSITY", "summary"),
+            event_sender=self.event_sender,
+            flow_result_callback=(
+                self.result_streamer.add_flow_result if self.result_streamer else None
+            ),
+            # Sent once the result is uploaded, see _upload_result()
+            notify_completion=False,
         )
 
         self.event_handler = EventHandler(
             execution_manager=self.execution_manager,
             state_tracker=self.state_tracker,
             get_execution_plan=self._get_execution_plan,
+            event_sender=self.event_sender,
+            plan_fetch_workers=config.get("MAX_CONCURRENT_RUNS", 1),
+            on_authenticated=self._on_authenticated,
+        )
+        self.inbound_dispatcher = InboundDispatcher(
+            handle_event=self.event_handler.handle_event,
+            on_overflow=self.event_handler.reject,
+            max_messages=config.get(
+                "INBOUND_QUEUE_MAX_MESSAGES", DEFAULT_INBOUND_QUEUE_SIZE
+            ),
         )
 
         # WebSocket client will be initialized after authentication
@@ -106,6 +223,10 @@ class KeycaseAgent:
         logger.info(f"Assigned agent ID: {self.agent_id}")
         logger.info(f"WebSocket URL: {self.ws_url}")
 
+        # Re-send results that could not be uploaded earlier
+        self.result_spool.import_legacy_files(os.path.dirname(self.result_spool.path))
+        self.spool_replayer.start()
+
         # Initialize WebSocket client with dynamic URL
         self.ws_client = WebSocketClient(
             url=self.ws_url,
@@ -113,19 +234,29 @@ class KeycaseAgent:
             on_message=self._on_message,
             on_error=self._on_error,
             on_close=self._on_close,
+            compression=self.ws_compression,
         )
+        # Batches go through the client, which holds them while reconnecting
+        self.event_sender.set_connection(self.ws_client)
+        self.event_sender.start()
+        self.inbound_dispatcher.start()
 
         self.ws_client.run_forever()
 
     def _on_open(self, ws) -> None:
         """Handle WebSocket connection opened event."""
         logger.info("WebSocket connection opened")
-        configure_batching(ws, flush_interval=10.0)
         self._send_auth()
+        self.spool_replayer.wake()
+
+    def _on_authenticated(self, payload: Dict[str, Any]) -> None:
+        """Apply what the server accepted in its authentication response."""
+        if self.ws_client is not None:
+            self.ws_client.confirm_compression(payload.get("compression"))
 
     def _on_message(self, ws, message: str) -> None:
-        """Handle incoming WebSocket messages."""
-        self.event_handler.handle(message)
+        """Queue incoming WebSocket messages for their handler thread."""
+        self.inbound_dispatcher.dispatch(message)
 
     def _on_error(self, ws, error: Exception) -> None:
         """Handle WebSocket errors."""
@@ -144,188 +275,183 @@ class KeycaseAgent:
             "accessToken": token,
             "agentId": self.agent_id,
         }
+        if self.ws_compression != COMPRESSION_OFF:
+            # The server confirms in its auth response before it is used
+            payload["compression"] = self.ws_compression
         logger.info(f"Sending auth event for agent ID: {self.agent_id}")
-        send_event(WebSocketEventType.AGENT_AUTH_REQUEST, payload, immediate=True)
+        self.event_sender.send_event(
+            WebSocketEventType.AGENT_AUTH_REQUEST, payload, immediate=True
+        )
 
     def _send_result(
         self, project_id: int, run_id: int, result: Dict[str, Any]
-    ) -> Optional[Any]:
-        """Send execution result to server with retry mechanism and local fallback.
+    ) -> None:
+        """Hand an execution result to the background uploader.
+
+        Returns immediately so the run's slot is released without waiting
+        for the server; the uploader retries failed uploads and saves the
+        result locally if they keep failing. A streamed run's result is the
+        summary closing the run, sent once its flow results are uploaded.
+        The run's completion is notified only once the server accepts its
+        result, so the server never closes a run whose result is still on
+        its way.
 
         Args:
             project_id: Project identifier
             run_id: Run identifier
             result: Execution result data
+        """
+        if self.result_streamer is not None:
+            self.result_streamer.finish(project_id, run_id, result)
+        else:
+            self.result_uploader.submit(project_id, run_id, result)
+
+    def _upload_submitted(self, job: UploadJob) -> bool:
+        """Upload a job for the uploader, reporting streamed chunks sent."""
+        uploaded = self._upload_result(job)
+        if (
+            uploaded
+            and job.kind == UPLOAD_FLOW_RESULTS
+            and self.result_streamer is not None
+        ):
+            self.result_streamer.chunk_uploaded(job)
+        return uploaded
+
+    def _upload_result(self, job: UploadJob) -> bool:
+        """Make one attempt to upload a result (called by the uploader).
+
+        Args:
+            job: Result to upload
 
         Returns:
-            Server response or None if failed and saved locally
+            True if the server accepted the result or already has it
+
+        Raises:
+            ResultRejectedError: If the server answered with a client error
+                that retrying will not fix
         """
-        url = f"{self.http_url}/projects/{project_id}/runs/{run_id}/results"
+        url = f"{self.http_url}/projects/{job.project_id}/runs/{job.run_id}/results"
+        url += RESULT_UPLOAD_PATHS[job.kind]
         token = self.auth_service.get_token()
 
         if not token:
             logger.error("No authentication token available")
-            self._save_result_locally(
-                project_id, run_id, result, "No authentication token"
-            )
-            return None
+            return False
 
-        retry_interval = INITIAL_RETRY_INTERVAL_SECONDS
+        logger.info(f"Sending run result to {url} (attempt {job.attempts})")
+        response = auth_request_with_details(
+            "POST", url, token, data=job.result, http_client=self.http_client
+        )
 
-        for attempt in range(1, MAX_RESULT_RETRIES + 1):
-            try:
-                logger.info(
-                    f"Sending run result to {url} "
-                    f"(attempt {attempt}/{MAX_RESULT_RETRIES})"
-                )
-                response = auth_request_with_details("POST", url, token, data=result)
-
-                if response.success:
-                    logger.info(f"Successfully sent result on attempt {attempt}")
-                    return response.data
-
-                # Check if this is an "already completed" error - treat as success
-                if response.error_code in ALREADY_COMPLETED_CODES:
-                    logger.info(
-                        f"Run {run_id} already completed (server confirmed). "
-                        "Treating as success."
-                    )
-                    return response.data
-
-                # Log the error for other failures
-                logger.warning(
-                    f"Attempt {attempt} failed: {response.error_message} "
-                    f"(code: {response.error_code})"
+        if response.success:
+            logger.info(f"Successfully sent result on attempt {job.attempts}")
+            if job.kind in (UPLOAD_RESULT, UPLOAD_CLOSE_RUN):
+                # Only now may the server close the run
+                self.event_sender.completed_execution(
+                    WebSocketEventType.AGENT_EXECUTION_COMPLETED_NOTIFY, job.run_id
                 )
+            return True
 
-            except Exception as e:
-                logger.error(f"Attempt {attempt} failed to send result: {str(e)}")
-
-            # If not the last attempt, wait before retrying
-            if attempt < MAX_RESULT_RETRIES:
-                logger.info(f"Retrying in {retry_interval} seconds...")
-                time.sleep(retry_interval)
-                retry_interval *= 1.5  # Exponential backoff
+        # Check if this is an "already completed" error - treat as success
+        if response.error_code in ALREADY_COMPLETED_CODES:
+            logger.info(
+                f"Run {job.run_id} already completed (server confirmed). "
+                "Treating as success."
+            )
+            return True
 
-        # All attempts failed, save locally
-        logger.error(
-            f"All {MAX_RESULT_RETRIES} attempts to send result failed. Saving locally."
+        status = response.status_code
+        if status in AUTH_ERRORS:
+            logger.warning(
+                f"Attempt {job.attempts} rejected with {status}, refreshing token"
+            )
+            self.auth_service.invalidate_token(token)
+            return False
+        if (
+            status is not None
+            and 400 <= status < 500
+            and status not in RETRYABLE_CLIENT_ERRORS
+        ):
+            raise ResultRejectedError(status, str(response.error_message))
+
+        logger.warning(
+            f"Attempt {job.attempts} failed: {response.error_message} "
+            f"(code: {response.error_code})"
         )
+        return False
+
+    def _on_upload_given_up(self, job: UploadJob, reason: str) -> None:
+        """Save a result locally once the uploader stops retrying it."""
         self._save_result_locally(
-            project_id, run_id, result, "All retry attempts failed"
+            job.project_id, job.run_id, job.result, reason, kind=job.kind
         )
-        return None
+        if job.kind == UPLOAD_FLOW_RESULTS and self.result_streamer is not None:
+            self.result_streamer.chunk_given_up(job)
 
     def _save_result_locally(
-        self, project_id: int, run_id: int, result: Dict[str, Any], reason: str
+        self,
+        project_id: int,
+        run_id: int,
+        result: Dict[str, Any],
+        reason: str,
+        kind: str = UPLOAD_RESULT,
     ) -> None:
-        """Save execution result to local directory when remote sending fails.
+        """Spool an execution result on disk when remote sending fails.
+
+        The spool replayer re-sends it once the server is reachable again.
 
         Args:
             project_id: Project identifier
             run_id: Run identifier
             result: Execution result data
             reason: Reason for local saving
+            kind: What the result is, one of UPLOAD_KINDS
         """
         try:
-            # Create results directory if it doesn't exist
-            results_dir = os.path.join(os.getcwd(), FAILED_RESULTS_DIR)
-            os.makedirs(results_dir, exist_ok=True)
-
-            # Create filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"result_p{project_id}_r{run_id}_{timestamp}.json"
-            filepath = os.path.join(results_dir, filename)
-
-            # Prepare result data with metadata
-            result_data = {
-                "metadata": {
-                    "project_id": project_id,
-                    "run_id": run_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "reason": reason,
-                    "agent_id": self.agent_id,
-                    "agent_name": self.agent_name,
-                },
-                "result": result,
-            }
-
-            # Save to file
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(result_data, f, indent=2, default=str)
-
-            logger.info(f"Execution result saved locally to: {filepath}")
-
-            # Update summary file tracking all failed results
-            self._update_failed_results_summary(filepath, project_id, run_id, reason)
-
+            self.result_spool.append(project_id, run_id, result, reason, kind=kind)
+            logger.info(
+                f"Execution result of run {run_id} spooled to "
+                f"{self.result_spool.path}"
+            )
         except Exception as e:
             logger.error(f"Failed to save result locally: {str(e)}")
 
-    def _update_failed_results_summary(
-        self, filepath: str, project_id: int, run_id: int, reason: str
-    ) -> None:
-        """Update summary file of all failed result submissions.
+    def _update_status(self, busy: bool, run_id: Optional[Any] = None) -> None:
+        """Update agent status and advertise slot capacity.
 
         Args:
-            filepath: Path where result was saved
-            project_id: Project identifier
-            run_id: Run identifier
-            reason: Reason for failure
+            busy: Whether the agent is busy; ignored when run_id is given
+            run_id: Run whose execution finished, releasing its slot
         """
-        try:
-            results_dir = os.path.join(os.getcwd(), FAILED_RESULTS_DIR)
-            summary_file = os.path.join(results_dir, "failed_results_summary.json")
-
-            # Load existing summary or create new
-            summary_data: Dict[str, Any] = {"failed_results": []}
-            if os.path.exists(summary_file):
-                try:
-                    with open(summary_file, "r", encoding="utf-8") as f:
-                        summary_data = json.load(f)
-                except (json.JSONDecodeError, IOError):
-                    pass  # Use default structure if file is corrupted
-
-            # Add new entry
-            entry = {
-                "timestamp": datetime.now().isoformat(),
-                "project_id": project_id,
-                "run_id": run_id,
-                "reason": reason,
-                "filepath": filepath,
-                "agent_id": self.agent_id,
-                "agent_name": self.agent_name,
-            }
-
-            summary_data["failed_results"].append(entry)
-
-            # Keep only last N entries to avoid file growing too large
-            if len(summary_data["failed_results"]) > MAX_FAILED_RESULTS_ENTRIES:
-                summary_data["failed_results"] = summary_data["failed_results"][
-                    -MAX_FAILED_RESULTS_ENTRIES:
-                ]
-
-            # Save summary
-            with open(summary_file, "w", encoding="utf-8") as f:
-                json.dump(summary_data, f, indent=2, default=str)
-
-        except Exception as e:
-            logger.error(f"Failed to update failed results summary: {str(e)}")
+        if run_id is not None:
+            self.state_tracker.release_slot(run_id)
+        else:
+            self.state_tracker.set_busy(busy)
+        capacity = self.state_tracker.get_capacity()
+        self.event_sender.status_update(
+            WebSocketEventType.AGENT_STATUS_NOTIFY,
+            capacity["status"],
+            max_slots=capacity["maxSlots"],
+            available_slots=capacity["availableSlots"],
+        )
 
-    def _update_status(self, busy: bool) -> None:
-        """Update agent status (busy/idle)."""
-        status = self.state_tracker.set_busy(busy)
-        status_update(WebSocketEventType.AGENT_STATUS_NOTIFY, status)
+    def _get_execution_plan(
+        self, project_id: int, run_id: int
+    ) -> Union[CompiledPlan, Dict[str, Any]]:
+        """Fetch execution plan from server, reusing cached plans.
 
-    def _get_execution_plan(self, project_id: int, run_id: int) -> str:
-        """Fetch execution plan from server.
+        The request carries the ETags of recently fetched plans, so the
+        server can answer ``304 Not Modified`` instead of sending a plan the
+        agent already has. Plans sent with an ETag are cached compiled, keyed
+        by it, so a re-run of the same plan is not parsed again either.
 
         Args:
             project_id: Project identifier
             run_id: Run identifier
 
         Returns:
-            JSON string of execution plan
+            Compiled execution plan, or the decoded plan if it cannot be
+            compiled (the run then reports the error)
 
         Raises:
             Exception: If plan fetch fails
@@ -336,23 +462,61 @@ class KeycaseAgent:
         if not token:
             raise Exception("No authentication token available")
 
+        headers = {}
+        etags = self.plan_cache.known_etags()
+        if etags:
+            headers["If-None-Match"] = ", ".join(etags)
+
         logger.info(f"Fetching execution plan from {url}")
-        response = auth_request("GET", url, token)
+        response = auth_request_with_details(
+            "GET", url, token, http_client=self.http_client, headers=headers
+        )
+
+        if response.status_code == 304:
+            cached = self.plan_cache.get_by_etag((response.headers or {}).get("ETag"))
+            if cached is not None:
+                logger.info("Execution plan not modified, using cached plan")
+                return cached.compiled
+            # The server matched an ETag the cache has since evicted
+            response = auth_request_with_details(
+                "GET", url, token, http_client=self.http_client
+            )
 
-        if not response:
+        if not response.success or not response.data:
             raise Exception("Failed to fetch execution plan")
 
-        if isinstance(response, str):
-            response = json.loads(response)
+        data = response.data
+        if isinstance(data, str):
+            data = json_codec.loads(data)
 
-        logger.debug(f"Received execution plan response: {response}")
-        return json.dumps(response.get("plan", {}))
+        logger.debug("Received execution plan response: %s", LogValue(data))
+        plan = data.get("plan", {})
+        if not plan:
+            return plan
+        try:
+            etag = (response.headers or {}).get("ETag")
+            if not etag:
+                return compile_plan_data(plan)
+            # The body also holds the run, but is a close enough plan size
+            return self.plan_cache.put(
+                plan, etag, size=response.content_length
+            ).compiled
+        except ValueError as e:
+            logger.warning(f"Execution plan of run {run_id} not compiled: {e}")
+            return plan
 
     def _on_shutdown_signal(self, signum: int, frame) -> None:
         """Handle shutdown signals for graceful cleanup."""
         logger.info(f"Received shutdown signal ({signum}); cleaning up")
         self.state_tracker.request_shutdown()
-        self.execution_manager.stop()
+        self.inbound_dispatcher.stop()
+        self.event_handler.shutdown()
+        self.execution_manager.shutdown()
+        self.event_sender.stop()
+        self.result_uploader.stop()
+        self.spool_replayer.stop()
+        self.result_spool.close()
         self.auth_service.stop()
+        self.http_client.close()
         if self.ws_client:
             self.ws_client.stop()
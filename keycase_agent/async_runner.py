@@ -0,0 +1,62 @@
+"""Shared event loop for executing ``async def`` keywords."""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLoopRunner:
+    """Runs coroutines on a long-lived event loop in a background thread.
+
+    All async keywords of an ExecutionManager share this loop, so clients
+    and connection pools created by keywords can be reused across steps
+    instead of paying for a new loop per call.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the event loop, starting its thread on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(loop,),
+                    name="KeywordEventLoop",
+                    daemon=True,
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        """Schedule a coroutine on the shared loop.
+
+        Cancelling the returned future cancels the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+    def shutdown(self) -> None:
+        """Stop the event loop and its thread."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
@@ -11,6 +11,7 @@ from .utils.auth_helper import (
     authenticate_agent,
     refresh_access_token,
 )
+from .utils.http_client import HttpClient
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +49,7 @@ class AuthService:
         tags: Optional[List[str]] = None,
         token_refresh_threshold: int = DEFAULT_TOKEN_REFRESH_THRESHOLD_SECONDS,
         max_retry_attempts: int = DEFAULT_MAX_RETRY_ATTEMPTS,
+        http_client: Optional[HttpClient] = None,
     ) -> None:
         """Initialize authentication service.
 
@@ -60,6 +62,8 @@ class AuthService:
             tags: List of labels for categorization
             token_refresh_threshold: Seconds before expiry to refresh token
             max_retry_attempts: Maximum authentication retry attempts
+            http_client: Client for the authentication requests
+                (default: the shared client)
         """
         self.http_url = http_url
         self.agent_token = agent_token
@@ -69,6 +73,7 @@ class AuthService:
         self.tags = tags or []
         self.token_refresh_threshold = token_refresh_threshold
         self.max_retry_attempts = max_retry_attempts
+        self.http_client = http_client
 
         self._credentials: Optional[AuthCredentials] = None
         self._token_lock = threading.Lock()
@@ -99,6 +104,7 @@ class AuthService:
                         version=self.version,
                         capabilities=self.capabilities,
                         tags=self.tags,
+                        http_client=self.http_client,
                     )
 
                     self._credentials = AuthCredentials(
@@ -150,6 +156,19 @@ class AuthService:
                     return None
             return self._credentials.access_token if self._credentials else None
 
+    def invalidate_token(self, token: str) -> None:
+        """Mark a token the server rejected as expired.
+
+        The next get_token() call refreshes it. Nothing happens if the token
+        was already replaced, so requests rejected together refresh it once.
+
+        Args:
+            token: The access token the server rejected
+        """
+        with self._token_lock:
+            if self._credentials and self._credentials.access_token == token:
+                self._credentials.token_expires_at = datetime.now()
+
     def get_credentials(self) -> Optional[AuthCredentials]:
         """Get full credentials including agent ID, ws URL, etc."""
         return self._credentials
@@ -192,6 +211,7 @@ class AuthService:
             tokens = refresh_access_token(
                 http_url=self.http_url,
                 refresh_token=self._credentials.refresh_token,
+                http_client=self.http_client,
             )
 
             self._credentials.access_token = tokens["accessToken"]
@@ -0,0 +1,206 @@
+"""Cooperative cancellation and timeouts for keyword steps.
+
+Every step runs with a :class:`CancellationToken` that is cancelled when its
+run is stopped or when the step's timeout elapses. The execution thread waits
+for the keyword with :func:`wait_for_future`, so a hung keyword never blocks
+the run: the step is marked TIMEOUT or ABORTED and execution moves on, while
+the keyword itself can poll the token to stop early.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from .exceptions import StepCancelledError, StepTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting step checks its token
+POLL_INTERVAL_SECONDS = 0.1
+# Idle time after which a keyword call thread exits
+CALL_THREAD_IDLE_SECONDS = 60.0
+
+
+class CancellationToken:
+    """Signals that a step should stop, because of a stop request or timeout.
+
+    Keywords get the token of the running step from
+    ``execution_context.get_cancellation_token()`` and may poll it between
+    units of work::
+
+        token = get_cancellation_token()
+        for item in items:
+            token.raise_if_cancelled()
+            process(item)
+    """
+
+    def __init__(
+        self,
+        stop_event: Optional[threading.Event] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Create a token.
+
+        Args:
+            stop_event: Run stop event; the token is cancelled once it is set
+            timeout: Seconds from now after which the token is cancelled
+        """
+        self._stop_event = stop_event
+        self._cancelled = threading.Event()
+        self.timeout = timeout
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+
+    def cancel(self) -> None:
+        """Cancel the token explicitly."""
+        self._cancelled.set()
+
+    def timed_out(self) -> bool:
+        """Check whether the token's timeout has elapsed."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def is_cancelled(self) -> bool:
+        """Check whether the step should stop."""
+        return (
+            self._cancelled.is_set()
+            or (self._stop_event is not None and self._stop_event.is_set())
+            or self.timed_out()
+        )
+
+    def remaining(self) -> Optional[float]:
+        """Get the seconds left before the timeout, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def raise_if_cancelled(self) -> None:
+        """Raise if the step should stop.
+
+        Raises:
+            StepTimeoutError: If the timeout elapsed
+            StepCancelledError: If the run was stopped or the token cancelled
+        """
+        if self.timed_out():
+            raise StepTimeoutError(self.timeout)
+        if self.is_cancelled():
+            raise StepCancelledError("Step cancelled: execution stopped")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep until the token is cancelled or ``timeout`` seconds pass.
+
+        Use instead of ``time.sleep`` in keywords so a stop is noticed.
+
+        Returns:
+            True if the token is cancelled
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        while not self.is_cancelled():
+            wait_for = POLL_INTERVAL_SECONDS
+            if end is not None:
+                left = end - time.monotonic()
+                if left <= 0:
+                    return False
+                wait_for = min(wait_for, left)
+            remaining = self.remaining()
+            if remaining is not None:
+                wait_for = min(wait_for, remaining)
+            self._cancelled.wait(wait_for)
+        return True
+
+
+def wait_for_future(future: Future, token: CancellationToken) -> Any:
+    """Wait for a keyword call without blocking past a stop or timeout.
+
+    When the token is cancelled first the future is cancelled (which stops
+    coroutines and queued calls) and the call is abandoned.
+
+    Args:
+        future: Future of the keyword call
+        token: Cancellation token of the step
+
+    Returns:
+        The call's result
+
+    Raises:
+        StepTimeoutError: If the step's timeout elapsed
+        StepCancelledError: If the run was stopped
+    """
+    while True:
+        wait_for = POLL_INTERVAL_SECONDS
+        remaining = token.remaining()
+        if remaining is not None:
+            wait_for = min(wait_for, remaining)
+        try:
+            return future.result(timeout=wait_for)
+        except FutureTimeoutError:
+            if future.done():
+                raise  # Raised by the keyword itself
+
+        if token.is_cancelled():
+            future.cancel()
+            token.cancel()
+            token.raise_if_cancelled()
+
+
+class KeywordCallThread:
+    """Daemon thread running the keyword calls handed off by one thread.
+
+    Keeping the call off the execution thread lets that thread give up on a
+    hung keyword. A thread whose call was abandoned must be closed and not
+    reused; the stuck call keeps running in the background until it returns.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue a call on the thread.
+
+        Raises:
+            RuntimeError: If the thread was closed
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Keyword call thread is closed")
+            self._queue.put((future, fn, args))
+        return future
+
+    def close(self) -> None:
+        """Let the thread exit once its current call returns."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=CALL_THREAD_IDLE_SECONDS)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._closed = True
+                        return
+                continue
+            if item is None:
+                return
+
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
@@ -2,6 +2,23 @@ import os
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
 
+from .inbound_dispatcher import DEFAULT_INBOUND_QUEUE_SIZE
+from .plan_cache import DEFAULT_PLAN_CACHE_SIZE
+from .result_spool import FSYNC_ALWAYS, FSYNC_POLICIES
+from .result_stream import (
+    DEFAULT_STREAM_CHUNK_SIZE,
+    RESULT_UPLOAD_MODES,
+    RESULT_UPLOAD_SINGLE,
+)
+from .utils.event_sender import (
+    DEFAULT_MAX_QUEUE_EVENTS,
+    OVERFLOW_DROP_OLDEST,
+    OVERFLOW_POLICIES,
+)
+from .utils.http_client import DEFAULT_POOL_SIZE, DEFAULT_READ_TIMEOUT
+from .utils.log_values import ExecutionLogVerbosity
+from .websocket_client import COMPRESSION_MODES, COMPRESSION_OFF
+
 
 def require_env(name: str) -> str:
     """Get required environment variable or raise error.
@@ -89,6 +106,56 @@ def parse_list(value: Optional[str]) -> List[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+def parse_positive_int(value: Optional[str], name: str, default: int) -> int:
+    """Parse a positive integer setting.
+
+    Args:
+        value: String value or None
+        name: Name of the setting for error messages
+        default: Value to use when not set
+
+    Returns:
+        Parsed integer (default if value is None or empty)
+
+    Raises:
+        ValueError: If value is not a positive integer
+    """
+    if not value:
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got '{value}'")
+    if parsed < 1:
+        raise ValueError(f"{name} must be at least 1")
+    return parsed
+
+
+def parse_choice(
+    value: Optional[str], name: str, choices: List[str], default: str
+) -> str:
+    """Parse a setting that must be one of a fixed set of values.
+
+    Args:
+        value: String value or None
+        name: Name of the setting for error messages
+        choices: Allowed values (lowercase)
+        default: Value to use when not set
+
+    Returns:
+        Lowercased value (default if value is None or empty)
+
+    Raises:
+        ValueError: If value is not one of the choices
+    """
+    if not value:
+        return default
+    parsed = value.strip().lower()
+    if parsed not in choices:
+        raise ValueError(f"{name} must be one of {choices}, got '{value}'")
+    return parsed
+
+
 def load_config() -> Dict[str, Any]:
     """Load configuration from environment variables.
 
@@ -101,6 +168,34 @@ def load_config() -> Dict[str, Any]:
         AGENT_VERSION: Agent version (default: "1.0.0")
         AGENT_CAPABILITIES: Comma-separated list of capabilities
         AGENT_TAGS: Comma-separated list of tags
+        MAX_PARALLEL_STEPS: Independent steps of a flow to run concurrently
+            (default: 1, sequential)
+        MAX_PARALLEL_FLOWS: Flows of a run to execute concurrently
+            (default: 1, sequential)
+        MAX_CONCURRENT_RUNS: Runs the agent executes at the same time
+            (default: 1)
+        EXECUTION_LOG_VERBOSITY: Logging of step parameter and output values:
+            off, summary (truncated, default) or full
+        EVENT_QUEUE_MAX_EVENTS: Events held while waiting to be sent
+            (default: 10000)
+        EVENT_QUEUE_OVERFLOW: What to drop when the event queue is full:
+            drop_oldest (default), drop_newest or block
+        WS_COMPRESSION: Compression of large outgoing messages: off (default)
+            or deflate, used once the server accepts it
+        HTTP_POOL_SIZE: Keep-alive connections for REST calls (default: 10)
+        HTTP_TIMEOUT: Seconds to wait for a REST response (default: 30)
+        RESULT_SPOOL_FSYNC: When spooled results are fsynced: always
+            (default), normal or off
+        PLAN_CACHE_SIZE: Execution plans cached in memory (default: 32)
+        PLAN_CACHE_DIR: Directory persisting cached plans across restarts
+            (default: not persisted)
+        INBOUND_QUEUE_MAX_MESSAGES: Incoming messages queued per handler
+            lane before further ones are declined (default: 100)
+        RESULT_UPLOAD_MODE: How run results are uploaded: single (the whole
+            result when the run ends, default) or stream (flow results in
+            chunks as they complete)
+        RESULT_STREAM_CHUNK_SIZE: Flow results per streamed chunk
+            (default: 50)
 
     Returns:
         Configuration dictionary
@@ -117,6 +212,71 @@ def load_config() -> Dict[str, Any]:
     agent_version = get_env("AGENT_VERSION", "1.0.0")
     capabilities_str = get_env("AGENT_CAPABILITIES", "")
     tags_str = get_env("AGENT_TAGS", "")
+    max_parallel_steps = parse_positive_int(
+        get_env("MAX_PARALLEL_STEPS"), "MAX_PARALLEL_STEPS", 1
+    )
+    max_parallel_flows = parse_positive_int(
+        get_env("MAX_PARALLEL_FLOWS"), "MAX_PARALLEL_FLOWS", 1
+    )
+    max_concurrent_runs = parse_positive_int(
+        get_env("MAX_CONCURRENT_RUNS"), "MAX_CONCURRENT_RUNS", 1
+    )
+    execution_log_verbosity = parse_choice(
+        get_env("EXECUTION_LOG_VERBOSITY"),
+        "EXECUTION_LOG_VERBOSITY",
+        [verbosity.value for verbosity in ExecutionLogVerbosity],
+        ExecutionLogVerbosity.SUMMARY.value,
+    )
+
+    event_queue_max_events = parse_positive_int(
+        get_env("EVENT_QUEUE_MAX_EVENTS"),
+        "EVENT_QUEUE_MAX_EVENTS",
+        DEFAULT_MAX_QUEUE_EVENTS,
+    )
+    event_queue_overflow = parse_choice(
+        get_env("EVENT_QUEUE_OVERFLOW"),
+        "EVENT_QUEUE_OVERFLOW",
+        list(OVERFLOW_POLICIES),
+        OVERFLOW_DROP_OLDEST,
+    )
+    ws_compression = parse_choice(
+        get_env("WS_COMPRESSION"),
+        "WS_COMPRESSION",
+        list(COMPRESSION_MODES),
+        COMPRESSION_OFF,
+    )
+    http_pool_size = parse_positive_int(
+        get_env("HTTP_POOL_SIZE"), "HTTP_POOL_SIZE", DEFAULT_POOL_SIZE
+    )
+    http_timeout = parse_positive_int(
+        get_env("HTTP_TIMEOUT"), "HTTP_TIMEOUT", int(DEFAULT_READ_TIMEOUT)
+    )
+    result_spool_fsync = parse_choice(
+        get_env("RESULT_SPOOL_FSYNC"),
+        "RESULT_SPOOL_FSYNC",
+        list(FSYNC_POLICIES),
+        FSYNC_ALWAYS,
+    )
+    plan_cache_size = parse_positive_int(
+        get_env("PLAN_CACHE_SIZE"), "PLAN_CACHE_SIZE", DEFAULT_PLAN_CACHE_SIZE
+    )
+    plan_cache_dir = get_env("PLAN_CACHE_DIR") or None
+    inbound_queue_max_messages = parse_positive_int(
+        get_env("INBOUND_QUEUE_MAX_MESSAGES"),
+        "INBOUND_QUEUE_MAX_MESSAGES",
+        DEFAULT_INBOUND_QUEUE_SIZE,
+    )
+    result_upload_mode = parse_choice(
+        get_env("RESULT_UPLOAD_MODE"),
+        "RESULT_UPLOAD_MODE",
+        list(RESULT_UPLOAD_MODES),
+        RESULT_UPLOAD_SINGLE,
+    )
+    result_stream_chunk_size = parse_positive_int(
+        get_env("RESULT_STREAM_CHUNK_SIZE"),
+        "RESULT_STREAM_CHUNK_SIZE",
+        DEFAULT_STREAM_CHUNK_SIZE,
+    )
 
     # Validate configuration
     validate_url(http_url, "HTTP_URL")
@@ -132,4 +292,19 @@ def load_config() -> Dict[str, Any]:
         "AGENT_VERSION": agent_version,
         "AGENT_CAPABILITIES": parse_list(capabilities_str),
         "AGENT_TAGS": parse_list(tags_str),
+        "MAX_PARALLEL_STEPS": max_parallel_steps,
+        "MAX_PARALLEL_FLOWS": max_parallel_flows,
+        "MAX_CONCURRENT_RUNS": max_concurrent_runs,
+        "EXECUTION_LOG_VERBOSITY": execution_log_verbosity,
+        "EVENT_QUEUE_MAX_EVENTS": event_queue_max_events,
+        "EVENT_QUEUE_OVERFLOW": event_queue_overflow,
+        "WS_COMPRESSION": ws_compression,
+        "HTTP_POOL_SIZE": http_pool_size,
+        "HTTP_TIMEOUT": http_timeout,
+        "RESULT_SPOOL_FSYNC": result_spool_fsync,
+        "PLAN_CACHE_SIZE": plan_cache_size,
+        "PLAN_CACHE_DIR": plan_cache_dir,
+        "INBOUND_QUEUE_MAX_MESSAGES": inbound_queue_max_messages,
+        "RESULT_UPLOAD_MODE": result_upload_mode,
+        "RESULT_STREAM_CHUNK_SIZE": result_stream_chunk_size,
     }
@@ -4,8 +4,21 @@ import functools
 import inspect
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Type, Union
-
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .exceptions import KeywordDefinitionError
 from .registry import keyword_registry
 
 
@@ -60,6 +73,106 @@ class ParamDefinition:
         return result
 
 
+@dataclass(frozen=True)
+class KeywordOptions:
+    """Execution options given to ``@keyword``."""
+
+    run_in_process: bool = False
+    timeout: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class KeywordCallDescriptor:
+    """Precomputed call information for a registered keyword.
+
+    Built on a keyword's first lookup, once all its decorators have run, so
+    the executor does not re-inspect the function signature on every step.
+    """
+
+    keyword_name: str
+    arg_names: Tuple[str, ...]
+    required_args: FrozenSet[str]
+    accepts_var_kwargs: bool
+    input_params: Mapping[str, ParamDefinition]
+    required_inputs: FrozenSet[str]
+    output_names: Tuple[str, ...]
+    run_in_process: bool = False
+    is_async: bool = False
+    timeout: Optional[float] = None
+
+
+def build_call_descriptor(
+    func: Callable,
+    name: str,
+    params: List[ParamDefinition],
+    run_in_process: bool = False,
+    timeout: Optional[float] = None,
+) -> KeywordCallDescriptor:
+    """Build a call descriptor from a function and its parameter definitions."""
+    arg_names: List[str] = []
+    required_args = set()
+    accepts_var_kwargs = False
+    try:
+        for param_name, param_obj in inspect.signature(func).parameters.items():
+            if param_obj.kind == inspect.Parameter.VAR_KEYWORD:
+                accepts_var_kwargs = True
+            elif param_obj.kind != inspect.Parameter.VAR_POSITIONAL:
+                arg_names.append(param_name)
+                if param_obj.default is inspect.Parameter.empty:
+                    required_args.add(param_name)
+    except (ValueError, TypeError):
+        # Signature unavailable: accept whatever the plan provides
+        accepts_var_kwargs = True
+
+    # The first definition of a name wins: explicit ones come before those
+    # discovered from the signature
+    input_params: Dict[str, ParamDefinition] = {}
+    for p in params:
+        if p.direction == ParamDirection.INPUT:
+            input_params.setdefault(p.name, p)
+    return KeywordCallDescriptor(
+        keyword_name=name,
+        arg_names=tuple(arg_names),
+        required_args=frozenset(required_args),
+        accepts_var_kwargs=accepts_var_kwargs,
+        input_params=MappingProxyType(input_params),
+        required_inputs=frozenset(n for n, p in input_params.items() if p.required),
+        output_names=tuple(
+            p.name for p in params if p.direction == ParamDirection.OUTPUT
+        ),
+        run_in_process=run_in_process,
+        is_async=inspect.iscoroutinefunction(func),
+        timeout=timeout,
+    )
+
+
+def get_call_descriptor(func: Callable) -> KeywordCallDescriptor:
+    """Get the cached call descriptor of a keyword, building it if missing.
+
+    The descriptor is built on first lookup rather than by ``@keyword``, so
+    ``@param`` decorators applied above ``@keyword`` are included.
+    """
+    descriptor = getattr(func, "call_descriptor", None)
+    if isinstance(descriptor, KeywordCallDescriptor):
+        return descriptor
+
+    options = getattr(func, "keyword_options", None)
+    if not isinstance(options, KeywordOptions):
+        options = KeywordOptions()
+    descriptor = build_call_descriptor(
+        func,
+        getattr(func, "keyword_name", getattr(func, "__name__", repr(func))),
+        list(getattr(func, "keyword_params", None) or []),
+        run_in_process=options.run_in_process,
+        timeout=options.timeout,
+    )
+    try:
+        func.call_descriptor = descriptor  # type: ignore[attr-defined]
+    except AttributeError:
+        pass  # Callable does not accept attributes; rebuild next time
+    return descriptor
+
+
 # Type mapping from Python types to ParamType
 _PYTHON_TYPE_MAP: Dict[Type, ParamType] = {
     str: ParamType.STRING,
@@ -211,13 +324,38 @@ def output_param(
     )
 
 
-def keyword(keyword_name: Optional[Union[str, Callable]] = None) -> Callable:
+def keyword(
+    keyword_name: Optional[Union[str, Callable]] = None,
+    run_in_process: bool = False,
+    timeout: Optional[float] = None,
+) -> Callable:
     """Decorator to register a function as a keyword.
 
     Can be used with or without parentheses, and with an optional custom name.
     Automatically collects parameter metadata from @param decorators and
     infers types from function signature when not explicitly defined.
 
+    Args:
+        keyword_name: Custom keyword name (defaults to the function name)
+        run_in_process: Execute calls in a worker process instead of the
+            execution thread. Use for CPU-bound keywords; the function must be
+            defined at module level and its inputs and return value picklable.
+        timeout: Seconds a call may run before the step is marked TIMEOUT
+            and execution moves on. A step's ``timeoutSeconds`` in the plan
+            overrides it.
+
+    ``async def`` functions are supported; they run on a shared event loop
+    owned by the ExecutionManager and are cancelled when execution stops.
+    Synchronous keywords cannot be interrupted, but can poll
+    ``get_cancellation_token()`` to stop early on a stop or timeout.
+
+    Synchronous keywords run on the run's keyword call thread, not on the
+    execution thread, so a hung call can be abandoned. Before- and after-run
+    hooks run on the same thread, so thread-local state they set up is
+    visible to keywords of sequential steps. Keywords of parallel steps or
+    flows, and keywords after a call was abandoned, run on other threads and
+    must not rely on such state.
+
     Usage:
         @keyword  # Uses function name
         def my_function():
@@ -231,6 +369,14 @@ def keyword(keyword_name: Optional[Union[str, Callable]] = None) -> Callable:
         def technical_function_name():
             pass
 
+        @keyword("Diff Images", run_in_process=True)  # CPU-bound keyword
+        def diff_images(expected: str, actual: str) -> dict:
+            ...
+
+        @keyword("Fetch Status", timeout=30)  # Async keyword with a timeout
+        async def fetch_status(url: str) -> dict:
+            ...
+
         # With parameter decorators
         @keyword("Add Numbers")
         @param("a", type="number", required=True, description="First number")
@@ -248,9 +394,23 @@ def keyword(keyword_name: Optional[Union[str, Callable]] = None) -> Callable:
         # Determine keyword name
         name = keyword_name if isinstance(keyword_name, str) else func.__name__
 
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
+        is_async = inspect.iscoroutinefunction(func)
+        if is_async and run_in_process:
+            raise KeywordDefinitionError(
+                f"Keyword '{name}': async keywords cannot use run_in_process"
+            )
+
+        if is_async:
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await func(*args, **kwargs)
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return func(*args, **kwargs)
 
         # Collect parameter definitions
         params: List[ParamDefinition] = []
@@ -322,6 +482,7 @@ def keyword(keyword_name: Optional[Union[str, Callable]] = None) -> Callable:
         wrapper.keyword_name = name
         wrapper.keyword_params = params
         wrapper._keyword_params = params  # For compatibility
+        wrapper.keyword_options = KeywordOptions(run_in_process, timeout)
 
         # Register the keyword
         keyword_registry.register(wrapper)
@@ -1,21 +1,51 @@
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
 
 from .models.websocket_event_types import WebSocketEventType
-from .utils.event_sender import accepted_execution, busy_message, send_event
+from .utils import json_codec
+from .utils.event_sender import EventSender, default_sender
 
 logger = logging.getLogger(__name__)
 
+# Threads fetching execution plans; one per concurrent run avoids queueing
+DEFAULT_PLAN_FETCH_WORKERS = 1
+
 
 class EventHandler:
-    def __init__(self, execution_manager, state_tracker, get_execution_plan):
+    def __init__(
+        self,
+        execution_manager,
+        state_tracker,
+        get_execution_plan,
+        event_sender: Optional[EventSender] = None,
+        plan_fetch_workers: int = DEFAULT_PLAN_FETCH_WORKERS,
+        on_authenticated: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
         self.execution_manager = execution_manager
         self.state_tracker = state_tracker
         self.get_execution_plan = get_execution_plan
+        self.event_sender = event_sender or default_sender
+        # Called with the payload of the server's authentication success
+        self.on_authenticated = on_authenticated
+        # Plans are fetched and compiled here rather than on the thread
+        # delivering messages, which stays free for stop and status requests
+        self._plan_dispatcher = ThreadPoolExecutor(
+            max_workers=max(1, plan_fetch_workers), thread_name_prefix="PlanFetch"
+        )
 
     def handle(self, message):
+        """Decode and handle a message."""
+        try:
+            data = json_codec.loads(message)
+        except ValueError as e:
+            logger.error(f"Error handling message: {e}")
+            return
+        self.handle_event(data)
+
+    def handle_event(self, data):
+        """Handle a decoded message."""
         try:
-            data = json.loads(message)
             event_type = data.get("event")
             payload = data.get("payload", {})
 
@@ -32,6 +62,8 @@ class EventHandler:
 
             elif event_type == WebSocketEventType.AUTH_SUCCESS_RESPONSE.value:
                 logger.info("Authentication successful.")
+                if self.on_authenticated is not None:
+                    self.on_authenticated(payload)
 
             elif event_type == WebSocketEventType.AUTH_FAILURE_RESPONSE.value:
                 logger.error("Authentication failed. Exiting." + str(payload))
@@ -42,15 +74,14 @@ class EventHandler:
 
         except Exception as e:
             logger.error(f"Error handling message: {e}")
-            self.state_tracker.set_busy(False)
 
     def _handle_execute_plan(self, payload):
         run_id = payload.get("runId")
         project_id = payload.get("projectId")
 
-        if not self.state_tracker.try_set_busy():
+        if not self.state_tracker.try_acquire_slot(run_id):
             logger.info("Agent is busy. Rejecting execute request.")
-            busy_message(
+            self.event_sender.busy_message(
                 WebSocketEventType.AGENT_EXECUTION_DENIED_NOTIFY,
                 run_id,
                 "Agent is busy",
@@ -58,16 +89,42 @@ class EventHandler:
             return
 
         logger.info("Execution request accepted")
-        accepted_execution(WebSocketEventType.AGENT_EXECUTION_ACCEPTED_NOTIFY, run_id)
-        execution_plan_json = self.get_execution_plan(project_id, run_id)
-        self.execution_manager.start_execution(project_id, run_id, execution_plan_json)
+        try:
+            # The run starts right away and waits for the plan after its
+            # before-run hooks, so the download overlaps with the run setup
+            plan_future = self._plan_dispatcher.submit(
+                self.get_execution_plan, project_id, run_id
+            )
+            self.event_sender.accepted_execution(
+                WebSocketEventType.AGENT_EXECUTION_ACCEPTED_NOTIFY, run_id
+            )
+            self.execution_manager.start_execution(project_id, run_id, plan_future)
+        except Exception:
+            self.state_tracker.release_slot(run_id)
+            raise
+
+    def reject(self, data):
+        """Decline a message the agent has no room to handle."""
+        if data.get("event") == WebSocketEventType.AGENT_EXECUTE_PLAN_COMMAND.value:
+            run_id = data.get("payload", {}).get("runId")
+            self.event_sender.busy_message(
+                WebSocketEventType.AGENT_EXECUTION_DENIED_NOTIFY,
+                run_id,
+                "Agent is busy",
+            )
+
+    def shutdown(self):
+        """Stop the plan fetch threads; fetches in progress are abandoned."""
+        self._plan_dispatcher.shutdown(wait=False)
 
     def _handle_stop_execution(self, payload):
         run_id = payload.get("runId")
         logger.info(f"Stop requested for run_id {run_id}")
-        self.execution_manager.stop()
-        self.state_tracker.set_busy(False)
-        send_event(
+        # Not waiting for the run to finish keeps the control lane free for
+        # other stop and status requests. The run releases its slot through
+        # the status callback once its thread, after-hooks included, is done.
+        self.execution_manager.stop_run(run_id, wait=False)
+        self.event_sender.send_event(
             WebSocketEventType.AGENT_EXECUTION_ABORTED_NOTIFY, {"runId": run_id}, True
         )
 
@@ -86,7 +143,7 @@ class EventHandler:
                     "flowResults": tracker[run_id]["flowResults"],
                 }
                 logger.info(f"Sending execution status for run_id {run_id}")
-                send_event(
+                self.event_sender.send_event(
                     WebSocketEventType.AGENT_EXECUTION_STATUS_RESPONSE, status, True
                 )
             else:
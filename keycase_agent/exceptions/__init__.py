@@ -8,6 +8,9 @@ from .validation_exceptions import (
     KeycaseError,
     KeywordDefinitionError,
     ParameterValidationError,
+    ResultRejectedError,
+    StepCancelledError,
+    StepTimeoutError,
 )
 
 __all__ = [
@@ -19,6 +22,9 @@ __all__ = [
     "KeywordDefinitionError",
     "ParameterValidationError",
     "ExecutionError",
+    "StepCancelledError",
+    "StepTimeoutError",
+    "ResultRejectedError",
     "AuthenticationError",
     "ConnectionError",
 ]
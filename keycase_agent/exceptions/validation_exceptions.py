@@ -76,3 +76,25 @@ class ConnectionError(KeycaseError):
     """Raised when WebSocket connection fails."""
 
     pass
+
+
+class ResultRejectedError(KeycaseError):
+    """Raised when the server refuses a result for good; retrying is useless."""
+
+    def __init__(self, status_code: int, message: str):
+        self.status_code = status_code
+        super().__init__(f"Result rejected with status {status_code}: {message}")
+
+
+class StepCancelledError(ExecutionError):
+    """Raised when a step is cancelled because its run was stopped."""
+
+    pass
+
+
+class StepTimeoutError(ExecutionError, TimeoutError):
+    """Raised when a step runs longer than its timeout."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        super().__init__(f"Keyword timed out after {timeout}s")
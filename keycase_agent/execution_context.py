@@ -1,28 +1,50 @@
-import threading
+from contextvars import ContextVar
 from typing import Optional
 
-_context = threading.local()
+from .cancellation import CancellationToken
+
+# Context variables rather than thread-locals, so each async keyword running
+# on the shared event loop sees its own step's context
+_run_id: ContextVar[Optional[int]] = ContextVar("run_id", default=None)
+_project_id: ContextVar[Optional[int]] = ContextVar("project_id", default=None)
+_step_id: ContextVar[Optional[int]] = ContextVar("step_id", default=None)
+_cancellation_token: ContextVar[Optional[CancellationToken]] = ContextVar(
+    "cancellation_token", default=None
+)
+# Returned outside of a step; never cancelled
+_NO_CANCELLATION = CancellationToken()
 
 
 def set_context(run_id: int, project_id: int, step_id: Optional[int] = None):
-    _context.run_id = run_id
-    _context.project_id = project_id
-    _context.step_id = step_id
+    _run_id.set(run_id)
+    _project_id.set(project_id)
+    _step_id.set(step_id)
 
 
 def update_step_id(step_id: int):
-    _context.step_id = step_id
+    _step_id.set(step_id)
 
 
 def get_context() -> dict:
     return {
-        "run_id": getattr(_context, "run_id", None),
-        "project_id": getattr(_context, "project_id", None),
-        "step_id": getattr(_context, "step_id", None),
+        "run_id": _run_id.get(),
+        "project_id": _project_id.get(),
+        "step_id": _step_id.get(),
     }
 
 
+def set_cancellation_token(token: Optional[CancellationToken]):
+    _cancellation_token.set(token)
+
+
+def get_cancellation_token() -> CancellationToken:
+    """Get the cancellation token of the step running in this context."""
+    token = _cancellation_token.get()
+    return token if token is not None else _NO_CANCELLATION
+
+
 def clear_context():
-    _context.run_id = None
-    _context.project_id = None
-    _context.step_id = None
+    _run_id.set(None)
+    _project_id.set(None)
+    _step_id.set(None)
+    _cancellation_token.set(None)
@@ -1,34 +1,95 @@
 """Execution manager for running keyword-based automation flows."""
 
-import inspect
-import json
+import functools
 import logging
 import re
 import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
-
-from .decorators import ParamDirection, after_run_hooks, before_run_hooks
-from .exceptions import ParameterValidationError
-from .execution_context import clear_context, set_context
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from .async_runner import AsyncLoopRunner
+from .cancellation import (
+    POLL_INTERVAL_SECONDS,
+    CancellationToken,
+    KeywordCallThread,
+    wait_for_future,
+)
+from .decorators import (
+    KeywordCallDescriptor,
+    after_run_hooks,
+    before_run_hooks,
+    get_call_descriptor,
+)
+from .exceptions import (
+    ExecutionError,
+    ParameterValidationError,
+    StepCancelledError,
+    StepTimeoutError,
+)
+from .execution_context import (
+    clear_context,
+    get_context,
+    set_cancellation_token,
+    set_context,
+)
 from .models.execute_plan import (
+    CompiledPlan,
     Flow,
-    FlowConnection,
+    FlowStep,
     KeywordInstance,
+    compile_execution_plan,
+    compile_plan_data,
+    describe_parse_error,
     execute_plan_from_json,
 )
-from .models.execution_result import ExecutionResultData, FlowResult, StatusEnum
+from .models.execution_result import (
+    ExecutionResultData,
+    FlowResult,
+    FlowResultSink,
+    StatusEnum,
+)
 from .models.execution_run_mode_types import ExecutionPlanRunMode
 from .models.websocket_event_types import WebSocketEventType
-from .utils.event_sender import completed_execution, progress_event
+from .process_pool import KeywordProcessPool
+from .utils.event_sender import EventSender, default_sender
+from .utils.log_values import LOG_VALUE_MAX_LENGTH, ExecutionLogVerbosity, LogValue
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for stopped runs to finish
+STOP_TIMEOUT_SECONDS = 10.0
+# Stops remembered for runs that have not started yet
+MAX_PENDING_STOPS = 64
+
 # Type aliases
 ResultCallback = Callable[[int, int, Dict[str, Any]], Optional[Any]]
-StatusCallback = Callable[[bool], None]
+# Called with (project_id, run_id, flow result) as each flow result is added
+FlowResultCallback = Callable[[Any, Any, Dict[str, Any]], None]
+# Called with (busy, run_id) when a run finishes
+StatusCallback = Callable[[bool, Union[int, str]], None]
 StepOutputs = Dict[int, Dict[int, Any]]
+# A plan as a JSON string, an already-decoded dict, a compiled plan, or a
+# future of one of these while the plan is still being fetched
+ExecutionPlanSource = Union[str, Dict[str, Any], CompiledPlan, Future]
+# Status (FAILED, TIMEOUT or ABORTED) and message of a step that did not pass
+StepError = Tuple[StatusEnum, str]
+StepFailure = Tuple[FlowStep, StatusEnum, str]
+
+
+@dataclass
+class RunHandle:
+    """Thread and stop event of a single in-progress run."""
+
+    run_id: Union[int, str]
+    thread: threading.Thread
+    stop_event: threading.Event
 
 
 class ExecutionManager:
@@ -37,6 +98,17 @@ class ExecutionManager:
     Supports two modes:
     - 'websocket': Connected to server, sends results via callbacks
     - 'local': Standalone execution, stores results locally
+
+    Several runs may execute at the same time, each on its own thread with
+    its own stop event. ``stop()`` stops all of them; ``stop_run()`` one.
+
+    Keywords are called on a helper thread while the execution thread waits
+    on the step's cancellation token, so a stop request or step timeout is
+    honoured even when a keyword hangs: the step is marked ABORTED or TIMEOUT
+    and the run finishes and reports its result. Each run has one such call
+    thread, which also runs its before- and after-run hooks; it is replaced
+    after a keyword is abandoned, and parallel steps and flows run on their
+    own call threads.
     """
 
     def __init__(
@@ -44,6 +116,13 @@ class ExecutionManager:
         send_result_callback: Optional[ResultCallback] = None,
         update_status_callback: Optional[StatusCallback] = None,
         mode: str = "websocket",
+        max_parallel_steps: int = 1,
+        max_parallel_flows: int = 1,
+        max_process_workers: Optional[int] = None,
+        execution_log_verbosity: str = ExecutionLogVerbosity.SUMMARY.value,
+        event_sender: Optional[EventSender] = None,
+        flow_result_callback: Optional[FlowResultCallback] = None,
+        notify_completion: bool = True,
     ) -> None:
         """Initialize ExecutionManager with configurable mode.
 
@@ -51,16 +130,54 @@ class ExecutionManager:
             send_result_callback: Callback for sending results (websocket mode)
             update_status_callback: Callback for status updates (websocket mode)
             mode: 'websocket' or 'local' - determines how results are handled
+            max_parallel_steps: Maximum number of independent steps of a flow to
+                run concurrently. 1 (default) runs steps strictly in sequence.
+            max_parallel_flows: Maximum number of flows of a run to execute
+                concurrently. 1 (default) runs flows strictly in sequence.
+            max_process_workers: Worker processes for keywords registered with
+                ``run_in_process=True`` (default: CPU count). The pool starts on
+                the first such call.
+            execution_log_verbosity: How step parameter and output values are
+                logged: 'off' (step names only), 'summary' (values truncated,
+                default) or 'full'. Values are only formatted when logged.
+            event_sender: Sender for progress and completion events in
+                websocket mode (default: the process-wide sender)
+            flow_result_callback: Receives each flow result as it is
+                recorded. Results then stream out through it, and the run
+                result only reports their ``flowResultCount``.
+            notify_completion: Send AGENT_EXECUTION_COMPLETED in websocket mode
+                once ``send_result_callback`` returns. Turn off when that
+                callback uploads in the background and notifies completion
+                itself once the server has accepted the result.
 
         Raises:
             ValueError: If websocket mode is selected without required callbacks
+                or the log verbosity is unknown
         """
         self.execution_tracker: Dict[str, Dict[str, Any]] = {}
         self.execution_tracker_lock = threading.Lock()
         self.execution_thread: Optional[threading.Thread] = None
         self.stop_execution = threading.Event()
+        self._runs: Dict[str, RunHandle] = {}
+        # Stops that arrived before their run started, oldest first
+        self._pending_stops: "OrderedDict[str, None]" = OrderedDict()
+        self.process_pool = KeywordProcessPool(max_workers=max_process_workers)
+        self.async_runner = AsyncLoopRunner()
+        self._call_threads = threading.local()
+        self._runs_lock = threading.Lock()
         self.mode = mode
+        self.max_parallel_steps = max(1, max_parallel_steps)
+        self.max_parallel_flows = max(1, max_parallel_flows)
+        self.execution_log_verbosity = ExecutionLogVerbosity(execution_log_verbosity)
+        self._log_value_max_length: Optional[int] = (
+            None
+            if self.execution_log_verbosity == ExecutionLogVerbosity.FULL
+            else LOG_VALUE_MAX_LENGTH
+        )
         self.local_results: Dict[str, Dict[str, Any]] = {}
+        self.event_sender = event_sender or default_sender
+        self.flow_result_callback = flow_result_callback
+        self.notify_completion = notify_completion
 
         if mode == "websocket":
             if not send_result_callback or not update_status_callback:
@@ -69,32 +186,51 @@ class ExecutionManager:
             self.update_status_callback = update_status_callback
         else:
             self.send_result_callback = self._store_local_result
-            self.update_status_callback = lambda status: None
+            self.update_status_callback = lambda status, run_id: None
 
     def start_execution(
         self,
         project_id: Union[int, str],
         run_id: Union[int, str],
-        execution_plan_json: str,
-    ) -> None:
+        execution_plan_json: ExecutionPlanSource,
+    ) -> threading.Thread:
         """Start execution of a plan in a background thread.
 
         Args:
             project_id: Project identifier
             run_id: Run identifier
-            execution_plan_json: JSON string of the execution plan
+            execution_plan_json: Execution plan as a JSON string, as an
+                already-decoded dict (parsed lazily, without a JSON round trip)
+                or as a compiled plan (e.g. from the plan cache). A future
+                resolving to one of these lets the run start while the plan
+                is still being fetched; it is awaited after the before-run
+                hooks.
+
+        Returns:
+            The thread executing the run; it stops at once if ``stop_run()``
+            was called for the run before it started
         """
         self.stop_execution.clear()
-        self.execution_thread = threading.Thread(
+        thread = threading.Thread(
             target=self._process_plan,
             args=(project_id, run_id, execution_plan_json),
             name=f"ExecutionThread-{run_id}",
         )
-        self.execution_thread.start()
+        stop_event = threading.Event()
+        with self._runs_lock:
+            if str(run_id) in self._pending_stops:
+                del self._pending_stops[str(run_id)]
+                stop_event.set()
+            self._runs[str(run_id)] = RunHandle(run_id, thread, stop_event)
+        if stop_event.is_set():
+            logger.info(f"Run {run_id} was stopped before it started")
+        self.execution_thread = thread
+        thread.start()
+        return thread
 
     def execute_local(
         self,
-        execution_plan_json: Union[str, Dict[str, Any]],
+        execution_plan_json: ExecutionPlanSource,
         project_id: str = "local",
         run_id: Optional[str] = None,
     ) -> Dict[str, Any]:
@@ -111,14 +247,7 @@ class ExecutionManager:
         if run_id is None:
             run_id = str(uuid.uuid4())
 
-        # Convert dict to JSON string if needed
-        if isinstance(execution_plan_json, dict):
-            execution_plan_json = json.dumps(execution_plan_json)
-
-        self.start_execution(project_id, run_id, execution_plan_json)
-
-        if self.execution_thread:
-            self.execution_thread.join()
+        self.start_execution(project_id, run_id, execution_plan_json).join()
 
         return self.local_results.get(run_id, {})
 
@@ -135,35 +264,107 @@ class ExecutionManager:
             "result": result,
         }
 
-    def stop(self) -> None:
-        """Stop the current execution."""
+    def stop(self, timeout: float = STOP_TIMEOUT_SECONDS) -> None:
+        """Stop all running executions.
+
+        Args:
+            timeout: Seconds to wait for all runs together to finish
+        """
         self.stop_execution.set()
-        if self.execution_thread and self.execution_thread.is_alive():
-            logger.info("Waiting for execution thread to stop...")
-            self.execution_thread.join(timeout=10)
+        with self._runs_lock:
+            handles = list(self._runs.values())
+        for handle in handles:
+            handle.stop_event.set()
+
+        threads = [handle.thread for handle in handles]
+        if self.execution_thread and self.execution_thread not in threads:
+            threads.append(self.execution_thread)
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            if thread.is_alive():
+                logger.info(f"Waiting for execution thread {thread.name} to stop...")
+                thread.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    def shutdown(self) -> None:
+        """Stop all executions and release worker processes and the event loop."""
+        self.stop()
+        self.process_pool.shutdown()
+        self.async_runner.shutdown()
+
+    def stop_run(self, run_id: Union[int, str], wait: bool = True) -> None:
+        """Stop a single running execution, leaving other runs untouched.
+
+        A stop for a run that has not started yet is remembered, and the run
+        stops as soon as ``start_execution()`` starts it.
+
+        Args:
+            run_id: Run to stop
+            wait: Wait up to STOP_TIMEOUT_SECONDS for the run to finish;
+                otherwise return once it has been asked to stop
+        """
+        with self._runs_lock:
+            handle = self._runs.get(str(run_id))
+            if handle is None:
+                self._pending_stops[str(run_id)] = None
+                while len(self._pending_stops) > MAX_PENDING_STOPS:
+                    self._pending_stops.popitem(last=False)
+        if handle is None:
+            logger.info(f"Run {run_id} is not running; it stops if it starts later")
+            return
 
-    def is_running(self) -> bool:
-        """Check if execution is currently running."""
+        handle.stop_event.set()
+        if wait and handle.thread.is_alive():
+            logger.info(f"Waiting for execution of run {run_id} to stop...")
+            handle.thread.join(timeout=STOP_TIMEOUT_SECONDS)
+
+    def is_running(self, run_id: Optional[Union[int, str]] = None) -> bool:
+        """Check if an execution (or the given run) is currently running."""
+        with self._runs_lock:
+            if run_id is not None:
+                handle = self._runs.get(str(run_id))
+                return bool(handle and handle.thread.is_alive())
+            if any(handle.thread.is_alive() for handle in self._runs.values()):
+                return True
         return bool(self.execution_thread and self.execution_thread.is_alive())
 
+    def active_run_ids(self) -> List[Union[int, str]]:
+        """Get the IDs of runs currently executing."""
+        with self._runs_lock:
+            return [handle.run_id for handle in self._runs.values()]
+
+    def _get_stop_event(self, run_id: Union[int, str]) -> threading.Event:
+        """Get the stop event of a run (the global one if not registered)."""
+        handle = self._runs.get(str(run_id))
+        if handle is None:
+            return self.stop_execution
+        return handle.stop_event
+
+    def _is_stopped(self, run_id: Union[int, str]) -> bool:
+        """Check whether the given run has been asked to stop."""
+        return self._get_stop_event(run_id).is_set()
+
     def _process_plan(
         self,
         project_id: Union[int, str],
         run_id: Union[int, str],
-        execution_plan_json: str,
+        execution_plan_json: ExecutionPlanSource,
     ) -> None:
         """Process and execute an execution plan.
 
         Args:
             project_id: Project identifier
             run_id: Run identifier
-            execution_plan_json: JSON string of the execution plan
+            execution_plan_json: JSON string, decoded dict, compiled plan or
+                a future of one of these
         """
         logger.info(
             f"Processing execution plan for run {run_id} in project {project_id}"
         )
         set_context(run_id, project_id)
-        result_data = ExecutionResultData(run_id)
+        sink: Optional[FlowResultSink] = None
+        if self.flow_result_callback is not None:
+            sink = functools.partial(self.flow_result_callback, project_id, run_id)
+        result_data = ExecutionResultData(run_id, flow_result_sink=sink)
 
         executed_steps: Set[Tuple[int, int]] = set()
 
@@ -172,70 +373,59 @@ class ExecutionManager:
             for hook in before_run_hooks:
                 try:
                     logger.info(f"Running before hook: {hook.__name__}")
-                    hook()
+                    self._run_hook(hook)
                 except Exception as e:
                     logger.error(f"Before hook {hook.__name__} failed: {e}")
                     raise
 
-            if not execution_plan_json:
-                raise ValueError("Empty execution plan JSON")
+            if isinstance(execution_plan_json, Future):
+                # Fetched on another thread while the hooks ran
+                execution_plan_json = self._wait_for_plan(run_id, execution_plan_json)
 
-            keyword_instances, flows = execute_plan_from_json(execution_plan_json)
+            if isinstance(execution_plan_json, CompiledPlan):
+                plan = execution_plan_json
+            elif not execution_plan_json:
+                raise ValueError("Empty execution plan JSON")
+            elif isinstance(execution_plan_json, dict):
+                plan = compile_plan_data(execution_plan_json)
+            else:
+                keyword_instances, flows = execute_plan_from_json(execution_plan_json)
+                plan = compile_execution_plan(keyword_instances, flows)
 
             result_data.start_execution()
 
             with self.execution_tracker_lock:
                 self.execution_tracker[str(run_id)] = {
-                    "startDateTime": datetime.now(timezone.utc).isoformat(),
+                    "startDateTime": datetime.now(timezone.utc),
                     "endDateTime": None,
                     "flowResults": [],
                 }
 
-            execution_aborted = False
-            for flow in flows:
-                if self.stop_execution.is_set() or execution_aborted:
-                    break
-
-                # Check if flow should be skipped
-                if flow.runMode == ExecutionPlanRunMode.Skip.value:
-                    flow_result = self._create_skipped_flow_result(flow)
-                    result_data.add_flow_result(flow_result)
-                    self._record_flow_result(run_id, flow_result)
-                    logger.info(f"Flow {flow.name} skipped due to Skip mode.")
-                    continue
-
-                flow_result = self._execute_flow(
-                    run_id, flow, keyword_instances, executed_steps
+            if self.max_parallel_flows > 1:
+                execution_aborted = self._execute_flows_parallel(
+                    run_id, plan, executed_steps, result_data
+                )
+            else:
+                execution_aborted = self._execute_flows_sequential(
+                    run_id, plan, executed_steps, result_data
                 )
-                result_data.add_flow_result(flow_result)
-                self._record_flow_result(run_id, flow_result)
-
-                # Check if this flow failed and has AbortOnFailure mode
-                if (
-                    flow_result.status == StatusEnum.FAILED
-                    and flow.runMode == ExecutionPlanRunMode.AbortOnFailure.value
-                ):
-                    execution_aborted = True
-                    logger.info(
-                        f"Flow {flow.name} failed with AbortOnFailure mode. "
-                        "Aborting remaining flows."
-                    )
-                    break
 
             # Handle aborted steps
-            if self.stop_execution.is_set() or execution_aborted:
-                self._mark_aborted_steps(run_id, flows, executed_steps, result_data)
+            if self._is_stopped(run_id) or execution_aborted:
+                self._mark_aborted_steps(
+                    run_id, plan.flows, executed_steps, result_data
+                )
 
             result_data.end_execution()
             with self.execution_tracker_lock:
                 self.execution_tracker[str(run_id)]["endDateTime"] = datetime.now(
                     timezone.utc
-                ).isoformat()
+                )
 
             self.send_result_callback(project_id, run_id, result_data.to_dict())
             with self.execution_tracker_lock:
-                if self.mode == "websocket":
-                    completed_execution(
+                if self.mode == "websocket" and self.notify_completion:
+                    self.event_sender.completed_execution(
                         WebSocketEventType.AGENT_EXECUTION_COMPLETED_NOTIFY,
                         run_id,
                         self.execution_tracker,
@@ -248,17 +438,173 @@ class ExecutionManager:
             for hook in after_run_hooks:
                 try:
                     logger.info(f"Running after hook: {hook.__name__}")
-                    hook()
+                    self._run_hook(hook)
                 except Exception as e:
                     logger.error(f"After hook {hook.__name__} failed: {e}")
             clear_context()
-            self.update_status_callback(False)
+            self._release_call_thread()
+            with self._runs_lock:
+                self._runs.pop(str(run_id), None)
+            self.update_status_callback(False, run_id)
+
+    def _wait_for_plan(
+        self, run_id: Union[int, str], plan_future: Future
+    ) -> ExecutionPlanSource:
+        """Wait for a plan being fetched, without blocking past a stop request.
+
+        Raises:
+            ExecutionError: If the run was stopped first
+            Exception: Whatever the plan fetch raised
+        """
+        while True:
+            try:
+                return plan_future.result(timeout=POLL_INTERVAL_SECONDS)
+            except FutureTimeoutError:
+                if plan_future.done():
+                    raise
+            if self._is_stopped(run_id):
+                plan_future.cancel()
+                raise ExecutionError(
+                    f"Run {run_id} stopped before its execution plan was fetched"
+                )
+
+    def _execute_flows_sequential(
+        self,
+        run_id: Union[int, str],
+        plan: CompiledPlan,
+        executed_steps: Set[Tuple[int, int]],
+        result_data: ExecutionResultData,
+    ) -> bool:
+        """Execute the flows of a plan one after another.
+
+        Args:
+            run_id: Run identifier
+            plan: Compiled execution plan
+            executed_steps: Set of already executed steps
+            result_data: Execution result data to update
+
+        Returns:
+            True if execution was aborted by an AbortOnFailure flow
+        """
+        for flow in plan.flows:
+            if self._is_stopped(run_id):
+                break
+
+            # Check if flow should be skipped
+            if flow.runMode == ExecutionPlanRunMode.Skip.value:
+                flow_result = self._create_skipped_flow_result(flow)
+                result_data.add_flow_result(flow_result)
+                self._record_flow_result(run_id, flow_result)
+                logger.info(f"Flow {flow.name} skipped due to Skip mode.")
+                continue
+
+            flow_result = self._execute_flow(run_id, flow, plan, executed_steps)
+            result_data.add_flow_result(flow_result)
+            self._record_flow_result(run_id, flow_result)
+
+            if self._aborts_run(flow, flow_result):
+                return True
+
+        return False
+
+    def _execute_flows_parallel(
+        self,
+        run_id: Union[int, str],
+        plan: CompiledPlan,
+        executed_steps: Set[Tuple[int, int]],
+        result_data: ExecutionResultData,
+    ) -> bool:
+        """Execute independent flows of a plan concurrently on a bounded pool.
+
+        Flows run concurrently until an AbortOnFailure flow is reached, which
+        acts as a barrier: it starts only after every earlier flow finished,
+        and later flows start only after it passed. Flow results are added to
+        ``result_data`` in plan order regardless of completion order.
+
+        Args:
+            run_id: Run identifier
+            plan: Compiled execution plan
+            executed_steps: Set of already executed steps
+            result_data: Execution result data to update
+
+        Returns:
+            True if execution was aborted by an AbortOnFailure flow
+        """
+        context = get_context()
+
+        def run_flow(flow: Flow) -> Optional[FlowResult]:
+            if self._is_stopped(run_id):
+                return None
+            set_context(context["run_id"], context["project_id"])
+            try:
+                flow_result = self._execute_flow(run_id, flow, plan, executed_steps)
+            finally:
+                clear_context()
+                self._release_call_thread()
+            self._record_flow_result(run_id, flow_result)
+            return flow_result
+
+        pending: List[Future] = []
+
+        def drain() -> None:
+            for future in pending:
+                flow_result = future.result()
+                if flow_result is not None:
+                    result_data.add_flow_result(flow_result)
+            pending.clear()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_parallel_flows,
+            thread_name_prefix=f"FlowWorker-{run_id}",
+        ) as pool:
+            try:
+                for flow in plan.flows:
+                    if self._is_stopped(run_id):
+                        break
+
+                    if flow.runMode == ExecutionPlanRunMode.Skip.value:
+                        skipped: Future = Future()
+                        skipped.set_result(self._create_skipped_flow_result(flow))
+                        self._record_flow_result(run_id, skipped.result())
+                        logger.info(f"Flow {flow.name} skipped due to Skip mode.")
+                        pending.append(skipped)
+                        continue
+
+                    if flow.runMode != ExecutionPlanRunMode.AbortOnFailure.value:
+                        pending.append(pool.submit(run_flow, flow))
+                        continue
+
+                    # AbortOnFailure flows run alone, after all earlier flows
+                    drain()
+                    flow_result = run_flow(flow)
+                    if flow_result is None:
+                        break
+                    result_data.add_flow_result(flow_result)
+                    if self._aborts_run(flow, flow_result):
+                        return True
+            finally:
+                drain()
+
+        return False
+
+    def _aborts_run(self, flow: Flow, flow_result: FlowResult) -> bool:
+        """Check whether a flow result aborts the remaining flows of the run."""
+        if (
+            flow_result.status in (StatusEnum.FAILED, StatusEnum.TIMEOUT)
+            and flow.runMode == ExecutionPlanRunMode.AbortOnFailure.value
+        ):
+            logger.info(
+                f"Flow {flow.name} failed with AbortOnFailure mode. "
+                "Aborting remaining flows."
+            )
+            return True
+        return False
 
     def _execute_flow(
         self,
         run_id: Union[int, str],
         flow: Flow,
-        keyword_instances: List[KeywordInstance],
+        plan: Union[CompiledPlan, List[KeywordInstance]],
         executed_steps: Set[Tuple[int, int]],
     ) -> FlowResult:
         """Execute a single flow.
@@ -266,175 +612,414 @@ class ExecutionManager:
         Args:
             run_id: Run identifier
             flow: Flow to execute
-            keyword_instances: List of keyword instances
+            plan: Compiled plan (or a plain list of keyword instances)
             executed_steps: Set of already executed steps
 
         Returns:
             FlowResult containing execution outcome
         """
-        from .decorators import keyword_registry
+        if not isinstance(plan, CompiledPlan):
+            plan = compile_execution_plan(plan, [flow])
 
         flow_result = FlowResult(flow.id, flow.name)
         flow_result.started_execution()
         flow_result.set_status(StatusEnum.RUNNING)
 
         if self.mode == "websocket":
-            progress_event(
+            self.event_sender.progress_event(
                 WebSocketEventType.AGENT_EXECUTION_PROGRESS_NOTIFY, run_id, flow_result
             )
 
-        flow_failed = False
         step_outputs: StepOutputs = {}
+        failure: Optional[StepFailure] = None
+        # Set on flows that could not be parsed
+        flow_error = getattr(flow, "error", None)
+        if isinstance(flow_error, str):
+            flow_result.set_message(flow_error)
+            flow_result.set_status(StatusEnum.FAILED)
+        elif self.max_parallel_steps > 1 and len(flow.steps) > 1:
+            failure = self._execute_steps_parallel(
+                run_id, flow, plan, executed_steps, step_outputs
+            )
+        else:
+            failure = self._execute_steps_sequential(
+                run_id, flow, plan, executed_steps, step_outputs
+            )
+
+        if failure is not None:
+            failed_step, status, error_msg = failure
+            flow_result.set_failed_on_step_id(failed_step.sequenceOrder)
+            flow_result.set_message(error_msg)
+            flow_result.set_status(status)
+        elif not isinstance(flow_error, str):
+            flow_result.set_status(StatusEnum.PASSED)
+
+        flow_result.completed_execution()
+        if self.mode == "websocket":
+            self.event_sender.progress_event(
+                WebSocketEventType.AGENT_EXECUTION_PROGRESS_NOTIFY, run_id, flow_result
+            )
+
+        return flow_result
+
+    def _execute_steps_sequential(
+        self,
+        run_id: Union[int, str],
+        flow: Flow,
+        plan: CompiledPlan,
+        executed_steps: Set[Tuple[int, int]],
+        step_outputs: StepOutputs,
+    ) -> Optional[StepFailure]:
+        """Execute flow steps one after another, stopping at the first failure.
 
+        Returns:
+            The failed step, its status and failure message, or None if no
+            step failed
+        """
         for step in flow.steps:
-            if self.stop_execution.is_set():
+            if self._is_stopped(run_id):
                 break
 
             executed_steps.add((flow.id, step.instanceId))
-            instance = next(
-                (i for i in keyword_instances if i.id == step.instanceId), None
-            )
+            error = self._execute_step(run_id, flow, step, plan, step_outputs)
+            if error is not None:
+                return step, error[0], error[1]
 
-            if not instance:
-                flow_result.set_failed_on_step_id(step.sequenceOrder)
-                flow_result.set_message("Keyword instance not found")
-                flow_result.set_status(StatusEnum.FAILED)
-                flow_failed = True
-                break
+        return None
 
-            func = keyword_registry.get(instance.keywordName)
-            if not func:
-                flow_result.set_failed_on_step_id(step.sequenceOrder)
-                flow_result.set_message(
-                    f"Function for {instance.keywordName} not found"
-                )
-                flow_result.set_status(StatusEnum.FAILED)
-                flow_failed = True
-                break
+    def _execute_steps_parallel(
+        self,
+        run_id: Union[int, str],
+        flow: Flow,
+        plan: CompiledPlan,
+        executed_steps: Set[Tuple[int, int]],
+        step_outputs: StepOutputs,
+    ) -> Optional[StepFailure]:
+        """Execute independent flow steps concurrently on a bounded thread pool.
 
+        A step is submitted once every step feeding one of its inputs has
+        passed. Ready steps are submitted in ``sequence_order``. After a failure
+        or a stop request no new steps are started; steps already running are
+        allowed to finish. When several steps fail, the one with the lowest
+        ``sequence_order`` is reported, matching sequential execution.
+
+        Returns:
+            The failed step, its status and failure message, or None if no
+            step failed
+        """
+        steps_by_id = {step.id: step for step in flow.steps}
+        dependencies = plan.get_step_dependencies(flow)
+        waiting_on = {
+            step.id: set(dependencies.get(step.id, ())) for step in flow.steps
+        }
+        dependents: Dict[int, List[int]] = {}
+        for step_id, upstream in waiting_on.items():
+            for upstream_id in upstream:
+                dependents.setdefault(upstream_id, []).append(step_id)
+
+        ready = [step for step in flow.steps if not waiting_on[step.id]]
+        running: Dict[Future, FlowStep] = {}
+        failures: List[StepFailure] = []
+        context = get_context()
+
+        def run_step(step: FlowStep) -> Optional[StepError]:
+            set_context(context["run_id"], context["project_id"], step.id)
             try:
-                # Strict validation: Check JSON params match keyword definition
-                self._validate_parameters(
-                    keyword_name=instance.keywordName,
-                    func=func,
-                    json_params=instance.params,
-                )
-                # Build kwargs for function call - only include input parameters
-                kwargs: Dict[str, Any] = {}
-                input_params = []
-                output_params = []
-
-                for param in instance.params:
-                    # Handle case-insensitive direction
-                    param_direction = getattr(param, "direction", "input")
-                    param_direction = (
-                        param_direction.lower() if param_direction else "input"
-                    )
+                return self._execute_step(run_id, flow, step, plan, step_outputs)
+            finally:
+                clear_context()
+                self._release_call_thread()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_parallel_steps,
+            thread_name_prefix=f"StepWorker-{flow.id}",
+        ) as pool:
+            while ready or running:
+                if not failures and not self._is_stopped(run_id):
+                    ready.sort(key=lambda s: s.sequenceOrder)
+                    for step in ready:
+                        executed_steps.add((flow.id, step.instanceId))
+                        running[pool.submit(run_step, step)] = step
+                ready = []
+
+                if not running:
+                    break
 
-                    if param_direction == "input":
-                        input_params.append(param)
-                        # Check if this input has a connection from a previous step
-                        param_value = self._get_connected_value(
-                            flow.connections, step.id, param.id, step_outputs
-                        )
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    error = future.result()
+                    if error is not None:
+                        failures.append((step, error[0], error[1]))
+                        continue
+                    for dependent_id in dependents.get(step.id, ()):
+                        waiting_on[dependent_id].discard(step.id)
+                        if not waiting_on[dependent_id]:
+                            ready.append(steps_by_id[dependent_id])
+
+        if failures:
+            return min(failures, key=lambda failure: failure[0].sequenceOrder)
+        return None
 
-                        # Use connected value if available, otherwise use default
-                        if param_value is None:
-                            param_value = param.value
-                        else:
-                            logger.info(
-                                f"Step {instance.keywordName}: Using connected value "
-                                f"for param '{param.name}': {param_value}"
-                            )
-
-                        # Validate mandatory parameters
-                        if param.isMandatory and param_value is None:
-                            raise ValueError(
-                                f"Mandatory parameter '{param.name}' has no value"
-                            )
-
-                        kwargs[param.name] = param_value
-                    else:
-                        output_params.append(param)
-
-                # Validate function signature before execution
-                sig = inspect.signature(func)
-                func_params = list(sig.parameters.keys())
+    def _execute_step(
+        self,
+        run_id: Union[int, str],
+        flow: Flow,
+        step: FlowStep,
+        plan: CompiledPlan,
+        step_outputs: StepOutputs,
+    ) -> Optional[StepError]:
+        """Execute a single step of a flow.
 
-                logger.info(
-                    f"Executing step {instance.keywordName} with parameters: "
-                    f"{kwargs}, expected: {func_params}"
+        Args:
+            run_id: Run identifier
+            flow: Flow the step belongs to
+            step: Step to execute
+            plan: Compiled execution plan
+            step_outputs: Dictionary of stored outputs {step_id: {param_id: value}}
+
+        Returns:
+            None if the step passed, otherwise its status and failure message
+        """
+        from .decorators import keyword_registry
+
+        try:
+            instance = plan.get_instance(step.instanceId)
+        except (KeyError, TypeError, ValueError) as e:
+            # Instances of a lazily compiled plan are parsed on first use
+            return (
+                StatusEnum.FAILED,
+                f"Invalid keyword instance {step.instanceId}: "
+                f"{describe_parse_error(e)}",
+            )
+        if not instance:
+            return StatusEnum.FAILED, "Keyword instance not found"
+
+        func = keyword_registry.get(instance.keywordName)
+        if not func:
+            return StatusEnum.FAILED, f"Function for {instance.keywordName} not found"
+
+        try:
+            descriptor = get_call_descriptor(func)
+
+            # Strict validation: Check JSON params match keyword definition
+            self._validate_parameters(
+                keyword_name=instance.keywordName,
+                func=func,
+                json_params=instance.params,
+            )
+            # Build kwargs for function call - only include input parameters
+            kwargs: Dict[str, Any] = {}
+            input_params = []
+            output_params = []
+
+            for param in instance.params:
+                # Handle case-insensitive direction
+                param_direction = getattr(param, "direction", "input")
+                param_direction = (
+                    param_direction.lower() if param_direction else "input"
                 )
 
-                # Check if all required function parameters are provided
-                for func_param in func_params:
-                    param_obj = sig.parameters[func_param]
-                    if param_obj.kind in (
-                        inspect.Parameter.VAR_POSITIONAL,
-                        inspect.Parameter.VAR_KEYWORD,
-                    ):
-                        continue
-                    if (
-                        param_obj.default == inspect.Parameter.empty
-                        and func_param not in kwargs
-                    ):
-                        logger.warning(
-                            f"Function '{instance.keywordName}' expects parameter "
-                            f"'{func_param}' but it was not provided"
+                if param_direction == "input":
+                    input_params.append(param)
+                    # Check if this input has a connection from a previous step
+                    param_value = self._get_connected_value(
+                        plan, flow, step.id, param.id, step_outputs
+                    )
+
+                    # Use connected value if available, otherwise use default
+                    if param_value is None:
+                        param_value = param.value
+                    elif self._logs_values():
+                        logger.info(
+                            "Step %s: Using connected value for param '%s': %s",
+                            instance.keywordName,
+                            param.name,
+                            self._log_value(param_value),
                         )
 
-                # Check for unexpected parameters
-                unexpected_params = set(kwargs.keys()) - set(func_params)
-                has_var_kwargs = any(
-                    p.kind == inspect.Parameter.VAR_KEYWORD
-                    for p in sig.parameters.values()
+                    # Validate mandatory parameters
+                    if param.isMandatory and param_value is None:
+                        raise ValueError(
+                            f"Mandatory parameter '{param.name}' has no value"
+                        )
+
+                    kwargs[param.name] = param_value
+                else:
+                    output_params.append(param)
+
+            # Check if all required function parameters are provided
+            for func_param in descriptor.required_args - kwargs.keys():
+                logger.warning(
+                    f"Function '{instance.keywordName}' expects parameter "
+                    f"'{func_param}' but it was not provided"
                 )
-                if unexpected_params and not has_var_kwargs:
+
+            # Check for unexpected parameters
+            if not descriptor.accepts_var_kwargs:
+                unexpected_params = kwargs.keys() - set(descriptor.arg_names)
+                if unexpected_params:
                     logger.warning(
                         f"Function '{instance.keywordName}' received unexpected "
                         f"parameters: {unexpected_params}"
                     )
 
-                # Execute the keyword function
+            # Execute the keyword function
+            if self._logs_values():
                 logger.info(
-                    f"Executing step {instance.keywordName} with kwargs: {kwargs}"
+                    "Executing step %s with kwargs: %s",
+                    instance.keywordName,
+                    self._log_value(kwargs),
                 )
-                result = func(**kwargs)
+            else:
+                logger.info("Executing step %s", instance.keywordName)
+            token = CancellationToken(
+                self._get_stop_event(run_id), self._resolve_timeout(step, descriptor)
+            )
+            result = self._call_keyword(
+                func, instance.keywordName, descriptor, kwargs, token
+            )
 
-                logger.debug(f"Output params: {output_params}")
+            logger.debug("Output params: %s", LogValue([p.name for p in output_params]))
 
-                # Store and validate output parameters
-                self._process_output_params(
-                    step, instance, output_params, result, step_outputs
-                )
+            # Store and validate output parameters
+            self._process_output_params(
+                step, instance, output_params, result, step_outputs
+            )
 
-            except ParameterValidationError as e:
-                # Strict validation failure - parameter mismatch
-                logger.error(f"Parameter validation failed: {e.detailed_message}")
-                flow_result.set_failed_on_step_id(step.sequenceOrder)
-                flow_result.set_message(e.detailed_message)
-                flow_result.set_status(StatusEnum.FAILED)
-                flow_failed = True
-                break
+        except ParameterValidationError as e:
+            # Strict validation failure - parameter mismatch
+            logger.error(f"Parameter validation failed: {e.detailed_message}")
+            return StatusEnum.FAILED, e.detailed_message
 
-            except Exception as e:
-                error_msg = self._enhance_error_message(str(e), func)
-                flow_result.set_failed_on_step_id(step.sequenceOrder)
-                flow_result.set_message(error_msg)
-                flow_result.set_status(StatusEnum.FAILED)
-                flow_failed = True
-                break
+        except StepTimeoutError as e:
+            logger.error(f"Step {instance.keywordName}: {e}")
+            return StatusEnum.TIMEOUT, str(e)
 
-        if not flow_failed:
-            flow_result.set_status(StatusEnum.PASSED)
+        except StepCancelledError as e:
+            logger.info(f"Step {instance.keywordName}: {e}")
+            return StatusEnum.ABORTED, str(e)
 
-        flow_result.completed_execution()
-        if self.mode == "websocket":
-            progress_event(
-                WebSocketEventType.AGENT_EXECUTION_PROGRESS_NOTIFY, run_id, flow_result
+        except Exception as e:
+            return StatusEnum.FAILED, self._enhance_error_message(str(e), func)
+
+        return None
+
+    @staticmethod
+    def _resolve_timeout(
+        step: FlowStep, descriptor: KeywordCallDescriptor
+    ) -> Optional[float]:
+        """Get the step's timeout from the plan, else the keyword's."""
+        step_timeout = getattr(step, "timeout", None)
+        if isinstance(step_timeout, (int, float)) and step_timeout > 0:
+            return float(step_timeout)
+        return descriptor.timeout
+
+    def _call_keyword(
+        self,
+        func: Callable,
+        keyword_name: str,
+        descriptor: KeywordCallDescriptor,
+        kwargs: Dict[str, Any],
+        token: CancellationToken,
+    ) -> Any:
+        """Run a keyword on its backend and wait for it under the step's token.
+
+        Raises:
+            StepTimeoutError: If the step timed out
+            StepCancelledError: If the run was stopped
+        """
+        if descriptor.run_in_process:
+            future = self.process_pool.submit(func, keyword_name, kwargs)
+        elif descriptor.is_async:
+            future = self.async_runner.submit(
+                self._await_with_context(get_context(), token, func, kwargs)
             )
+        else:
+            future = self._submit_call(get_context(), token, func, kwargs)
 
-        return flow_result
+        try:
+            return wait_for_future(future, token)
+        except (StepTimeoutError, StepCancelledError):
+            if descriptor.run_in_process:
+                # The hung call keeps its worker; replace the workers
+                self.process_pool.abandon(future)
+            elif not descriptor.is_async:
+                # The hung call keeps its thread; use a fresh one from now on
+                self._release_call_thread()
+            raise
+
+    def _run_hook(self, hook: Callable) -> None:
+        """Run a before- or after-run hook on the run's keyword call thread.
+
+        Keywords of sequential steps run on that thread too, so thread-local
+        state a hook sets up (a DB connection, a browser session) is visible
+        to them.
+        """
+        self._submit_call(get_context(), CancellationToken(), hook, {}).result()
+
+    def _submit_call(
+        self,
+        context: Dict[str, Any],
+        token: CancellationToken,
+        func: Callable,
+        kwargs: Dict[str, Any],
+    ) -> Future:
+        """Queue a call on the keyword call thread serving this thread."""
+        call_args = (context, token, func, kwargs)
+        try:
+            return self._get_call_thread().submit(self._call_with_context, *call_args)
+        except RuntimeError:
+            # The call thread exited after idling; a new one is started
+            return self._get_call_thread().submit(self._call_with_context, *call_args)
+
+    @staticmethod
+    def _call_with_context(
+        context: Dict[str, Any],
+        token: CancellationToken,
+        func: Callable,
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """Call a keyword on a call thread with the caller's execution context."""
+        set_context(context["run_id"], context["project_id"], context["step_id"])
+        set_cancellation_token(token)
+        try:
+            return func(**kwargs)
+        finally:
+            clear_context()
+
+    @staticmethod
+    async def _await_with_context(
+        context: Dict[str, Any],
+        token: CancellationToken,
+        func: Callable,
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """Await an async keyword with the caller's execution context.
+
+        The context is set inside the coroutine's own task, so keywords
+        running concurrently on the shared loop do not see each other's.
+        """
+        set_context(context["run_id"], context["project_id"], context["step_id"])
+        set_cancellation_token(token)
+        return await func(**kwargs)
+
+    def _get_call_thread(self) -> KeywordCallThread:
+        """Get the keyword call thread serving the current thread."""
+        call_thread = getattr(self._call_threads, "thread", None)
+        if call_thread is None or call_thread.closed:
+            call_thread = KeywordCallThread(
+                name=f"KeywordCall-{threading.current_thread().name}"
+            )
+            self._call_threads.thread = call_thread
+        return call_thread
+
+    def _release_call_thread(self) -> None:
+        """Close the keyword call thread serving the current thread, if any."""
+        call_thread = getattr(self._call_threads, "thread", None)
+        if call_thread is not None:
+            call_thread.close()
+            self._call_threads.thread = None
 
     def _process_output_params(
         self,
@@ -479,10 +1064,7 @@ class ExecutionManager:
             for param in output_params:
                 if param.name in result:
                     step_outputs[step.id][param.id] = result[param.name]
-                    logger.info(
-                        f"Step {step.id}: Stored output '{param.name}' "
-                        f"(id={param.id}): {result[param.name]}"
-                    )
+                    self._log_stored_output(step, param, result[param.name])
                 elif param.isMandatory:
                     logger.warning(
                         f"Mandatory output parameter '{param.name}' not found "
@@ -501,10 +1083,7 @@ class ExecutionManager:
             # Handle single value return
             if len(output_params) == 1:
                 step_outputs[step.id][output_params[0].id] = result
-                logger.info(
-                    f"Step {step.id}: Stored output '{output_params[0].name}' "
-                    f"(id={output_params[0].id}): {result}"
-                )
+                self._log_stored_output(step, output_params[0], result)
             else:
                 logger.warning(
                     f"Function '{instance.keywordName}' has {len(output_params)} "
@@ -513,10 +1092,29 @@ class ExecutionManager:
                 for param in output_params:
                     if param.isMandatory:
                         step_outputs[step.id][param.id] = result
-                        logger.info(
-                            f"Step {step.id}: Stored output '{param.name}' "
-                            f"(id={param.id}): {result}"
-                        )
+                        self._log_stored_output(step, param, result)
+
+    def _logs_values(self) -> bool:
+        """Check whether step parameter and output values are logged."""
+        return (
+            self.execution_log_verbosity != ExecutionLogVerbosity.OFF
+            and logger.isEnabledFor(logging.INFO)
+        )
+
+    def _log_value(self, value: Any) -> LogValue:
+        """Wrap a value so it is formatted, truncated, only if logged."""
+        return LogValue(value, self._log_value_max_length)
+
+    def _log_stored_output(self, step: Any, param: Any, value: Any) -> None:
+        """Log an output value stored for connected steps."""
+        if self._logs_values():
+            logger.info(
+                "Step %s: Stored output '%s' (id=%s): %s",
+                step.id,
+                param.name,
+                param.id,
+                self._log_value(value),
+            )
 
     def _enhance_error_message(self, error_msg: str, func: Callable) -> str:
         """Enhance error messages with helpful suggestions.
@@ -532,10 +1130,7 @@ class ExecutionManager:
             match = re.search(r"got an unexpected keyword argument '(\w+)'", error_msg)
             if match:
                 wrong_param = match.group(1)
-                sig = inspect.signature(func)
-                func_params = list(sig.parameters.keys())
-
-                for correct_param in func_params:
+                for correct_param in get_call_descriptor(func).arg_names:
                     if correct_param.lower() == wrong_param.lower():
                         return f"{error_msg}. Did you mean '{correct_param}'?"
 
@@ -559,7 +1154,8 @@ class ExecutionManager:
 
     def _get_connected_value(
         self,
-        connections: List[FlowConnection],
+        plan: CompiledPlan,
+        flow: Flow,
         to_step_id: int,
         to_param_id: int,
         step_outputs: StepOutputs,
@@ -567,7 +1163,8 @@ class ExecutionManager:
         """Get the value for an input parameter from a connected output parameter.
 
         Args:
-            connections: List of FlowConnection objects
+            plan: Compiled plan holding the flow's connection index
+            flow: Flow the step belongs to
             to_step_id: The step ID that needs the input value
             to_param_id: The parameter ID that needs the input value
             step_outputs: Dictionary of stored outputs {step_id: {param_id: value}}
@@ -575,32 +1172,31 @@ class ExecutionManager:
         Returns:
             The connected value if found, None otherwise
         """
-        if not connections:
+        sources = plan.get_connection_index(flow).get((to_step_id, to_param_id))
+        if not sources:
             return None
 
-        for connection in connections:
-            if (
-                connection.toStepId == to_step_id
-                and connection.toParamId == to_param_id
-            ):
-                from_step_id = connection.fromStepId
-                from_param_id = connection.fromParamId
-
-                if (
-                    from_step_id in step_outputs
-                    and from_param_id in step_outputs[from_step_id]
-                ):
-                    value = step_outputs[from_step_id][from_param_id]
-                    logger.debug(
-                        f"Connection found: Step {from_step_id} param {from_param_id} "
-                        f"-> Step {to_step_id} param {to_param_id}, value: {value}"
-                    )
-                    return value
-                else:
-                    logger.warning(
-                        f"Connection exists but no output value found for "
-                        f"Step {from_step_id} param {from_param_id}"
-                    )
+        for from_step_id, from_param_id in sources:
+            outputs = step_outputs.get(from_step_id)
+            if outputs is not None and from_param_id in outputs:
+                value = outputs[from_param_id]
+                logger.debug(
+                    "Connection found: Step %s param %s -> Step %s param %s, value: %s",
+                    from_step_id,
+                    from_param_id,
+                    to_step_id,
+                    to_param_id,
+                    (
+                        self._log_value(value)
+                        if self.execution_log_verbosity != ExecutionLogVerbosity.OFF
+                        else "<not logged>"
+                    ),
+                )
+                return value
+            logger.warning(
+                f"Connection exists but no output value found for "
+                f"Step {from_step_id} param {from_param_id}"
+            )
 
         return None
 
@@ -621,14 +1217,8 @@ class ExecutionManager:
                     "status": (
                         flow_result.status.value if flow_result.status else None
                     ),
-                    "runAt": (
-                        flow_result.runAt.isoformat() if flow_result.runAt else None
-                    ),
-                    "completedAt": (
-                        flow_result.completedAt.isoformat()
-                        if flow_result.completedAt
-                        else None
-                    ),
+                    "runAt": flow_result.runAt,
+                    "completedAt": flow_result.completedAt,
                     "failedOnStepId": flow_result.failedOnStepId,
                     "message": flow_result.message,
                 }
@@ -637,7 +1227,7 @@ class ExecutionManager:
     def _mark_aborted_steps(
         self,
         run_id: Union[int, str],
-        flows: List[Flow],
+        flows: Sequence[Flow],
         executed_steps: Set[Tuple[int, int]],
         result_data: ExecutionResultData,
     ) -> None:
@@ -681,13 +1271,9 @@ class ExecutionManager:
         Raises:
             ParameterValidationError: If validation fails
         """
-        # Get keyword param definitions from decorator metadata
-        keyword_params = getattr(func, "keyword_params", [])
-
-        # Separate input and output params from keyword definition
-        defined_input_params = {
-            p.name: p for p in keyword_params if p.direction == ParamDirection.INPUT
-        }
+        # Input param definitions are precomputed on the call descriptor
+        descriptor = get_call_descriptor(func)
+        defined_input_params = descriptor.input_params
 
         # Separate input and output params from JSON
         json_input_params = {}
@@ -711,13 +1297,7 @@ class ExecutionManager:
         unknown_params = json_input_names - defined_input_names
 
         # Check for missing required parameters
-        missing_required = set()
-        for param_name, param_def in defined_input_params.items():
-            if param_def.required and param_name not in json_input_names:
-                # Check if parameter has a value in JSON (even if not in defined names)
-                json_param = json_input_params.get(param_name)
-                if json_param is None or getattr(json_param, "value", None) is None:
-                    missing_required.add(param_name)
+        missing_required = set(descriptor.required_inputs - json_input_names)
 
         # Build validation errors
         errors = []
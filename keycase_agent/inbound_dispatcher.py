@@ -0,0 +1,169 @@
+"""Dispatch of incoming WebSocket messages to handler threads."""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .models.websocket_event_types import WebSocketEventType
+from .utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+# Messages waiting per lane; further messages are rejected until there is room
+DEFAULT_INBOUND_QUEUE_SIZE = 100
+
+# Events handled on the control lane, never queued behind execute commands
+CONTROL_EVENTS = frozenset(
+    {
+        WebSocketEventType.AGENT_STOP_COMMAND.value,
+        WebSocketEventType.AGENT_STOP_EXECUTION_COMMAND.value,
+        WebSocketEventType.AGENT_EXECUTION_STATUS_REQUEST.value,
+    }
+)
+# Events handled on the receive thread: cheap, and an authentication failure
+# has to end the connection loop running there
+INLINE_EVENTS = frozenset(
+    {
+        WebSocketEventType.AUTH_SUCCESS_RESPONSE.value,
+        WebSocketEventType.AUTH_FAILURE_RESPONSE.value,
+    }
+)
+
+Event = Dict[str, Any]
+
+_STOP = object()
+
+
+class _Lane:
+    """Bounded queue of events handled in order by one thread."""
+
+    def __init__(
+        self, name: str, handle: Callable[[Event], None], maxsize: int
+    ) -> None:
+        self.name = name
+        self.handle = handle
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, maxsize))
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def put(self, event: Event) -> bool:
+        """Queue an event without waiting; False if the lane is full."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self, timeout: float) -> None:
+        thread, self.thread = self.thread, None
+        if thread is None:
+            return
+        # Discard waiting events; only the stop marker is left to handle
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.queue.put(_STOP)
+        thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        while True:
+            event = self.queue.get()
+            if event is _STOP:
+                return
+            try:
+                self.handle(event)
+            except Exception as e:
+                logger.error(f"Error handling {event.get('event')} on {self.name}: {e}")
+
+
+class InboundDispatcher:
+    """Routes incoming messages to handler threads, by event type.
+
+    The WebSocket receive thread only decodes a message and queues it, so it
+    is ready for the next frame (and the connection's pings) whatever the
+    handlers do. Control events (stop and status requests) go to their own
+    lane, so they are never queued behind execute commands; all other events
+    share the command lane. Each lane handles its events in arrival order.
+
+    Lanes are bounded: a message arriving at a full lane is passed to
+    ``on_overflow`` (which declines execute commands) instead of being
+    queued.
+    """
+
+    def __init__(
+        self,
+        handle_event: Callable[[Event], None],
+        on_overflow: Optional[Callable[[Event], None]] = None,
+        max_messages: int = DEFAULT_INBOUND_QUEUE_SIZE,
+    ) -> None:
+        """Create a dispatcher; call ``start()`` before dispatching.
+
+        Args:
+            handle_event: Handles one decoded message
+            on_overflow: Called on the receive thread with a message that did
+                not fit its lane
+            max_messages: Messages queued per lane
+        """
+        self.handle_event = handle_event
+        self.on_overflow = on_overflow
+        self._control = _Lane("InboundControl", handle_event, max_messages)
+        self._commands = _Lane("InboundCommands", handle_event, max_messages)
+        self._lanes = (self._control, self._commands)
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the lane threads. Calling it again is a no-op."""
+        for lane in self._lanes:
+            lane.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the lane threads; queued messages are discarded."""
+        for lane in self._lanes:
+            lane.stop(timeout)
+
+    def dispatch(self, message: str) -> None:
+        """Decode a message and queue it on its lane."""
+        try:
+            data = json_codec.loads(message)
+        except ValueError as e:
+            logger.error(f"Ignoring undecodable message: {e}")
+            return
+        if not isinstance(data, dict):
+            logger.error("Ignoring message that is not a JSON object")
+            return
+
+        event_type = data.get("event")
+        if event_type in INLINE_EVENTS:
+            self.handle_event(data)
+            return
+
+        lane = self._control if event_type in CONTROL_EVENTS else self._commands
+        if lane.put(data):
+            return
+
+        with self._lock:
+            self._dropped += 1
+        logger.warning(f"{lane.name} lane is full, rejecting {event_type}")
+        if self.on_overflow is not None:
+            try:
+                self.on_overflow(data)
+            except Exception as e:
+                logger.error(f"Error rejecting {event_type}: {e}")
+
+    def queued_message_count(self) -> int:
+        """Get the number of messages waiting to be handled."""
+        return sum(lane.queue.qsize() for lane in self._lanes)
+
+    def dropped_message_count(self) -> int:
+        """Get the number of messages rejected because a lane was full."""
+        with self._lock:
+            return self._dropped
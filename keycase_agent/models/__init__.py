@@ -1,11 +1,14 @@
 """Data models for execution plans and results."""
 
 from .execute_plan import (
+    CompiledPlan,
     Flow,
     FlowConnection,
     FlowStep,
     KeywordInstance,
     Param,
+    compile_execution_plan,
+    compile_plan_data,
     execute_plan_from_json,
     parse_execution_plan,
 )
@@ -15,11 +18,14 @@ from .websocket_event_types import WebSocketEventType
 
 __all__ = [
     # Execution plan models
+    "CompiledPlan",
     "Flow",
     "FlowConnection",
     "FlowStep",
     "KeywordInstance",
     "Param",
+    "compile_execution_plan",
+    "compile_plan_data",
     "execute_plan_from_json",
     "parse_execution_plan",
     # Result models
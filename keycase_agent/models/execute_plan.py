@@ -1,12 +1,23 @@
 """Execution plan models for parsing and representing workflow structures."""
 
-import json
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from ..utils import json_codec
+
+# (step_id, param_id) pair identifying one end of a connection
+ParamRef = Tuple[int, int]
+# Maps a target (to_step_id, to_param_id) to its source (from_step_id, from_param_id)
+# pairs, in the order the connections appear in the flow
+ConnectionIndex = Dict[ParamRef, List[ParamRef]]
+# Maps a step ID to the IDs of the steps whose outputs it consumes
+StepDependencies = Dict[int, Set[int]]
 
 
 class Param:
     """Keyword parameter definition."""
 
+    __slots__ = ("id", "name", "direction", "type", "is_mandatory", "value")
+
     def __init__(
         self,
         id: int,
@@ -32,6 +43,8 @@ class Param:
 class KeywordInstance:
     """Instance of a keyword with its parameters."""
 
+    __slots__ = ("id", "keyword_name", "keyword_id", "name", "params")
+
     def __init__(
         self,
         id: int,
@@ -59,6 +72,8 @@ class KeywordInstance:
 class FlowConnection:
     """Connection between flow steps for parameter passing."""
 
+    __slots__ = ("id", "from_step_id", "to_step_id", "from_param_id", "to_param_id")
+
     def __init__(
         self,
         id: int,
@@ -92,12 +107,24 @@ class FlowConnection:
 
 
 class FlowStep:
-    """Single step within a flow."""
+    """Single step within a flow.
+
+    ``timeout`` (seconds) overrides the timeout declared on the keyword.
+    """
 
-    def __init__(self, id: int, instance_id: int, sequence_order: int) -> None:
+    __slots__ = ("id", "instance_id", "sequence_order", "timeout")
+
+    def __init__(
+        self,
+        id: int,
+        instance_id: int,
+        sequence_order: int,
+        timeout: Optional[float] = None,
+    ) -> None:
         self.id = id
         self.instance_id = instance_id
         self.sequence_order = sequence_order
+        self.timeout = timeout
 
     # Legacy property aliases for backward compatibility
     @property
@@ -110,7 +137,13 @@ class FlowStep:
 
 
 class Flow:
-    """Workflow containing steps and connections."""
+    """Workflow containing steps and connections.
+
+    ``error`` is set on a flow whose plan data could not be parsed; it has no
+    steps and fails when run.
+    """
+
+    __slots__ = ("id", "flow_id", "run_mode", "name", "steps", "connections", "error")
 
     def __init__(
         self,
@@ -120,6 +153,7 @@ class Flow:
         name: str,
         steps: List[FlowStep],
         connections: Optional[List[FlowConnection]] = None,
+        error: Optional[str] = None,
     ) -> None:
         self.id = id
         self.flow_id = flow_id
@@ -127,6 +161,7 @@ class Flow:
         self.name = name
         self.steps = steps
         self.connections = connections if connections is not None else []
+        self.error = error
 
     # Legacy property aliases for backward compatibility
     @property
@@ -138,6 +173,83 @@ class Flow:
         return self.run_mode
 
 
+class CompiledPlan:
+    """Execution plan with precomputed lookup indexes.
+
+    Built once after parsing so that the executor resolves keyword instances
+    and connection sources with dictionary lookups instead of linear scans.
+    Connection indexes are built per flow on first access and cached.
+    """
+
+    def __init__(
+        self, keyword_instances: List[KeywordInstance], flows: List[Flow]
+    ) -> None:
+        self.keyword_instances = keyword_instances
+        self.flows = flows
+        # The first instance with an ID wins, as with the former linear scan
+        self.instances_by_id: Dict[int, KeywordInstance] = {}
+        for instance in keyword_instances:
+            self.instances_by_id.setdefault(instance.id, instance)
+        self._connection_indexes: Dict[int, ConnectionIndex] = {}
+        self._step_dependencies: Dict[int, StepDependencies] = {}
+
+    def get_instance(self, instance_id: int) -> Optional[KeywordInstance]:
+        """Get a keyword instance by ID."""
+        return self.instances_by_id.get(instance_id)
+
+    def get_connection_index(self, flow: Flow) -> ConnectionIndex:
+        """Get the connection index for a flow, building it on first use."""
+        index = self._connection_indexes.get(flow.id)
+        if index is None:
+            index = build_connection_index(flow.connections)
+            self._connection_indexes[flow.id] = index
+        return index
+
+    def get_step_dependencies(self, flow: Flow) -> StepDependencies:
+        """Get the step dependency graph for a flow, building it on first use."""
+        dependencies = self._step_dependencies.get(flow.id)
+        if dependencies is None:
+            dependencies = build_step_dependencies(flow)
+            self._step_dependencies[flow.id] = dependencies
+        return dependencies
+
+
+def build_connection_index(connections: List[FlowConnection]) -> ConnectionIndex:
+    """Index connections by their target step and parameter."""
+    index: ConnectionIndex = {}
+    for connection in connections or []:
+        index.setdefault((connection.to_step_id, connection.to_param_id), []).append(
+            (connection.from_step_id, connection.from_param_id)
+        )
+    return index
+
+
+def build_step_dependencies(flow: Flow) -> StepDependencies:
+    """Build the data dependency graph between the steps of a flow.
+
+    A step depends on every step that feeds one of its inputs through a
+    connection. Connections that do not point forward in ``sequence_order``
+    never carry a value in sequential execution, so they are ignored; this
+    also guarantees the resulting graph is acyclic.
+    """
+    order = {step.id: step.sequence_order for step in flow.steps}
+    dependencies: StepDependencies = {step.id: set() for step in flow.steps}
+    for connection in flow.connections or []:
+        from_order = order.get(connection.from_step_id)
+        to_order = order.get(connection.to_step_id)
+        if from_order is None or to_order is None or from_order >= to_order:
+            continue
+        dependencies[connection.to_step_id].add(connection.from_step_id)
+    return dependencies
+
+
+def compile_execution_plan(
+    keyword_instances: List[KeywordInstance], flows: List[Flow]
+) -> CompiledPlan:
+    """Build a CompiledPlan from parsed keyword instances and flows."""
+    return CompiledPlan(keyword_instances, flows)
+
+
 def parse_param(param_data: Dict[str, Any]) -> Param:
     """Parse parameter data from JSON."""
     return Param(
@@ -164,10 +276,12 @@ def parse_keyword_instance(instance_data: Dict[str, Any]) -> KeywordInstance:
 
 def parse_step(step_data: Dict[str, Any]) -> FlowStep:
     """Parse flow step data from JSON."""
+    timeout = step_data.get("timeoutSeconds")
     return FlowStep(
         id=step_data["id"],
         instance_id=step_data["instanceId"],
         sequence_order=step_data["sequenceOrder"],
+        timeout=float(timeout) if timeout else None,
     )
 
 
@@ -228,5 +342,104 @@ def execute_plan_from_json(
     json_str: str,
 ) -> Tuple[List[KeywordInstance], List[Flow]]:
     """Parse execution plan from JSON string."""
-    json_data = json.loads(json_str)
+    json_data = json_codec.loads(json_str)
     return parse_execution_plan(json_data)
+
+
+def describe_parse_error(error: Exception) -> str:
+    """Describe why plan data could not be parsed."""
+    if isinstance(error, KeyError):
+        return f"missing field {error}"
+    return str(error)
+
+
+def parse_flow_or_invalid(flow_data: Dict[str, Any]) -> Flow:
+    """Parse flow data, returning a flow that fails when run if it is malformed.
+
+    Used for flows parsed during the run: earlier flows have then already
+    run and reported progress, so one malformed flow must not fail the
+    whole run.
+    """
+    try:
+        return parse_flow(flow_data)
+    except (KeyError, TypeError, ValueError) as e:
+        data = flow_data if isinstance(flow_data, dict) else {}
+        return Flow(
+            id=data.get("id"),
+            flow_id=data.get("flowId", data.get("id")),
+            run_mode=data.get("runMode", "default"),
+            name=data.get("name", ""),
+            steps=[],
+            error=f"Invalid flow data: {describe_parse_error(e)}",
+        )
+
+
+class LazyFlowList(Sequence[Flow]):
+    """Sequence of flows parsed from their JSON data on first access.
+
+    A malformed flow becomes a flow that fails when run, see
+    ``parse_flow_or_invalid()``.
+    """
+
+    def __init__(self, flows_data: List[Dict[str, Any]]) -> None:
+        self._flows_data = flows_data
+        self._flows: List[Optional[Flow]] = [None] * len(flows_data)
+
+    def __len__(self) -> int:
+        return len(self._flows_data)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        flow = self._flows[index]
+        if flow is None:
+            flow = parse_flow_or_invalid(self._flows_data[index])
+            self._flows[index] = flow
+        return flow
+
+    def __iter__(self) -> Iterator[Flow]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+class LazyCompiledPlan(CompiledPlan):
+    """CompiledPlan built directly from an already-decoded plan dict.
+
+    Nothing is parsed up front: a keyword instance is built the first time a
+    step looks it up, and a flow when execution reaches it, so large plans
+    start executing immediately.
+    """
+
+    def __init__(self, plan_data: Dict[str, Any]) -> None:
+        self._instance_data: Dict[int, Dict[str, Any]] = {}
+        for data in plan_data["keywordInstances"]:
+            self._instance_data.setdefault(data["id"], data)
+        self.instances_by_id: Dict[int, KeywordInstance] = {}
+        self.flows = LazyFlowList(plan_data["flows"])
+        self._connection_indexes: Dict[int, ConnectionIndex] = {}
+        self._step_dependencies: Dict[int, StepDependencies] = {}
+
+    @property
+    def keyword_instances(self) -> List[KeywordInstance]:  # type: ignore[override]
+        instances = (self.get_instance(id) for id in self._instance_data)
+        return [instance for instance in instances if instance is not None]
+
+    def get_instance(self, instance_id: int) -> Optional[KeywordInstance]:
+        """Get a keyword instance by ID, parsing it on first use."""
+        instance = self.instances_by_id.get(instance_id)
+        if instance is None:
+            data = self._instance_data.get(instance_id)
+            if data is None:
+                return None
+            # setdefault keeps one instance if two threads parse it at once
+            instance = self.instances_by_id.setdefault(
+                instance_id, parse_keyword_instance(data)
+            )
+        return instance
+
+
+def compile_plan_data(plan_data: Dict[str, Any]) -> CompiledPlan:
+    """Build a lazily parsed CompiledPlan from a decoded execution plan dict."""
+    if "keywordInstances" not in plan_data or "flows" not in plan_data:
+        raise ValueError("Execution plan must contain 'keywordInstances' and 'flows'")
+    return LazyCompiledPlan(plan_data)
@@ -1,9 +1,10 @@
 """Execution result models for tracking flow and step execution status."""
 
-import json
 from datetime import datetime, timezone
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils import json_codec
 
 
 class StatusEnum(Enum):
@@ -16,6 +17,7 @@ class StatusEnum(Enum):
     PASSED = "PASSED"
     SKIPPED = "SKIPPED"
     ABORTED = "ABORTED"
+    TIMEOUT = "TIMEOUT"
     ERROR = "ERROR"
 
     def __str__(self) -> str:
@@ -25,6 +27,16 @@ class StatusEnum(Enum):
 class FlowResult:
     """Result of a single flow execution."""
 
+    __slots__ = (
+        "id",
+        "name",
+        "failed_on_step_id",
+        "status",
+        "message",
+        "run_at",
+        "completed_at",
+    )
+
     def __init__(self, id: int, name: str) -> None:
         self.id = id
         self.name = name
@@ -80,14 +92,36 @@ class FlowResult:
         }
 
 
-class ExecutionResultData:
-    """Complete execution result data for a run."""
+# Receives each flow result, encoded with FlowResult.to_dict()
+FlowResultSink = Callable[[Dict[str, Any]], None]
+
 
-    def __init__(self, run_id: int) -> None:
+class ExecutionResultData:
+    """Complete execution result data for a run.
+
+    With a ``flow_result_sink``, flow results are handed to it as they are
+    added instead of being kept, and ``to_dict()`` only reports how many
+    there were.
+    """
+
+    __slots__ = (
+        "run_id",
+        "start_date_time",
+        "end_date_time",
+        "flow_results",
+        "flow_result_count",
+        "flow_result_sink",
+    )
+
+    def __init__(
+        self, run_id: int, flow_result_sink: Optional[FlowResultSink] = None
+    ) -> None:
         self.run_id = run_id
         self.start_date_time: Optional[datetime] = None
         self.end_date_time: Optional[datetime] = None
         self.flow_results: List[FlowResult] = []
+        self.flow_result_count = 0
+        self.flow_result_sink = flow_result_sink
 
     # Legacy property aliases for backward compatibility
     @property
@@ -116,11 +150,18 @@ class ExecutionResultData:
 
     def add_flow_result(self, flow_result: FlowResult) -> None:
         """Add a flow result to the execution."""
-        self.flow_results.append(flow_result)
+        self.flow_result_count += 1
+        if self.flow_result_sink is not None:
+            self.flow_result_sink(flow_result.to_dict())
+        else:
+            self.flow_results.append(flow_result)
 
     def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
+        """Convert to dictionary for JSON serialization.
+
+        Streamed results report ``flowResultCount`` instead of ``flowResults``.
+        """
+        data = {
             "startDateTime": (
                 self.start_date_time.isoformat() if self.start_date_time else None
             ),
@@ -128,9 +169,15 @@ class ExecutionResultData:
             "endDateTime": (
                 self.end_date_time.isoformat() if self.end_date_time else None
             ),
-            "flowResults": [flow_result.to_dict() for flow_result in self.flow_results],
         }
+        if self.flow_result_sink is not None:
+            data["flowResultCount"] = self.flow_result_count
+        else:
+            data["flowResults"] = [
+                flow_result.to_dict() for flow_result in self.flow_results
+            ]
+        return data
 
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(self.to_dict(), default=str, indent=4)
+        return json_codec.dumps(self.to_dict(), default=str, indent=True)
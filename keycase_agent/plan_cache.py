@@ -0,0 +1,291 @@
+"""Cache of fetched execution plans, kept in their compiled form."""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models.execute_plan import CompiledPlan, compile_plan_data
+from .utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLAN_CACHE_SIZE = 32
+# Approximate bytes of plans kept in memory, measured as their JSON size
+DEFAULT_PLAN_CACHE_BYTES = 64 * 1024 * 1024
+# ETags sent in If-None-Match when fetching a plan
+MAX_CONDITIONAL_ETAGS = 8
+
+
+def plan_cache_key(etag: str) -> str:
+    """Get the cache key of the plan the server sent with an ETag."""
+    return hashlib.sha256(etag.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedPlan:
+    """A plan in the cache."""
+
+    key: str
+    etag: str
+    compiled: CompiledPlan
+    # Approximate memory held by the plan, in bytes of JSON
+    size: int = 0
+
+
+class PlanCache:
+    """LRU cache of execution plans, with an optional on-disk store.
+
+    Plans are keyed by the ETag the server sent them with, which identifies
+    their content, so the agent never has to encode or hash a plan itself.
+    They are kept compiled, so a repeat run of the same plan skips parsing.
+    ``known_etags()`` lets the next fetch ask for cached plans conditionally
+    and ``get_by_etag()`` resolves a ``304 Not Modified`` reply without a
+    body. Plans sent without an ETag cannot be asked for again, so they are
+    not cached.
+
+    The cache holds at most ``max_entries`` plans and about ``max_bytes`` of
+    them; the least recently used plans are evicted first. With ``directory``
+    set, plans are also written there as JSON so the cache survives
+    restarts; they are compiled again when first loaded. Each plan's ETag is
+    stored next to it, so the plans on disk are offered in If-None-Match
+    from startup on. The directory is pruned to the same bounds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_PLAN_CACHE_SIZE,
+        directory: Optional[str] = None,
+        max_bytes: int = DEFAULT_PLAN_CACHE_BYTES,
+    ) -> None:
+        """Create a cache.
+
+        Args:
+            max_entries: Plans kept in memory
+            directory: Directory of the on-disk store (default: memory only)
+            max_bytes: Approximate size of the plans kept in memory; a single
+                larger plan is still kept until the next one is added
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.directory = directory
+        self._entries: "OrderedDict[str, CachedPlan]" = OrderedDict()
+        self._bytes = 0
+        # Plans in the directory by key: their ETag and size, oldest first
+        self._disk: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            self._index_directory()
+
+    def put(
+        self, plan_data: Dict[str, Any], etag: str, size: Optional[int] = None
+    ) -> CachedPlan:
+        """Add a plan fetched with the given ETag.
+
+        Args:
+            plan_data: Decoded plan
+            etag: ETag the server sent with the plan
+            size: Approximate size of the plan, e.g. the length of the
+                response body; measured by encoding the plan if not given
+
+        Raises:
+            ValueError: If the plan cannot be compiled
+        """
+        key = plan_cache_key(etag)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+            self.misses += 1
+        compiled = compile_plan_data(plan_data)
+        encoded = self._store(key, etag, plan_data)
+        if size is None:
+            size = len(encoded if encoded is not None else json_codec.dumps(plan_data))
+        entry = CachedPlan(key, etag, compiled, size)
+        self._insert(entry)
+        return entry
+
+    def get_by_etag(self, etag: Optional[str]) -> Optional[CachedPlan]:
+        """Get the plan the server sent with the given ETag."""
+        if not etag:
+            return None
+        key = plan_cache_key(etag)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._load(key, etag)
+        if entry is not None:
+            self._insert(entry)
+            with self._lock:
+                self.hits += 1
+        return entry
+
+    def known_etags(self, limit: int = MAX_CONDITIONAL_ETAGS) -> List[str]:
+        """Get the ETags of the most recently used plans, newest first.
+
+        Plans kept in memory come first, then those only on disk.
+        """
+        with self._lock:
+            etags = []
+            for entry in reversed(self._entries.values()):
+                if len(etags) >= limit:
+                    return etags
+                etags.append(entry.etag)
+            for key, (etag, _) in reversed(self._disk.items()):
+                if len(etags) >= limit:
+                    break
+                if key not in self._entries:
+                    etags.append(etag)
+            return etags
+
+    def size_bytes(self) -> int:
+        """Get the approximate size of the plans kept in memory."""
+        with self._lock:
+            return self._bytes
+
+    def _insert(self, entry: CachedPlan) -> None:
+        with self._lock:
+            previous = self._entries.pop(entry.key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[entry.key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def _plan_path(self, key: str) -> str:
+        return os.path.join(self.directory or "", f"plan-{key}.json")
+
+    def _etag_path(self, key: str) -> str:
+        return os.path.join(self.directory or "", f"plan-{key}.etag")
+
+    def _index_directory(self) -> None:
+        """Index the plans in the on-disk store, oldest first, and prune it.
+
+        A plan without its ETag file cannot be asked for again, so it is
+        removed.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Could not read plan cache directory: {e}")
+            return
+        found = []
+        for name in names:
+            if not (name.startswith("plan-") and name.endswith(".json")):
+                continue
+            key = name[len("plan-") : -len(".json")]
+            try:
+                stat = os.stat(self._plan_path(key))
+                with open(self._etag_path(key), encoding="utf-8") as f:
+                    etag = f.read()
+            except FileNotFoundError:
+                self._remove_files(key)
+                continue
+            except OSError as e:
+                logger.warning(f"Ignoring unreadable cached plan {key}: {e}")
+                continue
+            found.append((stat.st_mtime, key, etag, stat.st_size))
+        with self._lock:
+            for _, key, etag, size in sorted(found):
+                self._disk[key] = (etag, size)
+                self._disk_bytes += size
+        self._prune_directory()
+
+    def _track_on_disk(self, key: str, etag: str, size: int) -> None:
+        """Record a plan as the most recently used one on disk."""
+        with self._lock:
+            previous = self._disk.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous[1]
+            self._disk[key] = (etag, size)
+            self._disk_bytes += size
+        self._prune_directory()
+
+    def _prune_directory(self) -> None:
+        """Remove the least recently used plans beyond the cache bounds."""
+        evicted = []
+        with self._lock:
+            while len(self._disk) > 1 and (
+                len(self._disk) > self.max_entries or self._disk_bytes > self.max_bytes
+            ):
+                key, (_, size) = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                evicted.append(key)
+        for key in evicted:
+            self._remove_files(key)
+
+    def _remove_files(self, key: str) -> None:
+        for path in (self._plan_path(key), self._etag_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove cached plan file {path}: {e}")
+
+    def _store(self, key: str, etag: str, plan_data: Dict[str, Any]) -> Optional[str]:
+        """Write a plan and its ETag to the on-disk store, if enabled.
+
+        Returns:
+            The plan's JSON, or None if it was not written
+        """
+        if self.directory is None:
+            return None
+        try:
+            encoded = json_codec.dumps(plan_data)
+            os.makedirs(self.directory, exist_ok=True)
+            _write_atomic(self._plan_path(key), encoded)
+            _write_atomic(self._etag_path(key), etag)
+        except OSError as e:
+            logger.warning(f"Could not store plan {key} in plan cache: {e}")
+            return None
+        self._track_on_disk(key, etag, len(encoded))
+        return encoded
+
+    def _load(self, key: str, etag: str) -> Optional[CachedPlan]:
+        """Read and compile a plan from the on-disk store, if present."""
+        if self.directory is None:
+            return None
+        path = self._plan_path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            plan_data = json_codec.loads(content)
+            entry = CachedPlan(key, etag, compile_plan_data(plan_data), len(content))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached plan {key}: {e}")
+            return None
+        try:
+            # Keeps the plan's place in the LRU order across restarts
+            os.utime(path)
+        except OSError:
+            pass
+        self._track_on_disk(key, etag, len(content))
+        return entry
+
+
+def _write_atomic(path: str, text: str) -> None:
+    """Write a file so readers never see it half-written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,177 @@
+"""Process pool backend for CPU-bound keywords.
+
+Keywords registered with ``@keyword(..., run_in_process=True)`` are executed
+in a pool of worker processes so they are not serialized by the GIL. Only the
+keyword name, its kwargs and its return value cross the process boundary;
+workers resolve the keyword from their own registry after importing the
+keyword modules when they start.
+"""
+
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .decorators import KeywordOptions
+from .exceptions import KeywordDefinitionError
+from .registry import keyword_registry
+
+logger = logging.getLogger(__name__)
+
+
+def _import_keyword_module(module_name: str) -> None:
+    """Import a keyword module inside a worker so its keywords register."""
+    try:
+        importlib.import_module(module_name)
+    except Exception as e:
+        logger.error(f"Worker failed to import keyword module '{module_name}': {e}")
+
+
+def _init_worker(module_names: Iterable[str]) -> None:
+    """Worker initializer: pre-import keyword modules."""
+    for module_name in module_names:
+        _import_keyword_module(module_name)
+
+
+def _ping() -> int:
+    """No-op task used to start and warm up workers."""
+    return os.getpid()
+
+
+def _call_keyword(keyword_name: str, module_name: str, kwargs: Dict[str, Any]) -> Any:
+    """Run a registered keyword inside a worker process."""
+    func = keyword_registry.get(keyword_name)
+    if func is None:
+        _import_keyword_module(module_name)
+        func = keyword_registry.get(keyword_name)
+    if func is None:
+        raise KeywordDefinitionError(
+            f"Keyword '{keyword_name}' is not registered in the worker process. "
+            f"Keywords run in a process must be defined at module level."
+        )
+    return func(**kwargs)
+
+
+class KeywordProcessPool:
+    """Lazily started pool of warm worker processes for keyword calls.
+
+    Workers use the ``spawn`` start method so behaviour is the same on every
+    platform and safe in a multi-threaded agent.
+
+    A call given up while it runs (after a timeout or stop) would keep its
+    worker busy until it returns, if ever. ``abandon()`` therefore retires
+    the workers: new calls go to a fresh set, and the old workers are
+    terminated once their other calls have finished.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """Initialize the pool without starting any process.
+
+        Args:
+            max_workers: Number of worker processes (default: CPU count)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Calls submitted to the current executor and not finished yet
+        self._in_flight: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def _keyword_modules(self) -> Iterable[str]:
+        """Modules defining process keywords, imported by each worker."""
+        modules = set()
+        for func in keyword_registry.keywords.values():
+            options = getattr(func, "keyword_options", None)
+            if isinstance(options, KeywordOptions) and options.run_in_process:
+                modules.add(func.__module__)
+        return sorted(modules)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(
+                    f"Starting keyword process pool ({self.max_workers} workers)"
+                )
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self._keyword_modules(),),
+                )
+                self._warm_up(self._executor)
+            return self._executor
+
+    def _warm_up(self, executor: ProcessPoolExecutor) -> None:
+        """Start every worker up front so the first calls don't pay for it."""
+        futures = [executor.submit(_ping) for _ in range(self.max_workers)]
+        wait_futures(futures)
+
+    def submit(
+        self, func: Callable, keyword_name: str, kwargs: Dict[str, Any]
+    ) -> Future:
+        """Submit a keyword call to a worker process.
+
+        Args:
+            func: The registered keyword function (used to locate its module)
+            keyword_name: Registered keyword name
+            kwargs: Keyword arguments for the call
+
+        Returns:
+            Future resolving to the keyword's return value
+        """
+        executor = self._get_executor()
+        future = executor.submit(_call_keyword, keyword_name, func.__module__, kwargs)
+        with self._lock:
+            if self._executor is executor:
+                self._in_flight.add(future)
+                future.add_done_callback(self._in_flight.discard)
+        return future
+
+    def abandon(self, future: Future) -> None:
+        """Give up on a call, replacing the workers if it is still running.
+
+        Calls already running on the old workers finish normally; then the
+        old workers, including the one stuck in the abandoned call, are
+        terminated.
+        """
+        if future.cancel() or future.done():
+            return  # It never started or already returned; no worker is held
+        with self._lock:
+            if future not in self._in_flight:
+                return  # Its workers were already retired
+            executor, self._executor = self._executor, None
+            others = self._in_flight - {future}
+            self._in_flight = set()
+        if executor is None:
+            return
+        logger.warning("Replacing keyword worker processes after an abandoned call")
+        # The executor has no public way to stop a worker busy with a call,
+        # and forgets its processes once shut down
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False)
+        threading.Thread(
+            target=_terminate_when_done,
+            args=(processes, others),
+            name="KeywordPoolRetire",
+            daemon=True,
+        ).start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop all worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._in_flight = set()
+        if executor is not None:
+            logger.info("Shutting down keyword process pool")
+            executor.shutdown(wait=wait)
+
+
+def _terminate_when_done(processes: List[Any], calls: Set[Future]) -> None:
+    """Terminate retired worker processes once their other calls finish."""
+    wait_futures(calls)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
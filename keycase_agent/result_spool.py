@@ -0,0 +1,411 @@
+"""Durable on-disk spool of run results that could not be uploaded."""
+
+import glob
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .exceptions import ResultRejectedError
+from .result_uploader import UPLOAD_RESULT, UploadJob
+from .utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+# How spooled results are flushed to disk (SQLite "synchronous" setting):
+# - always: fsync on every write; survives power loss (default)
+# - normal: fsync at WAL checkpoints; survives an agent crash
+# - off: leave flushing to the OS
+FSYNC_ALWAYS = "always"
+FSYNC_NORMAL = "normal"
+FSYNC_OFF = "off"
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_NORMAL, FSYNC_OFF)
+_SYNCHRONOUS = {FSYNC_ALWAYS: "FULL", FSYNC_NORMAL: "NORMAL", FSYNC_OFF: "OFF"}
+
+DEFAULT_SPOOL_FILE = "result_spool.db"
+
+# Replay schedule: retry after a failure with a doubling delay, and check
+# for new entries every DEFAULT_REPLAY_POLL_INTERVAL seconds otherwise
+DEFAULT_REPLAY_INITIAL_DELAY = 5.0
+DEFAULT_REPLAY_MAX_DELAY = 300.0
+DEFAULT_REPLAY_POLL_INTERVAL = 60.0
+REPLAY_BATCH_SIZE = 20
+# Failed replays of one result before it is dead-lettered; with the default
+# delays this is several hours of trying
+DEFAULT_REPLAY_MAX_ATTEMPTS = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    reason TEXT,
+    spooled_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'result',
+    dead_lettered_at TEXT
+)
+"""
+
+
+@dataclass
+class SpooledResult:
+    """A result stored in the spool."""
+
+    id: int
+    project_id: int
+    run_id: int
+    result: Dict[str, Any]
+    reason: Optional[str]
+    attempts: int
+    kind: str = UPLOAD_RESULT
+
+
+class ResultSpool:
+    """Append-only store of results waiting to be re-sent, backed by SQLite.
+
+    Adding or removing a result is a single indexed write, independent of
+    how many results are spooled. The database is created on the first
+    append, so an agent whose uploads never fail leaves no file behind.
+
+    A result that will never be accepted is dead-lettered: it stays in the
+    database, with the reason, for inspection, but is no longer replayed.
+    """
+
+    def __init__(self, path: str, fsync_policy: str = FSYNC_ALWAYS) -> None:
+        """Create a spool.
+
+        Args:
+            path: Database file
+            fsync_policy: One of FSYNC_POLICIES
+
+        Raises:
+            ValueError: If the fsync policy is unknown
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(
+                f"fsync_policy must be one of {list(FSYNC_POLICIES)}, "
+                f"got '{fsync_policy}'"
+            )
+        self.path = path
+        self.fsync_policy = fsync_policy
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self, create: bool) -> Optional[sqlite3.Connection]:
+        """Open the database. Caller holds lock.
+
+        Returns:
+            The connection, or None if the file does not exist and
+            ``create`` is False
+        """
+        if self._conn is None:
+            if not create and not os.path.exists(self.path):
+                return None
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={_SYNCHRONOUS[self.fsync_policy]}")
+            conn.execute(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            if "kind" not in columns:
+                # Spools written before streamed results had only whole results
+                conn.execute(
+                    "ALTER TABLE results "
+                    "ADD COLUMN kind TEXT NOT NULL DEFAULT 'result'"
+                )
+            if "dead_lettered_at" not in columns:
+                conn.execute("ALTER TABLE results ADD COLUMN dead_lettered_at TEXT")
+            self._conn = conn
+        return self._conn
+
+    def append(
+        self,
+        project_id: int,
+        run_id: int,
+        result: Dict[str, Any],
+        reason: str,
+        kind: str = UPLOAD_RESULT,
+    ) -> int:
+        """Store a result durably.
+
+        Args:
+            project_id: Project identifier
+            run_id: Run identifier
+            result: Result to upload
+            reason: Why it was not uploaded
+            kind: What the result is, one of UPLOAD_KINDS
+
+        Returns:
+            The entry ID
+        """
+        encoded = json_codec.dumps(result, default=str)
+        with self._lock:
+            conn = self._connect(create=True)
+            cursor = conn.execute(
+                "INSERT INTO results "
+                "(project_id, run_id, reason, spooled_at, result, kind) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    project_id,
+                    run_id,
+                    reason,
+                    datetime.now().isoformat(),
+                    encoded,
+                    kind,
+                ),
+            )
+            return cursor.lastrowid
+
+    def peek(self, limit: int = REPLAY_BATCH_SIZE) -> List[SpooledResult]:
+        """Get the oldest results to replay without removing them."""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return []
+            rows = conn.execute(
+                "SELECT id, project_id, run_id, result, reason, attempts, kind "
+                "FROM results WHERE dead_lettered_at IS NULL ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            SpooledResult(
+                id=row[0],
+                project_id=row[1],
+                run_id=row[2],
+                result=json_codec.loads(row[3]),
+                reason=row[4],
+                attempts=row[5],
+                kind=row[6],
+            )
+            for row in rows
+        ]
+
+    def remove(self, entry_id: int) -> None:
+        """Delete a result once it has been uploaded."""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is not None:
+                conn.execute("DELETE FROM results WHERE id = ?", (entry_id,))
+
+    def record_attempt(self, entry_id: int) -> None:
+        """Count a failed replay attempt of a result."""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is not None:
+                conn.execute(
+                    "UPDATE results SET attempts = attempts + 1 WHERE id = ?",
+                    (entry_id,),
+                )
+
+    def dead_letter(self, entry_id: int, reason: str) -> None:
+        """Stop replaying a result, keeping it with the reason."""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is not None:
+                conn.execute(
+                    "UPDATE results SET attempts = attempts + 1, reason = ?, "
+                    "dead_lettered_at = ? WHERE id = ?",
+                    (reason, datetime.now().isoformat(), entry_id),
+                )
+
+    def count(self) -> int:
+        """Get the number of results waiting to be replayed."""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return 0
+            return conn.execute(
+                "SELECT COUNT(*) FROM results WHERE dead_lettered_at IS NULL"
+            ).fetchone()[0]
+
+    def dead_letter_count(self) -> int:
+        """Get the number of dead-lettered results."""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return 0
+            return conn.execute(
+                "SELECT COUNT(*) FROM results WHERE dead_lettered_at IS NOT NULL"
+            ).fetchone()[0]
+
+    def import_legacy_files(self, directory: str) -> int:
+        """Move result files written by earlier versions into the spool.
+
+        Earlier versions saved each failed result as
+        ``result_p<project>_r<run>_<timestamp>.json`` next to a summary file.
+        Imported files are deleted; the summary file is removed once empty.
+
+        Returns:
+            Number of imported results
+        """
+        imported = 0
+        for filepath in sorted(glob.glob(os.path.join(directory, "result_p*.json"))):
+            try:
+                with open(filepath, "rb") as f:
+                    saved = json_codec.loads(f.read())
+                metadata = saved["metadata"]
+                self.append(
+                    metadata["project_id"],
+                    metadata["run_id"],
+                    saved["result"],
+                    metadata.get("reason", "Imported from failed_results"),
+                )
+                os.remove(filepath)
+                imported += 1
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not import saved result {filepath}: {e}")
+        summary_file = os.path.join(directory, "failed_results_summary.json")
+        if imported and not glob.glob(os.path.join(directory, "result_p*.json")):
+            try:
+                os.remove(summary_file)
+            except OSError:
+                pass
+        if imported:
+            logger.info(f"Imported {imported} saved results into the result spool")
+        return imported
+
+    def close(self) -> None:
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+
+class SpoolReplayer:
+    """Background thread re-sending spooled results.
+
+    Results are replayed oldest first and removed once uploaded. The first
+    failure ends the pass, because the server is most likely unreachable,
+    and the next pass waits with a doubling delay. ``wake()`` starts a pass
+    right away, e.g. when the connection to the server is restored.
+
+    A result the server rejects (ResultRejectedError), or one that failed
+    ``max_attempts`` times, is dead-lettered so it does not block the
+    results behind it. A rejection does not end the pass.
+    """
+
+    def __init__(
+        self,
+        spool: ResultSpool,
+        upload: Callable[[UploadJob], bool],
+        initial_delay: float = DEFAULT_REPLAY_INITIAL_DELAY,
+        max_delay: float = DEFAULT_REPLAY_MAX_DELAY,
+        poll_interval: float = DEFAULT_REPLAY_POLL_INTERVAL,
+        max_attempts: int = DEFAULT_REPLAY_MAX_ATTEMPTS,
+    ) -> None:
+        """Create a replayer.
+
+        Args:
+            spool: Spool to drain
+            upload: Makes one upload attempt; returns True once the result is
+                accepted. ResultRejectedError dead-letters the result; other
+                exceptions count as a failed attempt.
+            initial_delay: Seconds before retrying after a failed pass
+            max_delay: Upper bound of the retry delay
+            poll_interval: Seconds between checks of an empty spool
+            max_attempts: Failed replays of a result before it is
+                dead-lettered
+        """
+        self.spool = spool
+        self.upload = upload
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.max_attempts = max(1, max_attempts)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._delay = initial_delay
+
+    def start(self) -> None:
+        """Start the replay thread. Calling it again is a no-op."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ResultSpoolReplay", daemon=True
+        )
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Replay now instead of waiting for the next scheduled pass."""
+        self._delay = self.initial_delay
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            replayed = self.replay_pending()
+            if self._stop.is_set():
+                return
+            if replayed:
+                wait_for = self.poll_interval
+                self._delay = self.initial_delay
+            else:
+                wait_for = self._delay
+                logger.info(f"Result spool replay failed, retrying in {wait_for}s")
+                self._delay = min(self.max_delay, self._delay * 2)
+            self._wake.wait(wait_for)
+            self._wake.clear()
+
+    def replay_pending(self) -> bool:
+        """Upload spooled results until the spool is empty or one fails.
+
+        Returns:
+            True if every spooled result was uploaded
+        """
+        while not self._stop.is_set():
+            entries = self.spool.peek()
+            if not entries:
+                return True
+            for entry in entries:
+                if self._stop.is_set():
+                    return False
+                job = UploadJob(
+                    entry.project_id,
+                    entry.run_id,
+                    entry.result,
+                    entry.attempts + 1,
+                    kind=entry.kind,
+                )
+                rejected = None
+                try:
+                    uploaded = self.upload(job)
+                except ResultRejectedError as e:
+                    uploaded, rejected = False, str(e)
+                except Exception as e:
+                    logger.error(f"Replay of result for run {entry.run_id} failed: {e}")
+                    uploaded = False
+                if uploaded:
+                    self.spool.remove(entry.id)
+                    logger.info(f"Replayed spooled result of run {entry.run_id}")
+                elif rejected is not None:
+                    self._dead_letter(entry, rejected)
+                elif job.attempts >= self.max_attempts:
+                    self._dead_letter(entry, f"All {job.attempts} replays failed")
+                    return False
+                else:
+                    self.spool.record_attempt(entry.id)
+                    return False
+        return False
+
+    def _dead_letter(self, entry: SpooledResult, reason: str) -> None:
+        self.spool.dead_letter(entry.id, reason)
+        logger.error(
+            f"Dead-lettered spooled {entry.kind} of run {entry.run_id}: {reason}"
+        )
@@ -0,0 +1,145 @@
+"""Streaming of run results to the server while the run executes."""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .result_uploader import (
+    UPLOAD_CLOSE_RUN,
+    UPLOAD_FLOW_RESULTS,
+    ResultUploader,
+    UploadJob,
+)
+
+logger = logging.getLogger(__name__)
+
+# How results reach the server:
+# - single: the whole result in one request once the run ends (default)
+# - stream: flow results in chunks as they complete, then a closing summary
+RESULT_UPLOAD_SINGLE = "single"
+RESULT_UPLOAD_STREAM = "stream"
+RESULT_UPLOAD_MODES = (RESULT_UPLOAD_SINGLE, RESULT_UPLOAD_STREAM)
+
+DEFAULT_STREAM_CHUNK_SIZE = 50
+
+
+@dataclass
+class _RunStream:
+    """Upload state of one streamed run."""
+
+    buffer: List[Dict[str, Any]] = field(default_factory=list)
+    next_sequence: int = 0
+    pending_chunks: int = 0
+    failed: bool = False
+    summary: Optional[Dict[str, Any]] = None
+
+
+class ResultStreamer:
+    """Uploads a run's flow results in chunks while the run executes.
+
+    Every ``chunk_size`` flow results are sent as one chunk
+    ``{"runId", "sequence", "flowResults"}``; the sequence number lets the
+    server ignore a chunk it receives twice after a retry. When the run ends
+    the remaining results go out as a last chunk, and once the server has
+    accepted every chunk the run summary (with ``flowResultCount``) closes
+    the run. A crash therefore loses at most the results not yet chunked.
+
+    Chunks and the summary go through the result uploader. If a chunk is
+    given up it is spooled, and so is the summary after it, so the spool
+    replays the rest of the run in order.
+    """
+
+    def __init__(
+        self,
+        uploader: ResultUploader,
+        on_give_up: Callable[[UploadJob, str], None],
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    ) -> None:
+        """Create a streamer.
+
+        Args:
+            uploader: Uploader sending chunks and summaries
+            on_give_up: Called with a summary that will not be uploaded
+                because a chunk of its run was given up
+            chunk_size: Flow results per chunk
+        """
+        self.uploader = uploader
+        self.on_give_up = on_give_up
+        self.chunk_size = max(1, chunk_size)
+        self._runs: Dict[Tuple[int, int], _RunStream] = {}
+        self._lock = threading.Lock()
+
+    def add_flow_result(
+        self, project_id: int, run_id: int, flow_result: Dict[str, Any]
+    ) -> None:
+        """Buffer a completed flow result, sending a chunk once it is full."""
+        with self._lock:
+            stream = self._runs.setdefault((project_id, run_id), _RunStream())
+            stream.buffer.append(flow_result)
+            chunk = (
+                self._take_chunk(run_id, stream)
+                if len(stream.buffer) >= self.chunk_size
+                else None
+            )
+        if chunk is not None:
+            self.uploader.submit(project_id, run_id, chunk, kind=UPLOAD_FLOW_RESULTS)
+
+    def finish(self, project_id: int, run_id: int, summary: Dict[str, Any]) -> None:
+        """Send the last chunk of a run and close it once all are uploaded."""
+        with self._lock:
+            stream = self._runs.setdefault((project_id, run_id), _RunStream())
+            stream.summary = summary
+            chunk = self._take_chunk(run_id, stream) if stream.buffer else None
+        if chunk is not None:
+            self.uploader.submit(project_id, run_id, chunk, kind=UPLOAD_FLOW_RESULTS)
+        self._close_if_done(project_id, run_id)
+
+    def chunk_uploaded(self, job: UploadJob) -> None:
+        """Count a chunk the server accepted."""
+        self._chunk_done(job, failed=False)
+
+    def chunk_given_up(self, job: UploadJob) -> None:
+        """Count a chunk that was spooled instead of uploaded."""
+        self._chunk_done(job, failed=True)
+
+    def open_run_count(self) -> int:
+        """Get the number of runs not closed yet."""
+        with self._lock:
+            return len(self._runs)
+
+    def _take_chunk(self, run_id: int, stream: _RunStream) -> Dict[str, Any]:
+        """Remove the buffered results as a chunk. Caller holds lock."""
+        chunk = {
+            "runId": run_id,
+            "sequence": stream.next_sequence,
+            "flowResults": stream.buffer,
+        }
+        stream.buffer = []
+        stream.next_sequence += 1
+        stream.pending_chunks += 1
+        return chunk
+
+    def _chunk_done(self, job: UploadJob, failed: bool) -> None:
+        with self._lock:
+            stream = self._runs.get((job.project_id, job.run_id))
+            if stream is None:
+                return  # Not a chunk of an open run
+            stream.pending_chunks -= 1
+            stream.failed = stream.failed or failed
+        self._close_if_done(job.project_id, job.run_id)
+
+    def _close_if_done(self, project_id: int, run_id: int) -> None:
+        """Close a finished run whose chunks are all uploaded or spooled."""
+        with self._lock:
+            stream = self._runs.get((project_id, run_id))
+            if stream is None or stream.summary is None or stream.pending_chunks > 0:
+                return
+            del self._runs[(project_id, run_id)]
+        if stream.failed:
+            job = UploadJob(project_id, run_id, stream.summary, kind=UPLOAD_CLOSE_RUN)
+            self.on_give_up(job, "Flow results of the run were spooled")
+        else:
+            self.uploader.submit(
+                project_id, run_id, stream.summary, kind=UPLOAD_CLOSE_RUN
+            )
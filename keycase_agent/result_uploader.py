@@ -0,0 +1,246 @@
+"""Background upload of run results with scheduled retries."""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .exceptions import ResultRejectedError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPLOAD_WORKERS = 2
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_INITIAL_RETRY_DELAY = 2.0
+DEFAULT_RETRY_BACKOFF = 2.0
+DEFAULT_MAX_RETRY_DELAY = 60.0
+
+# What an upload job carries:
+# - result: a whole run result (default)
+# - flow_results: a chunk of a streamed run's flow results
+# - close_run: the summary closing a streamed run
+UPLOAD_RESULT = "result"
+UPLOAD_FLOW_RESULTS = "flow_results"
+UPLOAD_CLOSE_RUN = "close_run"
+UPLOAD_KINDS = (UPLOAD_RESULT, UPLOAD_FLOW_RESULTS, UPLOAD_CLOSE_RUN)
+
+
+@dataclass
+class UploadJob:
+    """A run result waiting to be uploaded."""
+
+    project_id: int
+    run_id: int
+    result: Dict[str, Any]
+    attempts: int = 0
+    kind: str = UPLOAD_RESULT
+
+
+class ResultUploader:
+    """Uploads run results on worker threads, off the execution thread.
+
+    ``submit()`` returns at once, so a run's slot is released as soon as its
+    flows finish, whatever the server's latency. A failed attempt does not
+    block a worker: the job is rescheduled after an exponentially growing
+    delay and other results are uploaded in the meantime. After
+    ``max_attempts`` failures, when the server rejects the result, or when
+    the uploader is stopped, the job is handed to ``on_give_up`` (which saves
+    it locally).
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[UploadJob], bool],
+        on_give_up: Callable[[UploadJob, str], None],
+        workers: int = DEFAULT_UPLOAD_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        initial_retry_delay: float = DEFAULT_INITIAL_RETRY_DELAY,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY,
+    ) -> None:
+        """Create an uploader; worker threads start on the first submit.
+
+        Args:
+            upload: Makes one upload attempt; returns True once the result is
+                accepted. ResultRejectedError gives the job up at once; other
+                exceptions count as a failed attempt.
+            on_give_up: Called with a job that will not be retried and why
+            workers: Number of upload threads
+            max_attempts: Attempts per result before giving up
+            initial_retry_delay: Seconds before the first retry
+            retry_backoff: Factor applied to the delay after each retry
+            max_retry_delay: Upper bound of the retry delay
+        """
+        self.upload = upload
+        self.on_give_up = on_give_up
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.initial_retry_delay = initial_retry_delay
+        self.retry_backoff = retry_backoff
+        self.max_retry_delay = max_retry_delay
+
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        # Heap of (due time, sequence, job); the sequence keeps FIFO order
+        self._schedule: List[Tuple[float, int, UploadJob]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        self._stopping = False
+
+    def _start_workers(self) -> None:
+        """Start the worker threads. Caller holds lock."""
+        if self._running:
+            return
+        self._running = True
+        self._stopping = False
+        self._threads = [
+            threading.Thread(
+                target=self._worker, name=f"ResultUploader-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        project_id: int,
+        run_id: int,
+        result: Dict[str, Any],
+        kind: str = UPLOAD_RESULT,
+    ) -> None:
+        """Queue a result (or part of one, see UPLOAD_KINDS) for upload."""
+        job = UploadJob(project_id, run_id, result, kind=kind)
+        with self._lock:
+            self._start_workers()
+            self._push(job, time.monotonic())
+        logger.info(f"Queued result of run {run_id} for upload")
+
+    def _push(self, job: UploadJob, due_at: float) -> None:
+        """Schedule a job. Caller holds lock."""
+        heapq.heappush(self._schedule, (due_at, next(self._sequence), job))
+        self._ready.notify_all()
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = self.initial_retry_delay * self.retry_backoff ** (attempts - 1)
+        return min(self.max_retry_delay, delay)
+
+    def pending_count(self) -> int:
+        """Get the number of results queued or being uploaded."""
+        with self._lock:
+            return len(self._schedule) + self._in_flight
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued result is uploaded or given up.
+
+        Returns:
+            True if no result is pending
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._schedule or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._ready.wait(remaining)
+            return True
+
+    def _next_job(self) -> Optional[UploadJob]:
+        """Wait for the next due job, or None once stopped."""
+        with self._lock:
+            while self._running:
+                if self._schedule:
+                    due_at = self._schedule[0][0]
+                    wait_for = due_at - time.monotonic()
+                    if wait_for <= 0:
+                        job = heapq.heappop(self._schedule)[2]
+                        self._in_flight += 1
+                        return job
+                else:
+                    wait_for = None
+                self._ready.wait(wait_for)
+            return None
+
+    def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            job.attempts += 1
+            rejected = None
+            try:
+                uploaded = self.upload(job)
+            except ResultRejectedError as e:
+                uploaded, rejected = False, str(e)
+            except Exception as e:
+                logger.error(f"Result upload of run {job.run_id} failed: {e}")
+                uploaded = False
+            self._finish(job, uploaded, rejected)
+
+    def _finish(
+        self, job: UploadJob, uploaded: bool, rejected: Optional[str] = None
+    ) -> None:
+        """Reschedule a failed job or give it up, and release its slot."""
+        give_up = None
+        with self._lock:
+            if not uploaded:
+                if rejected is not None:
+                    give_up = rejected
+                elif job.attempts >= self.max_attempts:
+                    give_up = f"All {job.attempts} upload attempts failed"
+                elif self._stopping:
+                    give_up = "Agent shutting down"
+                else:
+                    delay = self._retry_delay(job.attempts)
+                    logger.info(
+                        f"Retrying result upload of run {job.run_id} in "
+                        f"{delay:.1f}s (attempt {job.attempts}/{self.max_attempts})"
+                    )
+                    self._push(job, time.monotonic() + delay)
+        if give_up is not None:
+            self._give_up(job, give_up)
+        with self._lock:
+            # Counted until given up, so wait_idle() covers the local save
+            self._in_flight -= 1
+            self._ready.notify_all()
+
+    def _give_up(self, job: UploadJob, reason: str) -> None:
+        logger.error(f"Giving up result upload of run {job.run_id}: {reason}")
+        try:
+            self.on_give_up(job, reason)
+        except Exception as e:
+            logger.error(f"Failed to hand off result of run {job.run_id}: {e}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the workers, giving up results that are not uploaded yet.
+
+        Results due now get ``timeout`` seconds to finish uploading; results
+        waiting for a retry are given up right away.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            self._stopping = True
+            now = time.monotonic()
+            due = [entry for entry in self._schedule if entry[0] <= now]
+            waiting = [entry[2] for entry in self._schedule if entry[0] > now]
+            self._schedule = due
+            heapq.heapify(self._schedule)
+        for job in waiting:
+            self._give_up(job, "Agent shutting down")
+
+        self.wait_idle(max(0.0, deadline - time.monotonic()))
+        with self._lock:
+            self._running = False
+            left = [entry[2] for entry in self._schedule]
+            self._schedule = []
+            threads, self._threads = self._threads, []
+            self._ready.notify_all()
+        for job in left:
+            self._give_up(job, "Agent shutting down")
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
@@ -1,38 +1,117 @@
 import logging
 import threading
+from typing import Any, Dict, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+RunId = Union[int, str]
+
 
 class AgentStateTracker:
-    def __init__(self):
+    """Tracks agent availability as a number of execution slots.
+
+    Each accepted run occupies one slot until it is released. The agent is
+    busy when every slot is taken. With the default single slot this behaves
+    like the original busy/available flag.
+    """
+
+    def __init__(self, max_slots: int = 1):
+        self.max_slots = max(1, max_slots)
+        self._active_runs: Dict[str, RunId] = {}
         self._is_busy = False
         self._lock = threading.Lock()
         self._shutdown_event = threading.Event()
 
+    def _status(self) -> str:
+        """Get the status string. Caller must hold the lock."""
+        busy = self._is_busy or len(self._active_runs) >= self.max_slots
+        return "BUSY" if busy else "AVAILABLE"
+
     def set_busy(self, busy: bool):
+        """Force the agent busy, or release every slot and mark it available."""
         with self._lock:
             self._is_busy = busy
-        status = "BUSY" if busy else "AVAILABLE"
+            if not busy:
+                self._active_runs.clear()
+            status = self._status()
         logger.info(f"Agent status set to: {status}")
         return status
 
     def is_busy(self) -> bool:
         with self._lock:
-            return self._is_busy
+            return self._status() == "BUSY"
 
     def try_set_busy(self) -> bool:
         """Atomically check if available and set busy if so.
 
+        Legacy single-run API; prefer try_acquire_slot() which tracks runs.
+
         Returns:
             True if successfully set to busy, False if already busy
         """
         with self._lock:
-            if self._is_busy:
+            if self._status() == "BUSY":
                 return False
             self._is_busy = True
             return True
 
+    def try_acquire_slot(self, run_id: RunId) -> bool:
+        """Atomically reserve an execution slot for a run.
+
+        Args:
+            run_id: Run that will occupy the slot
+
+        Returns:
+            True if a slot was reserved, False if all slots are taken or the
+            run already holds one
+        """
+        key = str(run_id)
+        with self._lock:
+            if key in self._active_runs or self._status() == "BUSY":
+                return False
+            self._active_runs[key] = run_id
+            logger.info(
+                f"Slot acquired for run {run_id} "
+                f"({len(self._active_runs)}/{self.max_slots} in use)"
+            )
+            return True
+
+    def release_slot(self, run_id: RunId) -> str:
+        """Release the slot held by a run. Releasing twice is a no-op.
+
+        Returns:
+            Agent status after the release
+        """
+        with self._lock:
+            released = self._active_runs.pop(str(run_id), None) is not None
+            status = self._status()
+        if released:
+            logger.info(f"Slot released for run {run_id}; agent status: {status}")
+        return status
+
+    def active_runs(self) -> List[RunId]:
+        """Get the runs currently holding a slot."""
+        with self._lock:
+            return list(self._active_runs.values())
+
+    def available_slots(self) -> int:
+        """Get the number of free execution slots."""
+        with self._lock:
+            if self._is_busy:
+                return 0
+            return max(0, self.max_slots - len(self._active_runs))
+
+    def get_capacity(self) -> Dict[str, Any]:
+        """Get status and slot usage, as advertised in status events."""
+        with self._lock:
+            status = self._status()
+            available = 0 if self._is_busy else self.max_slots - len(self._active_runs)
+            return {
+                "status": status,
+                "maxSlots": self.max_slots,
+                "availableSlots": max(0, available),
+            }
+
     def shutdown_requested(self) -> bool:
         return self._shutdown_event.is_set()
 
@@ -43,5 +122,5 @@ class AgentStateTracker:
     def clear_shutdown(self):
         self._shutdown_event.clear()
 
-    def wait_for_shutdown(self, timeout=None):
+    def wait_for_shutdown(self, timeout: Optional[float] = None):
         return self._shutdown_event.wait(timeout=timeout)
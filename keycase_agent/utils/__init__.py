@@ -1,5 +1,6 @@
 from .auth_helper import auth_request, login
 from .event_sender import (
+    EventSender,
     accepted_execution,
     busy_message,
     completed_execution,
@@ -8,10 +9,12 @@ from .event_sender import (
     send_event,
     status_update,
 )
+from .http_client import HttpClient
 
 __all__ = [
     "login",
     "auth_request",
+    "EventSender",
     "configure_batching",
     "send_event",
     "accepted_execution",
@@ -19,4 +22,5 @@ __all__ = [
     "progress_event",
     "status_update",
     "busy_message",
+    "HttpClient",
 ]
@@ -2,11 +2,12 @@ import logging
 import platform
 import sys
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Mapping, Optional
 
 import requests
 
 from ..exceptions import LoginError
+from .http_client import HttpClient, default_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,6 +32,7 @@ def authenticate_agent(
     version: str = "1.0.0",
     capabilities: Optional[list] = None,
     tags: Optional[list] = None,
+    http_client: Optional[HttpClient] = None,
 ) -> AgentAuthResponse:
     """Authenticate agent with AgentToken and get access credentials.
 
@@ -41,6 +43,7 @@ def authenticate_agent(
         version: Agent version
         capabilities: List of capabilities the agent supports
         tags: List of labels for categorization
+        http_client: Client to send the request with (default: shared client)
 
     Returns:
         AgentAuthResponse with credentials and connection info
@@ -68,9 +71,9 @@ def authenticate_agent(
     response = None
     try:
         logger.info(f"Authenticating agent '{agent_name}' at {url}")
-        response = requests.post(url, json=payload)
+        response = (http_client or default_client).post(url, json=payload)
         response.raise_for_status()
-        data = response.json()
+        data = HttpClient.decode_json(response)
 
         auth_response = AgentAuthResponse(
             agent_id=data["agentId"],
@@ -96,12 +99,15 @@ def authenticate_agent(
         raise LoginError(f"Agent authentication failed: {e}", status_code=None)
 
 
-def refresh_access_token(http_url: str, refresh_token: str) -> Dict[str, str]:
+def refresh_access_token(
+    http_url: str, refresh_token: str, http_client: Optional[HttpClient] = None
+) -> Dict[str, str]:
     """Refresh an expired access token.
 
     Args:
         http_url: Base HTTP API URL
         refresh_token: The refresh token
+        http_client: Client to send the request with (default: shared client)
 
     Returns:
         Dict with new accessToken and refreshToken
@@ -115,9 +121,9 @@ def refresh_access_token(http_url: str, refresh_token: str) -> Dict[str, str]:
     response = None
     try:
         logger.info("Refreshing access token")
-        response = requests.post(url, json=payload)
+        response = (http_client or default_client).post(url, json=payload)
         response.raise_for_status()
-        data = response.json()
+        data = HttpClient.decode_json(response)
 
         logger.info("Token refresh successful")
         return {
@@ -140,9 +146,9 @@ def login(username: str, password: str, url: str = "http://localhost:3000/api/lo
     global auth_token
     payload = {"username": username, "password": password}
     try:
-        response = requests.post(url, json=payload)
+        response = default_client.post(url, json=payload)
         response.raise_for_status()
-        data = response.json()
+        data = HttpClient.decode_json(response)
         auth_token = data["token"]
         logger.info("Login successful")
         return auth_token
@@ -162,45 +168,74 @@ class ApiResponse:
     status_code: Optional[int] = None
     error_code: Optional[int] = None
     error_message: Optional[str] = None
+    headers: Optional[Mapping[str, str]] = None
+    # Length of the response body in bytes
+    content_length: Optional[int] = None
 
 
 def auth_request_with_details(
-    method: str, url: str, auth_token: str, data=None, params=None
+    method: str,
+    url: str,
+    auth_token: str,
+    data=None,
+    params=None,
+    http_client: Optional[HttpClient] = None,
+    timeout=None,
+    headers: Optional[Dict[str, str]] = None,
 ) -> ApiResponse:
     """Make authenticated API request with detailed response.
 
+    Args:
+        http_client: Client to send the request with (default: shared client)
+        timeout: Request timeout in seconds (default: the client's timeout)
+        headers: Extra request headers, e.g. If-None-Match
+
     Returns:
-        ApiResponse with success status, data, and error details if failed
+        ApiResponse with success status, data, and error details if failed.
+        A 304 Not Modified reply counts as success, with no data.
     """
     if not auth_token:
         return ApiResponse(
             success=False, error_message="No token found. You must login first."
         )
 
-    headers = {
+    request_headers = {
         "Authorization": f"Bearer {auth_token}",
         "Content-Type": "application/json",
+        **(headers or {}),
     }
 
     response = None
     try:
-        response = requests.request(
-            method, url, headers=headers, json=data, params=params
+        response = (http_client or default_client).request(
+            method,
+            url,
+            headers=request_headers,
+            json=data,
+            params=params,
+            timeout=timeout,
         )
 
+        if response.status_code == 304:
+            return ApiResponse(success=True, status_code=304, headers=response.headers)
+
         # Parse response body
         response_data = None
         if response.content and response.headers.get("Content-Type", "").startswith(
             "application/json"
         ):
-            response_data = response.json()
+            response_data = HttpClient.decode_json(response)
         else:
             response_data = response.text
 
         # Check for success
         if 200 <= response.status_code < 300:
             return ApiResponse(
-                success=True, data=response_data, status_code=response.status_code
+                success=True,
+                data=response_data,
+                status_code=response.status_code,
+                headers=response.headers,
+                content_length=len(response.content or b""),
             )
         else:
             # Extract error details from response
@@ -228,7 +263,15 @@ def auth_request_with_details(
 
 
 # 2. Function to make authenticated API requests (legacy, returns None on error)
-def auth_request(method: str, url: str, auth_token: str, data=None, params=None):
+def auth_request(
+    method: str,
+    url: str,
+    auth_token: str,
+    data=None,
+    params=None,
+    http_client: Optional[HttpClient] = None,
+    timeout=None,
+):
     if not auth_token:
         raise Exception("No token found. You must login first.")
 
@@ -239,8 +282,8 @@ def auth_request(method: str, url: str, auth_token: str, data=None, params=None)
 
     response = None
     try:
-        response = requests.request(
-            method, url, headers=headers, json=data, params=params
+        response = (http_client or default_client).request(
+            method, url, headers=headers, json=data, params=params, timeout=timeout
         )
         response.raise_for_status()
 
@@ -248,7 +291,7 @@ def auth_request(method: str, url: str, auth_token: str, data=None, params=None)
         if response.content and response.headers.get("Content-Type", "").startswith(
             "application/json"
         ):
-            return response.json()
+            return HttpClient.decode_json(response)
         else:
             return response.text  # fallback: return raw text
     except Exception as e:
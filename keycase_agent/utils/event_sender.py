@@ -1,119 +1,509 @@
 # event_sender.py
 # utils/event_sender.py
-import json
+import itertools
 import logging
 import threading
 import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from . import json_codec
+from .log_values import LogValue
 
 logger = logging.getLogger(__name__)
 
-# Internal queue and control variables
-event_queue = []
-queue_lock = threading.Lock()
-_ws = None
-_flush_interval = 10.0
-_flushing = False
+# Batching limits: a batch is flushed when any of them is reached
+DEFAULT_MAX_BATCH_EVENTS = 100
+DEFAULT_MAX_BATCH_BYTES = 256 * 1024
+DEFAULT_MAX_LATENCY = 1.0
 
+# Queue bound and what happens to an event that does not fit:
+# - drop_oldest: discard the oldest queued event to make room (default)
+# - drop_newest: discard the event being queued
+# - block: wait up to DEFAULT_BLOCK_TIMEOUT seconds for room, then drop it
+DEFAULT_MAX_QUEUE_EVENTS = 10000
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK)
+DEFAULT_BLOCK_TIMEOUT = 5.0
 
-def configure_batching(ws, flush_interval: float = 10.0):
-    """
-    Initialize batching with a WebSocket connection and interval in seconds.
-    Must be called once (e.g. in KeycaseAgent.on_open).
-    """
-    global _ws, _flush_interval, _flushing
-    _ws = ws
-    _flush_interval = flush_interval
-    if not _flushing:
-        _flushing = True
-        thread = threading.Thread(target=_flush_loop, name="EventBatcher", daemon=True)
-        thread.start()
-        logger.info(f"Event batching started with interval={_flush_interval}s")
+# Events that end a flow or run; queuing one flushes the batch right away
+TERMINAL_EVENTS = frozenset(
+    {
+        "agent_execution_completed_notify",
+        "agent_execution_failed_notify",
+        "agent_execution_cancelled_notify",
+        "agent_execution_aborted_notify",
+    }
+)
+TERMINAL_STATUSES = frozenset({"PASSED", "FAILED", "SKIPPED", "ABORTED", "TIMEOUT"})
 
 
-def _flush_loop():
-    while _flushing:
-        time.sleep(_flush_interval)
-        flush_events()
+def _is_terminal(raw_event, payload) -> bool:
+    """Check whether an event ends a flow or run."""
+    if raw_event in TERMINAL_EVENTS:
+        return True
+    return isinstance(payload, dict) and payload.get("status") in TERMINAL_STATUSES
 
 
-def flush_events():
+def _send_priority(ws: Any, data: str) -> None:
+    """Send a message ahead of queued ones if the connection supports it."""
+    from ..websocket_client import WebSocketClient
+
+    if isinstance(ws, WebSocketClient):
+        ws.send(data, priority=True)
+    else:
+        ws.send(data)
+
+
+class EventSender:
+    """Batches outgoing events for one agent connection.
+
+    Each sender has its own queue, flush thread and connection, so several
+    agents can run in one process. The connection is normally the agent's
+    ``WebSocketClient``: it holds frames sent while it reconnects and replays
+    them in order once the connection is open again. A raw websocket works
+    too, in which case each new connection is passed to ``set_connection()``.
+
+    Queued events are flushed as soon as any limit is reached:
+    ``max_batch_events`` events, ``max_batch_bytes`` of encoded events, or
+    ``flush_interval`` seconds since the oldest queued event. Terminal events
+    (run completed, flow passed/failed, ...) are flushed immediately. A batch
+    never exceeds either size limit; larger backlogs go out as several frames.
+
+    At most ``max_queue_events`` events are held; ``overflow_policy`` decides
+    which event is lost when the queue is full (see OVERFLOW_POLICIES). Each
+    queued event is kept as its encoded JSON text so its size is known and it
+    is encoded only once. Events are keyed so that a newer progress event for
+    the same (runId, flow id) replaces the queued one in place.
     """
-    Flush queued events as a batch. Sends {"events": [ ... ]} over the websocket.
+
+    def __init__(
+        self,
+        ws: Any = None,
+        flush_interval: float = DEFAULT_MAX_LATENCY,
+        max_batch_events: int = DEFAULT_MAX_BATCH_EVENTS,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        max_queue_events: int = DEFAULT_MAX_QUEUE_EVENTS,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+    ) -> None:
+        """Create a sender; call start() to begin flushing.
+
+        Args:
+            ws: WebSocketClient or other connection with a ``send(str)``
+                method (may be set later)
+            flush_interval: Maximum seconds an event waits in the queue
+            max_batch_events: Maximum events per batch frame
+            max_batch_bytes: Maximum encoded event bytes per batch frame
+            max_queue_events: Maximum events held while waiting to be sent
+            overflow_policy: Which event to drop when the queue is full
+
+        Raises:
+            ValueError: If the overflow policy is unknown
+        """
+        self._lock = threading.Lock()
+        self._queue_ready = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._queue: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._queued_bytes = 0
+        self._oldest_queued_at: Optional[float] = None
+        self._flush_requested = False
+        self._retry_at = 0.0
+        self._sequence = itertools.count()
+        self._dropped_events = 0
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._ws = ws
+        self.configure(
+            flush_interval=flush_interval,
+            max_batch_events=max_batch_events,
+            max_batch_bytes=max_batch_bytes,
+            max_queue_events=max_queue_events,
+            overflow_policy=overflow_policy,
+        )
+
+    def configure(
+        self,
+        flush_interval: float = DEFAULT_MAX_LATENCY,
+        max_batch_events: int = DEFAULT_MAX_BATCH_EVENTS,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        max_queue_events: int = DEFAULT_MAX_QUEUE_EVENTS,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+    ) -> None:
+        """Change the batching limits and overflow policy."""
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow_policy must be one of {list(OVERFLOW_POLICIES)}, "
+                f"got '{overflow_policy}'"
+            )
+        with self._lock:
+            self.flush_interval = flush_interval
+            self.max_batch_events = max(1, max_batch_events)
+            self.max_batch_bytes = max(1, max_batch_bytes)
+            self.max_queue_events = max(1, max_queue_events)
+            self.overflow_policy = overflow_policy
+            self._queue_ready.notify_all()
+
+    def set_connection(self, ws: Any) -> None:
+        """Use a (new) connection for all further sends, retrying queued events."""
+        with self._lock:
+            self._ws = ws
+            self._retry_at = 0.0
+            self._queue_ready.notify_all()
+
+    def start(self) -> None:
+        """Start the flush thread. Calling it again is a no-op."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._flush_loop, name="EventBatcher", daemon=True
+            )
+            self._thread.start()
+        logger.info(
+            f"Event batching started (max {self.max_batch_events} events, "
+            f"{self.max_batch_bytes} bytes, {self.flush_interval}s latency)"
+        )
+
+    def stop(self, flush: bool = True) -> None:
+        """Stop the flush thread, sending what is queued first if ``flush``."""
+        with self._lock:
+            self._running = False
+            thread, self._thread = self._thread, None
+            self._queue_ready.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        if flush:
+            self.flush()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def dropped_event_count(self) -> int:
+        """Get the number of events discarded because the queue was full."""
+        with self._lock:
+            return self._dropped_events
+
+    def queued_event_count(self) -> int:
+        """Get the number of events waiting to be sent."""
+        with self._lock:
+            return len(self._queue)
+
+    def _batch_due(self) -> bool:
+        """Check whether the queued events should be flushed. Caller holds lock."""
+        if not self._queue:
+            return False
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        return (
+            self._flush_requested
+            or len(self._queue) >= self.max_batch_events
+            or self._queued_bytes >= self.max_batch_bytes
+            or now - self._oldest_queued_at >= self.flush_interval
+        )
+
+    def _flush_loop(self) -> None:
+        while self._running:
+            with self._lock:
+                while self._running and not self._batch_due():
+                    timeout = None
+                    if self._queue:
+                        due_at = max(
+                            self._oldest_queued_at + self.flush_interval,
+                            self._retry_at,
+                        )
+                        timeout = max(0.0, due_at - time.monotonic())
+                    self._queue_ready.wait(timeout)
+            if self._running:
+                self.flush()
+
+    def _take_batches(self) -> List[List[str]]:
+        """Remove all queued events, split into batches. Caller holds lock."""
+        batches = []
+        batch: List[str] = []
+        batch_bytes = 0
+        for encoded in self._queue.values():
+            size = len(encoded) + 1
+            if batch and (
+                len(batch) >= self.max_batch_events
+                or batch_bytes + size > self.max_batch_bytes
+            ):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(encoded)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        self._queue.clear()
+        self._queued_bytes = 0
+        self._oldest_queued_at = None
+        self._flush_requested = False
+        self._queue_ready.notify_all()  # Wake producers blocked on a full queue
+        return batches
+
+    def _requeue(self, batches: List[List[str]]) -> None:
+        """Put unsent batches back at the front of the queue, within its bound."""
+        with self._lock:
+            pending = list(self._queue.items())
+            self._queue.clear()
+            for batch in batches:
+                for encoded in batch:
+                    self._queue[("retry", next(self._sequence))] = encoded
+            for key, encoded in pending:
+                self._queue[key] = encoded
+            while len(self._queue) > self.max_queue_events:
+                self._queue.popitem(last=False)
+                self._dropped_events += 1
+            self._queued_bytes = sum(len(e) + 1 for e in self._queue.values())
+            self._oldest_queued_at = time.monotonic()
+            self._retry_at = time.monotonic() + self.flush_interval
+
+    def flush(self) -> None:
+        """Send queued events as batches: {"events": [ ... ]} frames.
+
+        If there is no connection or a send fails, the unsent batches are
+        queued again and retried after ``flush_interval``.
+        """
+        # Serializes flushes so batches are sent in the order they were queued
+        with self._flush_lock:
+            with self._lock:
+                if not self._queue:
+                    return
+                batches = self._take_batches()
+                ws = self._ws
+            if ws is None:
+                logger.warning("WebSocket not configured, keeping events queued")
+                self._requeue(batches)
+                return
+            for index, batch in enumerate(batches):
+                frame = '{"events": [' + ", ".join(batch) + "]}"
+                try:
+                    logger.info("Flushing %d events as a batch", len(batch))
+                    logger.debug("Batch packet: %s", LogValue(frame))
+                    ws.send(frame)
+                except Exception as e:
+                    logger.error(f"Error sending batch, keeping events queued: {e}")
+                    self._requeue(batches[index:])
+                    return
+
+    def send_event(
+        self,
+        event_type: Any,
+        payload: Dict[str, Any],
+        immediate: bool = False,
+        coalesce_key: Optional[Hashable] = None,
+    ) -> None:
+        """Queue an event for batching, or send it immediately if requested.
+
+        Args:
+            event_type: WebSocketEventType or raw event string
+            payload: Event payload
+            immediate: Send directly without batching; a WebSocketClient that
+                has to queue it delivers it ahead of queued batches
+            coalesce_key: A queued event with the same key is replaced by this
+                one instead of both being sent
+        """
+        raw = event_type.value if hasattr(event_type, "value") else event_type
+        packet = {"event": raw, "payload": payload}
+        if immediate:
+            ws = self._ws
+            if ws is None:
+                logger.warning("WebSocket not configured, skipping immediate send")
+                return
+            logger.info("Immediate send: %s", raw)
+            logger.debug("Immediate packet: %s", LogValue(packet))
+            _send_priority(ws, json_codec.dumps(packet))
+        else:
+            self._enqueue(
+                json_codec.dumps(packet), _is_terminal(raw, payload), coalesce_key
+            )
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy to a full queue. Caller holds lock.
+
+        Returns:
+            True if the new event may be queued
+        """
+        if self.overflow_policy == OVERFLOW_BLOCK:
+            deadline = time.monotonic() + DEFAULT_BLOCK_TIMEOUT
+            while len(self._queue) >= self.max_queue_events:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._running:
+                    break
+                self._queue_ready.notify_all()
+                self._queue_ready.wait(remaining)
+            if len(self._queue) < self.max_queue_events:
+                return True
+        elif self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            _, dropped = self._queue.popitem(last=False)
+            self._queued_bytes -= len(dropped) + 1
+            self._dropped_events += 1
+            self._log_drop()
+            return True
+
+        self._dropped_events += 1
+        self._log_drop()
+        return False
+
+    def _log_drop(self) -> None:
+        # Log the first drop and then every 1000th, not every event
+        if self._dropped_events == 1 or self._dropped_events % 1000 == 0:
+            logger.warning(
+                f"Event queue full ({self.max_queue_events} events, policy "
+                f"'{self.overflow_policy}'); "
+                f"{self._dropped_events} events dropped so far"
+            )
+
+    def _enqueue(
+        self,
+        encoded: str,
+        terminal: bool = False,
+        coalesce_key: Optional[Hashable] = None,
+    ) -> None:
+        """Queue an encoded event and wake the flush thread if a batch is due."""
+        with self._lock:
+            previous = (
+                self._queue.get(coalesce_key) if coalesce_key is not None else None
+            )
+            first = False
+            if previous is not None:
+                # Superseded: replace the queued event, keeping its position
+                self._queued_bytes -= len(previous) + 1
+            else:
+                if len(self._queue) >= self.max_queue_events and not self._make_room():
+                    return
+                if coalesce_key is None:
+                    coalesce_key = ("event", next(self._sequence))
+                first = not self._queue
+                if first:
+                    self._oldest_queued_at = time.monotonic()
+            self._queue[coalesce_key] = encoded
+            self._queued_bytes += len(encoded) + 1
+            if terminal:
+                self._flush_requested = True
+            # The first event also starts the flush thread's latency timer
+            if first or self._batch_due():
+                self._queue_ready.notify_all()
+
+    def accepted_execution(self, event_type: Any, run_id: Any) -> None:
+        self.send_event(event_type, {"runId": run_id}, immediate=self._ws is not None)
+
+    def completed_execution(
+        self, event_type: Any, run_id: Any, tracker: Optional[Dict[str, Any]] = None
+    ) -> None:
+        # Progress goes out first; the completion itself skips queued batches
+        self.flush()
+        self.send_event(event_type, {"runId": run_id}, immediate=self._ws is not None)
+        if tracker is not None:
+            tracker.pop(run_id, None)
+
+    def progress_event(self, event_type: Any, run_id: Any, flow_result: Any) -> None:
+        payload = {
+            "runId": run_id,
+            "id": flow_result.id,
+            "name": flow_result.name,
+            "status": flow_result.status.value if flow_result.status else None,
+            "runAt": flow_result.runAt,
+            "failedOnStepId": flow_result.failedOnStepId,
+            "completedAt": flow_result.completedAt,
+            "message": flow_result.message,
+        }
+        # Only the latest state of a flow is sent if several are queued
+        self.send_event(
+            event_type, payload, coalesce_key=("progress", run_id, flow_result.id)
+        )
+
+    def status_update(
+        self,
+        event_type: Any,
+        status: str,
+        max_slots: Optional[int] = None,
+        available_slots: Optional[int] = None,
+    ) -> None:
+        payload: Dict[str, Any] = {"status": status}
+        if max_slots is not None:
+            payload["maxSlots"] = max_slots
+        if available_slots is not None:
+            payload["availableSlots"] = available_slots
+        self.send_event(event_type, payload)
+
+    def busy_message(
+        self, event_type: Any, run_id: Any, reason: str = "Agent is currently busy"
+    ) -> None:
+        self.send_event(event_type, {"runId": run_id, "reason": reason})
+
+    def auth_request(self, event_type: Any, payload: Dict[str, Any]) -> None:
+        """Send an authentication request event."""
+        self.send_event(event_type, payload)
+
+
+# Process-wide sender behind the module-level functions below, kept for code
+# written before EventSender existed. KeycaseAgent uses its own instance.
+default_sender = EventSender()
+
+
+def configure_batching(
+    ws,
+    flush_interval: float = DEFAULT_MAX_LATENCY,
+    max_batch_events: int = DEFAULT_MAX_BATCH_EVENTS,
+    max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    max_queue_events: int = DEFAULT_MAX_QUEUE_EVENTS,
+    overflow_policy: str = OVERFLOW_DROP_OLDEST,
+):
     """
-    global event_queue  # noqa: F824
-    with queue_lock:
-        if not event_queue:
-            return
-        batch = list(event_queue)
-        event_queue.clear()
-    try:
-        if _ws is None:
-            logger.warning("WebSocket not configured, skipping batch send")
-            return
-        packet = {"events": batch}
-        logger.info(f"Flushing {len(batch)} events as a batch as {packet}")
-        _ws.send(json.dumps(packet))
-    except Exception as e:
-        logger.error(f"Error sending batch: {e}")
-
-
-def send_event(event_type, payload, immediate: bool = False):
+    Initialize batching of the default sender with a WebSocket connection.
+    See EventSender for the meaning of the limits.
     """
-    Queue an event for batching, or send immediately if requested.
-    Requires that configure_batching(ws, interval) has been called first.
+    default_sender.configure(
+        flush_interval=flush_interval,
+        max_batch_events=max_batch_events,
+        max_batch_bytes=max_batch_bytes,
+        max_queue_events=max_queue_events,
+        overflow_policy=overflow_policy,
+    )
+    default_sender.set_connection(ws)
+    default_sender.start()
 
-    :param event_type: enum or raw event string
-    :param payload: dict
-    :param immediate: bool, if True send directly without batching
-    """
-    raw = event_type.value if hasattr(event_type, "value") else event_type
-    packet = {"event": raw, "payload": payload}
-    if immediate:
-        if _ws is None:
-            logger.warning("WebSocket not configured, skipping immediate send")
-            return
-        logger.info(f"Immediate send: {packet}")
-        _ws.send(json.dumps(packet))
-    else:
-        with queue_lock:
-            event_queue.append(packet)
+
+def flush_events():
+    default_sender.flush()
+
+
+def dropped_event_count() -> int:
+    return default_sender.dropped_event_count()
+
+
+def send_event(event_type, payload, immediate: bool = False, coalesce_key=None):
+    default_sender.send_event(event_type, payload, immediate, coalesce_key)
 
 
 def accepted_execution(event_type, run_id):
-    send_event(event_type, {"runId": run_id}, immediate=True)
+    default_sender.accepted_execution(event_type, run_id)
 
 
-def completed_execution(event_type, run_id, tracker):
-    send_event(event_type, {"runId": run_id})
-    tracker.pop(run_id, None)
+def completed_execution(event_type, run_id, tracker=None):
+    default_sender.completed_execution(event_type, run_id, tracker)
 
 
 def progress_event(event_type, run_id, flow_result):
-    payload = {
-        "runId": run_id,
-        "id": flow_result.id,
-        "name": flow_result.name,
-        "status": flow_result.status.value if flow_result.status else None,
-        "runAt": flow_result.runAt.isoformat() if flow_result.runAt else None,
-        "failedOnStepId": flow_result.failedOnStepId,
-        "completedAt": (
-            flow_result.completedAt.isoformat() if flow_result.completedAt else None
-        ),
-        "message": flow_result.message,
-    }
-    send_event(event_type, payload)
+    default_sender.progress_event(event_type, run_id, flow_result)
 
 
-def status_update(event_type, status):
-    send_event(event_type, {"status": status})
+def status_update(event_type, status, max_slots=None, available_slots=None):
+    default_sender.status_update(event_type, status, max_slots, available_slots)
 
 
 def busy_message(event_type, run_id, reason="Agent is currently busy"):
-    send_event(event_type, {"runId": run_id, "reason": reason})
+    default_sender.busy_message(event_type, run_id, reason)
 
 
 def auth_request(event_type, payload):
     """
     Send an authentication request event.
     """
-    send_event(event_type, payload)
+    default_sender.auth_request(event_type, payload)
@@ -0,0 +1,116 @@
+"""Pooled, keep-alive HTTP client shared by all REST calls."""
+
+import logging
+import threading
+from typing import Any, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import json_codec
+
+logger = logging.getLogger(__name__)
+
+# Connections kept open per host
+DEFAULT_POOL_SIZE = 10
+# Seconds to wait for a connection / for the server to respond
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class HttpClient:
+    """Thread-safe HTTP client reusing connections across requests.
+
+    All requests go through one ``requests.Session`` whose connection pool
+    keeps up to ``pool_size`` connections per host alive, so only the first
+    request to a host pays for the TCP and TLS handshakes. When more threads
+    send at once (e.g. many runs completing together) extra connections are
+    opened and closed after use instead of blocking.
+
+    Every request has a timeout: ``timeout`` unless the call passes its own.
+    A ``json`` body is encoded with ``json_codec`` rather than by requests.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: Timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+    ) -> None:
+        """Create a client; the session is opened on the first request.
+
+        Args:
+            pool_size: Connections kept alive per host
+            timeout: Default timeout in seconds, or a (connect, read) tuple
+        """
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def request(
+        self, method: str, url: str, timeout: Optional[Timeout] = None, **kwargs: Any
+    ) -> requests.Response:
+        """Send a request on a pooled connection.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            timeout: Timeout for this call (default: the client's timeout)
+            **kwargs: Passed to ``requests.Session.request``; a ``json``
+                body is encoded with ``json_codec``
+
+        Returns:
+            The response
+
+        Raises:
+            requests.RequestException: If the request fails or times out
+        """
+        body = kwargs.pop("json", None)
+        if body is not None:
+            kwargs["data"] = json_codec.dumps(body).encode("utf-8")
+            headers = dict(kwargs.get("headers") or {})
+            headers.setdefault("Content-Type", "application/json")
+            kwargs["headers"] = headers
+        return self._get_session().request(
+            method, url, timeout=timeout or self.timeout, **kwargs
+        )
+
+    @staticmethod
+    def decode_json(response: requests.Response) -> Any:
+        """Decode a JSON response body with ``json_codec``.
+
+        Raises:
+            ValueError: If the body is not valid JSON
+        """
+        return json_codec.loads(response.content)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections. The client can still be used."""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+
+# Client used when no other is passed, e.g. by the legacy helper functions
+default_client = HttpClient()
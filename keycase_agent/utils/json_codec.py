@@ -0,0 +1,152 @@
+"""JSON encoding and decoding through the fastest available backend.
+
+Every message, plan and result the agent exchanges goes through ``dumps()``
+and ``loads()``. They use ``orjson`` when it is installed, else ``ujson``,
+else the standard library. ``datetime``, ``date`` and ``time`` values are
+encoded as ISO 8601 strings by every backend, so payloads can carry them
+as they are.
+"""
+
+import json
+from datetime import date, datetime, time
+from typing import Any, Callable, Optional, Union
+
+Default = Callable[[Any], Any]
+
+BACKEND_JSON = "json"
+BACKEND_UJSON = "ujson"
+BACKEND_ORJSON = "orjson"
+# In order of preference
+BACKENDS = (BACKEND_ORJSON, BACKEND_UJSON, BACKEND_JSON)
+
+
+def _encode_default(default: Optional[Default]) -> Default:
+    """Extend a ``default`` hook with ISO 8601 encoding of dates and times."""
+
+    def encode(obj: Any) -> Any:
+        if isinstance(obj, (datetime, date, time)):
+            return obj.isoformat()
+        if default is not None:
+            return default(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    return encode
+
+
+class _StdlibBackend:
+    name = BACKEND_JSON
+
+    def dumps(self, obj: Any, default: Optional[Default], indent: bool) -> str:
+        return json.dumps(
+            obj,
+            default=_encode_default(default),
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+        )
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class _UjsonBackend:
+    name = BACKEND_UJSON
+
+    def __init__(self) -> None:
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj: Any, default: Optional[Default], indent: bool) -> str:
+        return self._ujson.dumps(
+            obj,
+            default=_encode_default(default),
+            indent=2 if indent else 0,
+            escape_forward_slashes=False,
+        )
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._ujson.loads(data)
+
+
+class _OrjsonBackend:
+    name = BACKEND_ORJSON
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any, default: Optional[Default], indent: bool) -> str:
+        # orjson encodes datetime, date and time natively
+        option = self._orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= self._orjson.OPT_INDENT_2
+        return self._orjson.dumps(obj, default=default, option=option).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._orjson.loads(data)
+
+
+_BACKEND_TYPES = {
+    BACKEND_ORJSON: _OrjsonBackend,
+    BACKEND_UJSON: _UjsonBackend,
+    BACKEND_JSON: _StdlibBackend,
+}
+
+
+def _load_backend(name: str) -> Any:
+    if name not in _BACKEND_TYPES:
+        raise ValueError(f"JSON backend must be one of {list(BACKENDS)}, got '{name}'")
+    return _BACKEND_TYPES[name]()
+
+
+def _best_backend() -> Any:
+    for name in BACKENDS:
+        try:
+            return _load_backend(name)
+        except ImportError:
+            continue
+    return _StdlibBackend()
+
+
+_backend = _best_backend()
+
+
+def backend_name() -> str:
+    """Get the name of the backend in use."""
+    return _backend.name
+
+
+def use_backend(name: str) -> None:
+    """Switch to a backend, e.g. to compare them or rule one out.
+
+    Raises:
+        ValueError: If the name is not one of BACKENDS
+        ImportError: If the backend is not installed
+    """
+    global _backend
+    _backend = _load_backend(name)
+
+
+def dumps(obj: Any, default: Optional[Default] = None, indent: bool = False) -> str:
+    """Encode an object as compact JSON text.
+
+    Args:
+        obj: Object to encode
+        default: Called for objects the backend cannot encode; returns an
+            encodable replacement or raises TypeError
+        indent: Indent nested values by two spaces
+
+    Raises:
+        TypeError: If an object cannot be encoded
+    """
+    return _backend.dumps(obj, default, indent)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON text or UTF-8 bytes.
+
+    Raises:
+        ValueError: If the data is not valid JSON
+    """
+    return _backend.loads(data)
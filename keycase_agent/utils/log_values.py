@@ -0,0 +1,65 @@
+"""Lazily formatted, truncated values for execution logs."""
+
+import reprlib
+from enum import Enum
+from typing import Any, Optional
+
+# Longest value representation logged at SUMMARY verbosity
+LOG_VALUE_MAX_LENGTH = 200
+
+
+class ExecutionLogVerbosity(str, Enum):
+    """How much of the step parameter and output values are logged.
+
+    OFF logs only step names, SUMMARY logs values truncated to
+    ``LOG_VALUE_MAX_LENGTH`` characters, FULL logs complete values.
+    """
+
+    OFF = "off"
+    SUMMARY = "summary"
+    FULL = "full"
+
+
+class LogValue:
+    """Log argument that formats its value only when the record is emitted.
+
+    Passing ``LogValue(kwargs)`` as a ``%s`` argument, rather than building
+    an f-string, means large payloads cost nothing when the log level or
+    handler filters the record out.
+    """
+
+    __slots__ = ("value", "max_length")
+
+    def __init__(self, value: Any, max_length: Optional[int] = LOG_VALUE_MAX_LENGTH):
+        self.value = value
+        self.max_length = max_length
+
+    def __str__(self) -> str:
+        return format_log_value(self.value, self.max_length)
+
+    __repr__ = __str__
+
+
+def format_log_value(
+    value: Any, max_length: Optional[int] = LOG_VALUE_MAX_LENGTH
+) -> str:
+    """Format a value for logging, truncated to ``max_length`` characters.
+
+    Containers are shortened with ``reprlib`` before being rendered, so a
+    huge dict or list is never fully converted to a string.
+    """
+    if max_length is None:
+        return str(value)
+    if isinstance(value, (dict, list, tuple, set)):
+        shortener = reprlib.Repr()
+        shortener.maxdict = shortener.maxlist = shortener.maxtuple = 20
+        shortener.maxset = 20
+        shortener.maxstring = shortener.maxother = max_length
+        text = shortener.repr(value)
+    elif isinstance(value, (str, bytes)):
+        text = str(value[: max_length + 1])
+    else:
+        text = str(value)
+    if len(text) > max_length:
+        return f"{text[:max_length]}... (truncated)"
+    return text
@@ -1,17 +1,35 @@
-import json
 import logging
 import queue
 import random
 import threading
 import time
+import zlib
+from collections import deque
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional, Union
 
 import websocket
 
+from .utils import json_codec
+from .utils.log_values import LogValue
+
 logger = logging.getLogger(__name__)
 
+# Message compression. websocket-client does not implement the
+# permessage-deflate extension, so with "deflate" messages of at least
+# COMPRESSION_MIN_BYTES are sent as binary frames holding the zlib-compressed
+# UTF-8 text; smaller messages stay text frames. Compression starts only once
+# the server has confirmed it accepts such frames (see confirm_compression),
+# so the authentication request itself is always sent uncompressed.
+COMPRESSION_OFF = "off"
+COMPRESSION_DEFLATE = "deflate"
+COMPRESSION_MODES = (COMPRESSION_OFF, COMPRESSION_DEFLATE)
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_LEVEL = 6
+
+Message = Union[str, bytes]
+
 
 class ConnectionState(Enum):
     """Connection state enumeration."""
@@ -23,6 +41,84 @@ class ConnectionState(Enum):
     FAILED = "failed"
 
 
+class PendingMessageQueue:
+    """Bounded two-lane queue of messages waiting for a connection.
+
+    Priority messages (auth, stop and completion notifications) are always
+    delivered before normal ones, so they are not stuck behind a backlog of
+    progress updates. Every operation is O(1) and thread-safe.
+
+    Drop policy when ``maxsize`` messages are queued:
+
+    - a normal message is dropped;
+    - a priority message evicts the oldest normal message, and is dropped
+      only if the queue holds nothing but priority messages.
+    """
+
+    def __init__(self, maxsize: int = 1000) -> None:
+        self.maxsize = max(1, maxsize)
+        self._priority: Deque[Message] = deque()
+        self._normal: Deque[Message] = deque()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, item: Message, priority: bool = False) -> bool:
+        """Queue a message at the back of its lane.
+
+        Returns:
+            False if the message was dropped because the queue is full
+        """
+        with self._lock:
+            if not self._make_room(priority):
+                return False
+            (self._priority if priority else self._normal).append(item)
+            return True
+
+    def put_front(self, item: Message) -> bool:
+        """Queue a message ahead of all others, e.g. one whose send failed.
+
+        Returns:
+            False if the message was dropped because the queue is full
+        """
+        with self._lock:
+            if not self._make_room(True):
+                return False
+            self._priority.appendleft(item)
+            return True
+
+    def _make_room(self, priority: bool) -> bool:
+        """Apply the drop policy to a full queue. Caller holds lock."""
+        if len(self._priority) + len(self._normal) < self.maxsize:
+            return True
+        self.dropped += 1
+        if priority and self._normal:
+            self._normal.popleft()
+            return True
+        return False
+
+    def get_nowait(self) -> Message:
+        """Remove and return the next message.
+
+        Raises:
+            queue.Empty: If no message is queued
+        """
+        with self._lock:
+            if self._priority:
+                return self._priority.popleft()
+            if self._normal:
+                return self._normal.popleft()
+        raise queue.Empty
+
+    get = get_nowait
+
+    def qsize(self) -> int:
+        with self._lock:
+            return len(self._priority) + len(self._normal)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+
 class WebSocketClient:
     """Robust WebSocket client with reconnection, heartbeat, and message queuing."""
 
@@ -40,6 +136,7 @@ class WebSocketClient:
         heartbeat_timeout: float = 10.0,
         connection_timeout: float = 10.0,
         max_queue_size: int = 1000,
+        compression: str = COMPRESSION_OFF,
     ):
         """Initialize robust WebSocket client.
 
@@ -56,7 +153,17 @@ class WebSocketClient:
             heartbeat_timeout: Heartbeat response timeout in seconds
             connection_timeout: Connection timeout in seconds
             max_queue_size: Maximum message queue size
+            compression: "off" or "deflate" (see COMPRESSION_MIN_BYTES);
+                "deflate" takes effect once the server confirms it
+
+        Raises:
+            ValueError: If the compression mode is unknown
         """
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(
+                f"compression must be one of {list(COMPRESSION_MODES)}, "
+                f"got '{compression}'"
+            )
         self.url = url
         self.on_open = on_open
         self.on_message = on_message
@@ -70,6 +177,9 @@ class WebSocketClient:
         self.heartbeat_interval = heartbeat_interval
         self.heartbeat_timeout = heartbeat_timeout
         self.connection_timeout = connection_timeout
+        self.compression = compression
+        # Whether the server accepted compression on the current connection
+        self.compression_active = False
 
         # State management
         self.ws: Optional[websocket.WebSocketApp] = None
@@ -81,18 +191,25 @@ class WebSocketClient:
         # Threading
         self._shutdown_event = threading.Event()
         self._state_lock = threading.Lock()
+        # Serializes sends with the replay of queued messages to keep order
+        self._send_lock = threading.RLock()
+        # Thread running the on_open callback; until it returns only that
+        # thread's messages (authentication) are sent, and queued ones wait
+        self._opening_thread: Optional[threading.Thread] = None
         self._heartbeat_thread: Optional[threading.Thread] = None
         self._connection_thread: Optional[threading.Thread] = None
 
         # Message queuing
         self.message_queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
-        self.pending_messages: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.pending_messages = PendingMessageQueue(max_queue_size)
 
         # Connection metrics
         self.connection_start_time: Optional[datetime] = None
         self.total_connections = 0
         self.total_disconnections = 0
         self.last_error: Optional[str] = None
+        self.bytes_before_compression = 0
+        self.bytes_after_compression = 0
 
         logger.info(f"WebSocket client initialized for {url}")
 
@@ -145,19 +262,25 @@ class WebSocketClient:
         self.reconnect_attempts = 0
         self.consecutive_failures = 0
         self.last_pong_time = datetime.now()
+        # A new connection starts uncompressed until the server confirms
+        self.compression_active = False
 
         # Note: Heartbeat is handled by websocket-client's ping_interval parameter
         # in run_forever(). Custom heartbeat can be enabled after authentication
         # by calling _start_heartbeat() from the on_open callback if needed.
 
-        # Process queued messages
-        self._process_queued_messages()
-
-        # Call original callback
+        # The callback authenticates, so its messages go out first and queued
+        # messages are replayed only once it returns
+        with self._send_lock:
+            self._opening_thread = threading.current_thread()
         try:
             self.on_open(ws)
         except Exception as e:
             logger.error(f"Error in on_open callback: {e}")
+        finally:
+            with self._send_lock:
+                self._opening_thread = None
+                self._process_queued_messages()
 
     def _on_message_wrapper(self, ws, message: str) -> None:
         """Wrapper for on_message callback with heartbeat handling."""
@@ -245,27 +368,66 @@ class WebSocketClient:
                 break
 
     def _process_queued_messages(self) -> None:
-        """Process messages queued during disconnection."""
+        """Send messages queued during disconnection, in order.
+
+        A message that fails to send is put back at the front of the queue
+        and replay stops, so it is retried first on the next connection.
+        """
         processed = 0
-        while not self.pending_messages.empty() and self.is_connected():
-            try:
-                message = self.pending_messages.get_nowait()
-                self._send_direct(message)
+        with self._send_lock:
+            while not self.pending_messages.empty() and self.is_connected():
+                try:
+                    message = self.pending_messages.get_nowait()
+                except queue.Empty:
+                    break
+                if not self._send_direct(message):
+                    self.pending_messages.put_front(message)
+                    break
                 processed += 1
-            except queue.Empty:
-                break
-            except Exception as e:
-                logger.error(f"Error processing queued message: {e}")
 
         if processed > 0:
             logger.info(f"Processed {processed} queued messages")
 
-    def _send_direct(self, data: str) -> bool:
-        """Send data directly without queuing."""
+    def confirm_compression(self, mode: Optional[str]) -> None:
+        """Record the compression the server accepted for this connection.
+
+        Compression is used only if ``mode`` is the configured mode; any
+        other value, or None, keeps messages uncompressed.
+        """
+        with self._send_lock:
+            self.compression_active = (
+                self.compression != COMPRESSION_OFF and mode == self.compression
+            )
+        if self.compression_active:
+            logger.info(f"Server accepted {mode} compression")
+        elif self.compression != COMPRESSION_OFF:
+            logger.info("Server did not accept compression, sending text frames")
+
+    def _encode(self, data: Message) -> Message:
+        """Compress a message if compression is active and it is large enough."""
+        with self._send_lock:
+            if (
+                not self.compression_active
+                or not isinstance(data, str)
+                or len(data) < COMPRESSION_MIN_BYTES
+            ):
+                return data
+            raw = data.encode("utf-8")
+            compressed = zlib.compress(raw, COMPRESSION_LEVEL)
+            self.bytes_before_compression += len(raw)
+            self.bytes_after_compression += len(compressed)
+            return compressed
+
+    def _send_direct(self, data: Message) -> bool:
+        """Send data directly without queuing, compressing it if active."""
         if self.ws and self.ws.sock and self.ws.sock.connected:
             try:
-                self.ws.send(data)
-                logger.debug(f"Sent data: {data}")
+                data = self._encode(data)
+                if isinstance(data, bytes):
+                    self.ws.send(data, opcode=websocket.ABNF.OPCODE_BINARY)
+                else:
+                    self.ws.send(data)
+                logger.debug("Sent data: %s", LogValue(data))
                 return True
             except Exception as e:
                 logger.error(f"Failed to send data: {e}")
@@ -333,35 +495,37 @@ class WebSocketClient:
 
         Args:
             data: Data to send
-            priority: If True, add to front of queue
+            priority: If True and the message has to be queued, deliver it
+                before all normal queued messages (see PendingMessageQueue)
+
+        Messages are queued uncompressed and compressed when they are sent,
+        depending on what the connection they are sent on negotiated.
+
+        Messages sent while disconnected, or whose send fails, are queued and
+        replayed in order once the connection is open again and the on_open
+        callback has sent its messages. While queued messages remain, new
+        messages are sent after them, never ahead.
 
         Returns:
             True if sent immediately, False if queued
         """
-        if self.is_connected():
-            return self._send_direct(data)
-        else:
-            # Queue message for later delivery
-            try:
-                if priority:
-                    # Add to front of queue
-                    temp_queue = queue.Queue()
-                    temp_queue.put(data)
-                    while not self.pending_messages.empty():
-                        temp_queue.put(self.pending_messages.get_nowait())
-                    self.pending_messages = temp_queue
-                else:
-                    self.pending_messages.put(data, block=False)
-
-                logger.debug(f"Queued message for later delivery: {data}")
-                return False
-            except queue.Full:
+        with self._send_lock:
+            if self._opening_thread is threading.current_thread():
+                if self._send_direct(data):
+                    return True
+            elif self._opening_thread is None and self.is_connected():
+                self._process_queued_messages()
+                if self.pending_messages.empty() and self._send_direct(data):
+                    return True
+            if self.pending_messages.put(data, priority):
+                logger.debug("Queued message for later delivery: %s", LogValue(data))
+            else:
                 logger.warning("Message queue full, dropping message")
-                return False
+            return False
 
     def send_json(self, data: Dict[str, Any], priority: bool = False) -> bool:
         """Send JSON data."""
-        return self.send(json.dumps(data), priority)
+        return self.send(json_codec.dumps(data), priority)
 
     def is_connected(self) -> bool:
         """Check if WebSocket is connected."""
@@ -377,6 +541,9 @@ class WebSocketClient:
         uptime = None
         if self.connection_start_time and self.is_connected():
             uptime = (datetime.now() - self.connection_start_time).total_seconds()
+        with self._send_lock:
+            bytes_before = self.bytes_before_compression
+            bytes_after = self.bytes_after_compression
 
         return {
             "state": self.state.value,
@@ -386,6 +553,11 @@ class WebSocketClient:
             "consecutive_failures": self.consecutive_failures,
             "uptime_seconds": uptime,
             "queued_messages": self.pending_messages.qsize(),
+            "dropped_messages": self.pending_messages.dropped,
+            "compression": self.compression,
+            "compression_active": self.compression_active,
+            "bytes_before_compression": bytes_before,
+            "bytes_after_compression": bytes_after,
             "last_error": self.last_error,
             "last_pong": (
                 self.last_pong_time.isoformat() if self.last_pong_time else None
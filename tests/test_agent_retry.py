@@ -1,13 +1,17 @@
 """Tests for Agent retry functionality."""
 
 import pytest
-import json
 import os
 import tempfile
 import shutil
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 from keycase_agent.agent import KeycaseAgent
 from keycase_agent.auth import AuthService, AuthCredentials
+from keycase_agent.exceptions import ResultRejectedError
+from keycase_agent.models.execute_plan import CompiledPlan
+from keycase_agent.result_uploader import (
+    UPLOAD_CLOSE_RUN, UPLOAD_FLOW_RESULTS, UPLOAD_RESULT, UploadJob
+)
 from keycase_agent.utils.auth_helper import ApiResponse
 from datetime import datetime, timedelta
 
@@ -58,10 +62,11 @@ class TestAgentRetry:
     def teardown_method(self):
         """Clean up test fixtures."""
         os.chdir(self.original_cwd)
+        self.agent.result_spool.close()
         shutil.rmtree(self.test_dir, ignore_errors=True)
 
     def test_save_result_locally_success(self):
-        """Test successful local result saving."""
+        """Test a result saved locally is spooled on disk."""
         project_id = 123
         run_id = 456
         result = {"status": "success", "data": "test_result"}
@@ -70,56 +75,49 @@ class TestAgentRetry:
         # Execute
         self.agent._save_result_locally(project_id, run_id, result, reason)
 
-        # Verify directory was created
-        results_dir = os.path.join(self.test_dir, "failed_results")
-        assert os.path.exists(results_dir)
+        # Verify the spool was created in the results directory
+        spool_file = os.path.join(self.test_dir, "failed_results", "result_spool.db")
+        assert self.agent.result_spool.path == spool_file
+        assert os.path.exists(spool_file)
+
+        [entry] = self.agent.result_spool.peek()
+        assert entry.project_id == project_id
+        assert entry.run_id == run_id
+        assert entry.reason == reason
+        assert entry.result == result
 
-        # Verify result file was created
-        result_files = [f for f in os.listdir(results_dir) if f.startswith(f"result_p{project_id}_r{run_id}")]
-        assert len(result_files) == 1
+    def test_save_result_locally_spool_error_logged(self):
+        """Test a failing spool write does not raise."""
+        self.agent.result_spool = Mock()
+        self.agent.result_spool.append.side_effect = OSError("disk full")
 
-        # Verify file content
-        result_file = os.path.join(results_dir, result_files[0])
-        with open(result_file, 'r') as f:
-            saved_data = json.load(f)
+        self.agent._save_result_locally(123, 456, {}, "Test reason")
 
-        assert saved_data["metadata"]["project_id"] == project_id
-        assert saved_data["metadata"]["run_id"] == run_id
-        assert saved_data["metadata"]["reason"] == reason
-        assert saved_data["metadata"]["agent_id"] == 123
-        assert saved_data["metadata"]["agent_name"] == "test-agent-01"
-        assert saved_data["result"] == result
+    def _job(self):
+        return UploadJob(project_id=123, run_id=456, result={"status": "success"},
+                         attempts=1)
 
-        # Verify summary file was created
-        summary_file = os.path.join(results_dir, "failed_results_summary.json")
-        assert os.path.exists(summary_file)
+    def test_send_result_returns_without_uploading(self):
+        """Test results are handed to the uploader instead of sent inline."""
+        self.agent.result_uploader = Mock()
 
-        with open(summary_file, 'r') as f:
-            summary_data = json.load(f)
+        response = self.agent._send_result(123, 456, {"status": "success"})
 
-        assert len(summary_data["failed_results"]) == 1
-        assert summary_data["failed_results"][0]["project_id"] == project_id
-        assert summary_data["failed_results"][0]["run_id"] == run_id
+        assert response is None
+        self.agent.result_uploader.submit.assert_called_once_with(
+            123, 456, {"status": "success"}
+        )
 
     @patch('keycase_agent.agent.auth_request_with_details')
-    def test_send_result_success_first_attempt(self, mock_auth_request):
-        """Test successful result sending on first attempt."""
-        # Setup mocks - successful response
+    def test_upload_result_success(self, mock_auth_request):
+        """Test a successful upload attempt."""
         mock_auth_request.return_value = ApiResponse(
             success=True,
             data={"status": "saved"},
             status_code=200
         )
 
-        project_id = 123
-        run_id = 456
-        result = {"status": "success"}
-
-        # Execute
-        response = self.agent._send_result(project_id, run_id, result)
-
-        # Verify
-        assert response == {"status": "saved"}
+        assert self.agent._upload_result(self._job()) is True
         mock_auth_request.assert_called_once()
 
         # Verify no local file was created
@@ -127,133 +125,175 @@ class TestAgentRetry:
         assert not os.path.exists(results_dir)
 
     @patch('keycase_agent.agent.auth_request_with_details')
-    @patch('time.sleep')
-    def test_send_result_success_after_retry(self, mock_sleep, mock_auth_request):
-        """Test successful result sending after retries."""
-        # Setup mocks - fail first 2 attempts, succeed on 3rd
-        mock_auth_request.side_effect = [
-            ApiResponse(success=False, error_code=500, error_message="Server error"),
-            ApiResponse(success=False, error_code=500, error_message="Server error"),
-            ApiResponse(success=True, data={"status": "saved"}, status_code=200)
-        ]
-
-        project_id = 123
-        run_id = 456
-        result = {"status": "success"}
-
-        # Execute
-        response = self.agent._send_result(project_id, run_id, result)
-
-        # Verify
-        assert response == {"status": "saved"}
-        assert mock_auth_request.call_count == 3
-        assert mock_sleep.call_count == 2  # Sleep between retries
-
-        # Verify no local file was created
-        results_dir = os.path.join(self.test_dir, "failed_results")
-        assert not os.path.exists(results_dir)
-
-    @patch('keycase_agent.agent.auth_request_with_details')
-    @patch('time.sleep')
-    def test_send_result_all_attempts_fail_saves_locally(self, mock_sleep, mock_auth_request):
-        """Test all attempts fail and result is saved locally."""
-        # Setup mocks - all attempts fail
+    def test_upload_result_failure(self, mock_auth_request):
+        """Test a failed upload attempt is reported for a retry."""
         mock_auth_request.return_value = ApiResponse(
             success=False,
             error_code=500,
             error_message="Server error"
         )
 
-        project_id = 123
-        run_id = 456
-        result = {"status": "success"}
-
-        # Execute
-        response = self.agent._send_result(project_id, run_id, result)
+        assert self.agent._upload_result(self._job()) is False
 
-        # Verify
-        assert response is None
-        assert mock_auth_request.call_count == 3  # All 3 attempts
-        assert mock_sleep.call_count == 2  # Sleep between retries
+    @patch('keycase_agent.agent.auth_request_with_details')
+    def test_upload_result_client_error_rejects(self, mock_auth_request):
+        """Test a non-retryable 4xx is reported as a permanent rejection."""
+        mock_auth_request.return_value = ApiResponse(
+            success=False, status_code=422, error_message="Invalid result"
+        )
 
-        # Verify local file was created
-        results_dir = os.path.join(self.test_dir, "failed_results")
-        assert os.path.exists(results_dir)
+        with pytest.raises(ResultRejectedError, match="422"):
+            self.agent._upload_result(self._job())
 
-        result_files = [f for f in os.listdir(results_dir) if f.startswith(f"result_p{project_id}_r{run_id}")]
-        assert len(result_files) == 1
+        mock_auth_request.return_value = ApiResponse(
+            success=False, status_code=429, error_message="Too many requests"
+        )
+        assert self.agent._upload_result(self._job()) is False
 
-    def test_send_result_no_token_saves_locally(self):
-        """Test no token available saves result locally."""
-        # Setup - no token
+    @patch('keycase_agent.agent.auth_request_with_details')
+    def test_upload_result_auth_error_refreshes_token(self, mock_auth_request):
+        """Test 401/403 refresh the token and are retried, not rejected."""
+        for status in (401, 403):
+            self.mock_auth_service.invalidate_token.reset_mock()
+            mock_auth_request.return_value = ApiResponse(
+                success=False, status_code=status, error_message="Unauthorized"
+            )
+
+            assert self.agent._upload_result(self._job()) is False
+            self.mock_auth_service.invalidate_token.assert_called_once_with(
+                "test_token"
+            )
+
+    def test_upload_result_no_token(self):
+        """Test an attempt without a token fails without a request."""
         self.mock_auth_service.get_token.return_value = None
 
-        project_id = 123
-        run_id = 456
-        result = {"status": "success"}
+        assert self.agent._upload_result(self._job()) is False
 
-        # Execute
-        response = self.agent._send_result(project_id, run_id, result)
+    @patch('keycase_agent.agent.auth_request_with_details')
+    def test_upload_result_already_completed_treated_as_success(
+        self, mock_auth_request
+    ):
+        """Test 'already completed' error (code 5002) is treated as success."""
+        mock_auth_request.return_value = ApiResponse(
+            success=False,
+            data={"code": 5002, "message": "Execution run is already completed"},
+            status_code=400,
+            error_code=5002,
+            error_message="Execution run is already completed"
+        )
 
-        # Verify
-        assert response is None
+        assert self.agent._upload_result(self._job()) is True
+        mock_auth_request.assert_called_once()  # No retries needed
 
-        # Verify local file was created
-        results_dir = os.path.join(self.test_dir, "failed_results")
-        assert os.path.exists(results_dir)
+    @patch('keycase_agent.agent.auth_request_with_details')
+    def test_failed_uploads_saved_locally(self, mock_auth_request):
+        """Test a result is saved locally once every attempt failed."""
+        mock_auth_request.side_effect = Exception("Network error")
+        self.agent.result_uploader.initial_retry_delay = 0.01
+        self.agent.result_uploader.max_attempts = 3
 
-        # Verify the reason is correct
-        summary_file = os.path.join(results_dir, "failed_results_summary.json")
-        with open(summary_file, 'r') as f:
-            summary_data = json.load(f)
+        self.agent._send_result(123, 456, {"status": "success"})
 
-        assert summary_data["failed_results"][0]["reason"] == "No authentication token"
+        assert self.agent.result_uploader.wait_idle(timeout=5)
+        assert mock_auth_request.call_count == 3
+        [entry] = self.agent.result_spool.peek()
+        assert entry.reason == "All 3 upload attempts failed"
 
     @patch('keycase_agent.agent.auth_request_with_details')
-    @patch('time.sleep')
-    def test_send_result_exception_during_request(self, mock_sleep, mock_auth_request):
-        """Test exception during request is handled."""
-        # Setup mocks - exception on all attempts
-        mock_auth_request.side_effect = Exception("Network error")
+    def test_get_execution_plan_cached_and_not_modified(self, mock_auth_request):
+        """Test a 304 reply reuses the plan fetched with that ETag."""
+        plan = {'runId': 456, 'keywordInstances': [], 'flows': []}
+        mock_auth_request.return_value = ApiResponse(
+            success=True,
+            data={'plan': plan},
+            status_code=200,
+            headers={'ETag': '"v1"'}
+        )
+        compiled = self.agent._get_execution_plan(123, 456)
 
-        project_id = 123
-        run_id = 456
-        result = {"status": "success"}
+        mock_auth_request.return_value = ApiResponse(
+            success=True,
+            status_code=304,
+            headers={'ETag': '"v1"'}
+        )
+        assert self.agent._get_execution_plan(123, 457) is compiled
+        headers = mock_auth_request.call_args.kwargs['headers']
+        assert headers == {'If-None-Match': '"v1"'}
 
-        # Execute
-        response = self.agent._send_result(project_id, run_id, result)
+    @patch('keycase_agent.agent.auth_request_with_details')
+    def test_get_execution_plan_refetched_when_etag_unknown(self, mock_auth_request):
+        """Test a 304 for an evicted plan falls back to a full fetch."""
+        plan = {'runId': 456, 'keywordInstances': [], 'flows': []}
+        mock_auth_request.side_effect = [
+            ApiResponse(success=True, status_code=304, headers={'ETag': '"old"'}),
+            ApiResponse(success=True, data={'plan': plan}, status_code=200),
+        ]
 
-        # Verify
-        assert response is None
-        assert mock_auth_request.call_count == 3  # All 3 attempts
+        compiled = self.agent._get_execution_plan(123, 456)
 
-        # Verify local file was created
-        results_dir = os.path.join(self.test_dir, "failed_results")
-        assert os.path.exists(results_dir)
+        assert isinstance(compiled, CompiledPlan)
+        assert mock_auth_request.call_count == 2
 
     @patch('keycase_agent.agent.auth_request_with_details')
-    def test_send_result_already_completed_treated_as_success(self, mock_auth_request):
-        """Test 'already completed' error (code 5002) is treated as success."""
-        # Setup mocks - already completed error
-        mock_auth_request.return_value = ApiResponse(
-            success=False,
-            data={"code": 5002, "message": "Execution run is already completed"},
-            status_code=400,
-            error_code=5002,
-            error_message="Execution run is already completed"
-        )
+    def test_upload_url_by_kind(self, mock_auth_request):
+        """Test chunks and run summaries go to their own endpoints."""
+        mock_auth_request.return_value = ApiResponse(success=True, status_code=200)
+        base = "http://localhost:8080/api/projects/123/runs/456/results"
+
+        for kind, path in [(UPLOAD_RESULT, ""), (UPLOAD_FLOW_RESULTS, "/flows"),
+                           (UPLOAD_CLOSE_RUN, "/close")]:
+            job = UploadJob(
+                project_id=123, run_id=456, result={}, attempts=1, kind=kind
+            )
+            assert self.agent._upload_result(job) is True
+            assert mock_auth_request.call_args[0][1] == base + path
 
-        project_id = 123
-        run_id = 456
-        result = {"status": "success"}
+    @patch('keycase_agent.agent.auth_request_with_details')
+    def test_completion_notified_after_result_uploaded(self, mock_auth_request):
+        """Test the run completion is sent only once its result is accepted."""
+        assert self.agent.execution_manager.notify_completion is False
+        self.agent.event_sender = Mock()
+        notify = self.agent.event_sender.completed_execution
 
-        # Execute
-        response = self.agent._send_result(project_id, run_id, result)
+        mock_auth_request.return_value = ApiResponse(
+            success=False, status_code=503, error_message="Unavailable"
+        )
+        assert self.agent._upload_result(self._job()) is False
+        notify.assert_not_called()
 
-        # Verify - should be treated as success
-        assert response is not None
-        mock_auth_request.assert_called_once()  # No retries needed
+        mock_auth_request.return_value = ApiResponse(success=True, status_code=200)
+        for kind in (UPLOAD_FLOW_RESULTS, UPLOAD_RESULT, UPLOAD_CLOSE_RUN):
+            job = UploadJob(
+                project_id=123, run_id=456, result={}, attempts=1, kind=kind
+            )
+            assert self.agent._upload_result(job) is True
+        assert [c[0][1] for c in notify.call_args_list] == [456, 456]
 
-        # Verify no local file was created
-        results_dir = os.path.join(self.test_dir, "failed_results")
-        assert not os.path.exists(results_dir)
+    @patch('keycase_agent.agent.auth_request_with_details')
+    def test_streamed_run_closed_after_chunks(self, mock_auth_request):
+        """Test stream mode uploads chunks, then closes the run."""
+        mock_auth_request.return_value = ApiResponse(success=True, status_code=200)
+        config = {
+            "HTTP_URL": "http://localhost:8080/api",
+            "AGENT_TOKEN": "agt_test_token_123456789",
+            "AGENT_NAME": "test-agent-01",
+            "RESULT_UPLOAD_MODE": "stream",
+            "RESULT_STREAM_CHUNK_SIZE": 1,
+        }
+        with patch.object(AuthService, '__init__', lambda self, **kwargs: None):
+            agent = KeycaseAgent(config)
+        agent.auth_service = self.mock_auth_service
+        try:
+            callback = agent.execution_manager.flow_result_callback
+            callback(123, 456, {"id": 1})
+            callback(123, 456, {"id": 2})
+            agent._send_result(123, 456, {"runId": 456, "flowResultCount": 2})
+
+            assert agent.result_uploader.wait_idle(timeout=5)
+            base = "http://localhost:8080/api/projects/123/runs/456/results"
+            urls = [c[0][1] for c in mock_auth_request.call_args_list]
+            assert urls == [base + "/flows", base + "/flows", base + "/close"]
+        finally:
+            agent.result_uploader.stop()
+            agent.result_spool.close()
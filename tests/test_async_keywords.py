@@ -0,0 +1,171 @@
+"""Tests for async keyword support."""
+
+import asyncio
+import threading
+
+import pytest
+
+from keycase_agent.async_runner import AsyncLoopRunner
+from keycase_agent.cancellation import CancellationToken, wait_for_future
+from keycase_agent.decorators import get_call_descriptor, keyword
+from keycase_agent.exceptions import ExecutionError, KeywordDefinitionError
+from keycase_agent.execution_context import (
+    clear_context,
+    get_cancellation_token,
+    get_context,
+    set_context,
+)
+from keycase_agent.execution_manager import ExecutionManager
+from keycase_agent.models.execute_plan import (
+    Flow,
+    FlowStep,
+    KeywordInstance,
+    Param,
+    compile_execution_plan,
+)
+from keycase_agent.models.execution_result import StatusEnum
+
+
+class TestAsyncLoopRunner:
+    """Test suite for AsyncLoopRunner."""
+
+    def setup_method(self):
+        """Set up a runner."""
+        self.runner = AsyncLoopRunner()
+
+    def teardown_method(self):
+        """Stop the loop."""
+        self.runner.shutdown()
+
+    def test_runs_coroutines_on_one_shared_loop(self):
+        """Test successive coroutines run on the same long-lived loop."""
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = self.runner.submit(current_loop()).result(timeout=5)
+        second = self.runner.submit(current_loop()).result(timeout=5)
+
+        assert first is second
+        assert first.is_running()
+
+    def test_timeout_cancels_coroutine(self):
+        """Test a coroutine exceeding its timeout is cancelled."""
+        cancelled = threading.Event()
+
+        async def hang():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(TimeoutError, match="timed out after 0.1s"):
+            wait_for_future(self.runner.submit(hang()), CancellationToken(timeout=0.1))
+        assert cancelled.wait(timeout=2)
+
+    def test_stop_event_cancels_coroutine(self):
+        """Test setting the stop event cancels a running coroutine."""
+        stop_event = threading.Event()
+        stop_event.set()
+
+        with pytest.raises(ExecutionError, match="execution stopped"):
+            wait_for_future(
+                self.runner.submit(asyncio.sleep(10)), CancellationToken(stop_event)
+            )
+
+    def test_coroutine_exceptions_propagate(self):
+        """Test exceptions raised by the coroutine reach the caller unchanged."""
+        async def fail():
+            raise TimeoutError("upstream timeout")
+
+        with pytest.raises(TimeoutError, match="upstream timeout"):
+            self.runner.submit(fail()).result(timeout=5)
+
+
+class TestAsyncKeywords:
+    """Test suite for async keywords executed by ExecutionManager."""
+
+    def setup_method(self):
+        """Set up a local manager."""
+        self.manager = ExecutionManager(mode="local")
+
+    def teardown_method(self):
+        """Release the manager's event loop."""
+        self.manager.shutdown()
+
+    @staticmethod
+    def _flow(keyword_name):
+        instance = KeywordInstance(1, keyword_name, 1, keyword_name, [
+            Param(1, "value", "input", "string", True, "hello"),
+            Param(2, "result", "output", "string", False, None),
+        ])
+        return [instance], Flow(1, 1, "default", "async_flow", [FlowStep(1, 1, 1)])
+
+    def test_async_keyword_descriptor(self):
+        """Test async keywords are flagged on their call descriptor."""
+        @keyword("test_async_descriptor", timeout=5)
+        async def fetch(value: str) -> dict:
+            return {"result": value}
+
+        descriptor = get_call_descriptor(fetch)
+        assert descriptor.is_async
+        assert descriptor.timeout == 5
+
+    def test_async_keyword_executes(self):
+        """Test async keywords run and their outputs are stored."""
+        @keyword("test_async_upper")
+        async def upper(value: str) -> dict:
+            await asyncio.sleep(0)
+            return {"result": value.upper()}
+
+        instances, flow = self._flow("test_async_upper")
+        step_outputs = {}
+
+        plan = compile_execution_plan(instances, [flow])
+
+        error = self.manager._execute_step(1, flow, flow.steps[0], plan, step_outputs)
+
+        assert error is None
+        assert step_outputs[1][2] == "HELLO"
+
+    def test_async_keyword_sees_step_context_and_token(self):
+        """Test async keywords get the run context and the step's token."""
+        seen = {}
+
+        @keyword("test_async_context")
+        async def record(value: str) -> dict:
+            seen["context"] = get_context()
+            seen["token"] = get_cancellation_token()
+            return {"result": value}
+
+        instances, flow = self._flow("test_async_context")
+        plan = compile_execution_plan(instances, [flow])
+        set_context(1, 7, flow.steps[0].id)
+        try:
+            self.manager._execute_step(1, flow, flow.steps[0], plan, {})
+        finally:
+            clear_context()
+
+        assert seen["context"] == {"run_id": 1, "project_id": 7, "step_id": 1}
+        assert seen["token"] is not get_cancellation_token()
+        assert not seen["token"].is_cancelled()
+
+    def test_async_keyword_timeout_marks_step_timeout(self):
+        """Test an async keyword exceeding its timeout times out the flow."""
+        @keyword("test_async_slow", timeout=0.1)
+        async def slow(value: str) -> dict:
+            await asyncio.sleep(10)
+
+        instances, flow = self._flow("test_async_slow")
+
+        result = self.manager._execute_flow(1, flow, instances, set())
+
+        assert result.status == StatusEnum.TIMEOUT
+        assert "timed out" in result.message
+
+    def test_async_keyword_cannot_run_in_process(self):
+        """Test combining async and run_in_process is rejected."""
+        with pytest.raises(KeywordDefinitionError):
+            @keyword("test_async_process", run_in_process=True)
+            async def invalid() -> None:
+                pass
@@ -0,0 +1,42 @@
+"""Tests for the authentication service."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from keycase_agent.auth import AuthCredentials, AuthService
+
+
+class TestAuthService:
+    """Test suite for AuthService."""
+
+    def setup_method(self):
+        """Set up a service holding a valid token."""
+        self.service = AuthService(
+            http_url='http://localhost:8080/api',
+            agent_token='agt_test_token_123456789',
+            agent_name='test-agent-01',
+        )
+        self.service._credentials = AuthCredentials(
+            agent_id=123,
+            organization_id=1,
+            access_token='old_token',
+            refresh_token='test_refresh_token',
+            session_id='test_session_id',
+            ws_url='ws://localhost:8080/websocket',
+            token_expires_at=datetime.now() + timedelta(hours=24),
+        )
+
+    @patch('keycase_agent.auth.refresh_access_token')
+    def test_invalidated_token_refreshed_once(self, mock_refresh):
+        """Test a rejected token is refreshed by the next get_token()."""
+        mock_refresh.return_value = {
+            'accessToken': 'new_token', 'refreshToken': 'new_refresh'
+        }
+
+        self.service.invalidate_token('old_token')
+        assert self.service.get_token() == 'new_token'
+
+        # A late rejection of the replaced token changes nothing
+        self.service.invalidate_token('old_token')
+        assert self.service.get_token() == 'new_token'
+        mock_refresh.assert_called_once()
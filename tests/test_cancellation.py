@@ -0,0 +1,224 @@
+"""Tests for step timeouts and cooperative cancellation."""
+
+import json
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from keycase_agent.cancellation import CancellationToken, wait_for_future
+from keycase_agent.decorators import keyword
+from keycase_agent.exceptions import StepCancelledError, StepTimeoutError
+from keycase_agent.execution_context import get_cancellation_token, get_context
+from keycase_agent.execution_manager import ExecutionManager
+from keycase_agent.models.execute_plan import (
+    Flow,
+    FlowStep,
+    KeywordInstance,
+    parse_step,
+)
+from keycase_agent.models.execution_result import StatusEnum
+
+
+class TestCancellationToken:
+    """Test suite for CancellationToken."""
+
+    def test_token_without_stop_or_timeout_is_never_cancelled(self):
+        """Test a bare token stays active."""
+        token = CancellationToken()
+
+        assert not token.is_cancelled()
+        assert token.remaining() is None
+        token.raise_if_cancelled()
+
+    def test_stop_event_cancels_token(self):
+        """Test setting the run's stop event cancels the token."""
+        stop_event = threading.Event()
+        token = CancellationToken(stop_event)
+        stop_event.set()
+
+        assert token.is_cancelled()
+        with pytest.raises(StepCancelledError):
+            token.raise_if_cancelled()
+
+    def test_timeout_cancels_token(self):
+        """Test the token times out after its timeout."""
+        token = CancellationToken(timeout=0.05)
+
+        assert token.wait(timeout=2)
+        assert token.timed_out()
+        with pytest.raises(StepTimeoutError, match="timed out after 0.05s"):
+            token.raise_if_cancelled()
+
+    def test_wait_returns_false_when_not_cancelled(self):
+        """Test wait() returns False once its own timeout passes."""
+        assert CancellationToken().wait(timeout=0.05) is False
+
+    def test_wait_for_future_returns_result(self):
+        """Test results and keyword exceptions pass through."""
+        future = Future()
+        future.set_result(42)
+        assert wait_for_future(future, CancellationToken()) == 42
+
+        failed = Future()
+        failed.set_exception(ValueError("boom"))
+        with pytest.raises(ValueError, match="boom"):
+            wait_for_future(failed, CancellationToken())
+
+    def test_wait_for_future_gives_up_on_timeout(self):
+        """Test waiting stops at the timeout even if the call never ends."""
+        started = time.monotonic()
+
+        with pytest.raises(StepTimeoutError):
+            wait_for_future(Future(), CancellationToken(timeout=0.1))
+        assert time.monotonic() - started < 2
+
+    def test_get_cancellation_token_outside_step(self):
+        """Test a token is available even outside of a step."""
+        assert not get_cancellation_token().is_cancelled()
+
+
+class TestStepTimeouts:
+    """Test suite for step timeouts and stop handling in ExecutionManager."""
+
+    def setup_method(self):
+        """Set up a local manager."""
+        self.manager = ExecutionManager(mode="local")
+        self.release = threading.Event()
+
+    def teardown_method(self):
+        """Let hung keywords return and release the manager."""
+        self.release.set()
+        self.manager.shutdown()
+
+    @staticmethod
+    def _plan(keyword_name, step_data=None):
+        return {
+            "keywordInstances": [
+                {
+                    "id": 1,
+                    "keywordName": keyword_name,
+                    "keywordId": 1,
+                    "name": keyword_name,
+                    "params": [],
+                }
+            ],
+            "flows": [
+                {
+                    "id": 1,
+                    "name": "Flow 1",
+                    "steps": [
+                        dict({"id": 1, "instanceId": 1, "sequenceOrder": 1},
+                             **(step_data or {}))
+                    ],
+                },
+                {
+                    "id": 2,
+                    "name": "Flow 2",
+                    "steps": [{"id": 2, "instanceId": 1, "sequenceOrder": 1}],
+                },
+            ],
+        }
+
+    def test_parse_step_reads_timeout(self):
+        """Test timeoutSeconds is read from the plan."""
+        step = parse_step(
+            {"id": 1, "instanceId": 1, "sequenceOrder": 1, "timeoutSeconds": 5}
+        )
+
+        untimed = parse_step({"id": 1, "instanceId": 1, "sequenceOrder": 1})
+
+        assert step.timeout == 5.0
+        assert untimed.timeout is None
+
+    def test_hung_sync_keyword_times_out_and_run_moves_on(self):
+        """Test a hung keyword is marked TIMEOUT and later flows still run."""
+        calls = []
+
+        @keyword("test_timeout_hang", timeout=0.2)
+        def hang() -> None:
+            calls.append(1)
+            if len(calls) == 1:
+                self.release.wait(10)
+
+        started = time.monotonic()
+        results = self.manager.execute_local(self._plan("test_timeout_hang"))
+
+        flow_results = results["result"]["flowResults"]
+        assert time.monotonic() - started < 5
+        assert flow_results[0]["status"] == "TIMEOUT"
+        assert flow_results[0]["failedOnStepId"] == 1
+        assert "timed out after 0.2s" in flow_results[0]["message"]
+        assert flow_results[1]["status"] == "PASSED"
+
+    def test_step_timeout_overrides_keyword_timeout(self):
+        """Test timeoutSeconds on a step takes precedence over the keyword's."""
+        calls = []
+
+        @keyword("test_timeout_override", timeout=30)
+        def slow() -> None:
+            calls.append(1)
+            if len(calls) == 1:
+                self.release.wait(10)
+
+        plan = self._plan("test_timeout_override", {"timeoutSeconds": 0.1})
+        results = self.manager.execute_local(plan)
+
+        assert results["result"]["flowResults"][0]["status"] == "TIMEOUT"
+        assert results["result"]["flowResults"][1]["status"] == "PASSED"
+
+    def test_keyword_can_poll_cancellation_token(self):
+        """Test a keyword sees its token cancelled and its context is set."""
+        seen = {}
+
+        @keyword("test_timeout_cooperative", timeout=0.1)
+        def cooperative() -> None:
+            seen["run_id"] = get_context()["run_id"]
+            token = get_cancellation_token()
+            seen["cancelled"] = token.wait(timeout=5)
+
+        self.manager.execute_local(self._plan("test_timeout_cooperative"), run_id="r1")
+
+        assert seen == {"run_id": "r1", "cancelled": True}
+
+    def test_stop_does_not_wait_for_hung_keyword(self):
+        """Test stopping a run with a hung keyword aborts the step promptly."""
+        started_event = threading.Event()
+
+        @keyword("test_stop_hang")
+        def hang() -> None:
+            started_event.set()
+            self.release.wait(10)
+
+        thread = self.manager.start_execution(
+            "p", "r1", json.dumps(self._plan("test_stop_hang"))
+        )
+        assert started_event.wait(timeout=5)
+
+        started = time.monotonic()
+        self.manager.stop_run("r1")
+
+        assert not thread.is_alive()
+        assert time.monotonic() - started < 5
+        flow_result = self.manager.local_results["r1"]["result"]["flowResults"][0]
+        assert flow_result["status"] == StatusEnum.ABORTED.value
+        assert "execution stopped" in flow_result["message"]
+
+    def test_keywords_of_a_run_share_one_call_thread(self):
+        """Test consecutive sync keywords reuse the same call thread."""
+        threads = []
+
+        @keyword("test_call_thread")
+        def record() -> None:
+            threads.append(threading.current_thread())
+
+        instance = KeywordInstance(1, "test_call_thread", 1, "record", [])
+        flow = Flow(1, 1, "default", "flow", [FlowStep(1, 1, 1), FlowStep(2, 1, 2)])
+
+        result = self.manager._execute_flow(1, flow, [instance], set())
+
+        assert result.status == StatusEnum.PASSED
+        assert len(threads) == 2
+        assert threads[0] is threads[1]
+        assert threads[0] is not threading.current_thread()
@@ -3,7 +3,13 @@
 import pytest
 import os
 from unittest.mock import patch
-from keycase_agent.config import require_env, load_config, validate_agent_token, parse_list
+from keycase_agent.config import (
+    require_env,
+    load_config,
+    validate_agent_token,
+    parse_list,
+    parse_positive_int,
+)
 
 
 class TestRequireEnv:
@@ -77,6 +83,26 @@ class TestParseList:
         assert result == ['selenium']
 
 
+class TestParsePositiveInt:
+    """Test suite for parse_positive_int function."""
+
+    def test_default_when_unset(self):
+        """Test default is returned for None or empty values."""
+        assert parse_positive_int(None, 'SETTING', 3) == 3
+        assert parse_positive_int('', 'SETTING', 3) == 3
+
+    def test_parses_integer(self):
+        """Test integer strings are parsed."""
+        assert parse_positive_int('8', 'SETTING', 1) == 8
+
+    def test_rejects_invalid_values(self):
+        """Test non-integer and non-positive values raise ValueError."""
+        with pytest.raises(ValueError, match="SETTING must be an integer"):
+            parse_positive_int('many', 'SETTING', 1)
+        with pytest.raises(ValueError, match="SETTING must be at least 1"):
+            parse_positive_int('0', 'SETTING', 1)
+
+
 class TestLoadConfig:
     """Test suite for load_config function."""
 
@@ -116,6 +142,208 @@ class TestLoadConfig:
             assert config['AGENT_CAPABILITIES'] == ['selenium', 'api']
             assert config['AGENT_TAGS'] == ['production', 'windows']
 
+    def test_load_config_parallelism(self):
+        """Test parallelism settings default to 1 and can be overridden."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = load_config()
+            assert config['MAX_PARALLEL_STEPS'] == 1
+            assert config['MAX_PARALLEL_FLOWS'] == 1
+            assert config['MAX_CONCURRENT_RUNS'] == 1
+
+        overrides = {'MAX_PARALLEL_STEPS': '4', 'MAX_PARALLEL_FLOWS': '16',
+                     'MAX_CONCURRENT_RUNS': '8'}
+        with patch.dict(os.environ, {**env_vars, **overrides}, clear=True):
+            config = load_config()
+            assert config['MAX_PARALLEL_STEPS'] == 4
+            assert config['MAX_PARALLEL_FLOWS'] == 16
+            assert config['MAX_CONCURRENT_RUNS'] == 8
+
+    def test_load_config_execution_log_verbosity(self):
+        """Test log verbosity defaults to summary and rejects unknown values."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            assert load_config()['EXECUTION_LOG_VERBOSITY'] == 'summary'
+
+        with patch.dict(
+            os.environ, {**env_vars, 'EXECUTION_LOG_VERBOSITY': 'OFF'}, clear=True
+        ):
+            assert load_config()['EXECUTION_LOG_VERBOSITY'] == 'off'
+
+        with patch.dict(
+            os.environ, {**env_vars, 'EXECUTION_LOG_VERBOSITY': 'loud'}, clear=True
+        ):
+            with pytest.raises(
+                ValueError, match="EXECUTION_LOG_VERBOSITY must be one of"
+            ):
+                load_config()
+
+    def test_load_config_event_queue(self):
+        """Test event queue bound and overflow policy settings."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = load_config()
+            assert config['EVENT_QUEUE_MAX_EVENTS'] == 10000
+            assert config['EVENT_QUEUE_OVERFLOW'] == 'drop_oldest'
+
+        overrides = {'EVENT_QUEUE_MAX_EVENTS': '500', 'EVENT_QUEUE_OVERFLOW': 'block'}
+        with patch.dict(os.environ, {**env_vars, **overrides}, clear=True):
+            config = load_config()
+            assert config['EVENT_QUEUE_MAX_EVENTS'] == 500
+            assert config['EVENT_QUEUE_OVERFLOW'] == 'block'
+
+        with patch.dict(
+            os.environ, {**env_vars, 'EVENT_QUEUE_OVERFLOW': 'spill'}, clear=True
+        ):
+            with pytest.raises(ValueError, match="EVENT_QUEUE_OVERFLOW must be one of"):
+                load_config()
+
+    def test_load_config_ws_compression(self):
+        """Test the WS_COMPRESSION setting."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            assert load_config()['WS_COMPRESSION'] == 'off'
+
+        with patch.dict(
+            os.environ, {**env_vars, 'WS_COMPRESSION': 'deflate'}, clear=True
+        ):
+            assert load_config()['WS_COMPRESSION'] == 'deflate'
+
+        with patch.dict(os.environ, {**env_vars, 'WS_COMPRESSION': 'gzip'}, clear=True):
+            with pytest.raises(ValueError, match="WS_COMPRESSION must be one of"):
+                load_config()
+
+    def test_load_config_http_client(self):
+        """Test the HTTP pool size and timeout settings."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = load_config()
+            assert config['HTTP_POOL_SIZE'] == 10
+            assert config['HTTP_TIMEOUT'] == 30
+
+        overrides = {'HTTP_POOL_SIZE': '32', 'HTTP_TIMEOUT': '60'}
+        with patch.dict(os.environ, {**env_vars, **overrides}, clear=True):
+            config = load_config()
+            assert config['HTTP_POOL_SIZE'] == 32
+            assert config['HTTP_TIMEOUT'] == 60
+
+        with patch.dict(os.environ, {**env_vars, 'HTTP_TIMEOUT': '0'}, clear=True):
+            with pytest.raises(ValueError, match="HTTP_TIMEOUT"):
+                load_config()
+
+    def test_load_config_result_spool_fsync(self):
+        """Test the RESULT_SPOOL_FSYNC setting."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            assert load_config()['RESULT_SPOOL_FSYNC'] == 'always'
+
+        with patch.dict(
+            os.environ, {**env_vars, 'RESULT_SPOOL_FSYNC': 'normal'}, clear=True
+        ):
+            assert load_config()['RESULT_SPOOL_FSYNC'] == 'normal'
+
+        with patch.dict(
+            os.environ, {**env_vars, 'RESULT_SPOOL_FSYNC': 'never'}, clear=True
+        ):
+            with pytest.raises(ValueError, match="RESULT_SPOOL_FSYNC must be one of"):
+                load_config()
+
+    def test_load_config_plan_cache(self):
+        """Test the plan cache size and directory settings."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = load_config()
+            assert config['PLAN_CACHE_SIZE'] == 32
+            assert config['PLAN_CACHE_DIR'] is None
+
+        overrides = {'PLAN_CACHE_SIZE': '5', 'PLAN_CACHE_DIR': '/tmp/plans'}
+        with patch.dict(os.environ, {**env_vars, **overrides}, clear=True):
+            config = load_config()
+            assert config['PLAN_CACHE_SIZE'] == 5
+            assert config['PLAN_CACHE_DIR'] == '/tmp/plans'
+
+    def test_load_config_inbound_queue_max_messages(self):
+        """Test the inbound queue bound setting."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            assert load_config()['INBOUND_QUEUE_MAX_MESSAGES'] == 100
+
+        with patch.dict(
+            os.environ, {**env_vars, 'INBOUND_QUEUE_MAX_MESSAGES': '10'}, clear=True
+        ):
+            assert load_config()['INBOUND_QUEUE_MAX_MESSAGES'] == 10
+
+        with patch.dict(
+            os.environ, {**env_vars, 'INBOUND_QUEUE_MAX_MESSAGES': '0'}, clear=True
+        ):
+            with pytest.raises(ValueError):
+                load_config()
+
+    def test_load_config_result_upload_mode(self):
+        """Test the result upload mode and stream chunk size settings."""
+        env_vars = {
+            'HTTP_URL': 'http://test.com/api',
+            'AGENT_TOKEN': 'agt_test_token_123456789',
+            'AGENT_NAME': 'test-agent-01'
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            config = load_config()
+            assert config['RESULT_UPLOAD_MODE'] == 'single'
+            assert config['RESULT_STREAM_CHUNK_SIZE'] == 50
+
+        overrides = {'RESULT_UPLOAD_MODE': 'STREAM', 'RESULT_STREAM_CHUNK_SIZE': '10'}
+        with patch.dict(os.environ, {**env_vars, **overrides}, clear=True):
+            config = load_config()
+            assert config['RESULT_UPLOAD_MODE'] == 'stream'
+            assert config['RESULT_STREAM_CHUNK_SIZE'] == 10
+
+        with patch.dict(
+            os.environ, {**env_vars, 'RESULT_UPLOAD_MODE': 'ndjson'}, clear=True
+        ):
+            with pytest.raises(ValueError):
+                load_config()
+
     def test_load_config_missing_http_url(self):
         """Test load_config raises error when HTTP_URL is missing."""
         env_vars = {
@@ -184,4 +412,13 @@ class TestLoadConfig:
         with patch.dict(os.environ, env_vars, clear=True):
             config = load_config()
             assert isinstance(config, dict)
-            assert len(config) == 6  # HTTP_URL, AGENT_TOKEN, AGENT_NAME, AGENT_VERSION, AGENT_CAPABILITIES, AGENT_TAGS
+            assert set(config) == {
+                'HTTP_URL', 'AGENT_TOKEN', 'AGENT_NAME', 'AGENT_VERSION',
+                'AGENT_CAPABILITIES', 'AGENT_TAGS', 'MAX_PARALLEL_STEPS',
+                'MAX_PARALLEL_FLOWS', 'MAX_CONCURRENT_RUNS',
+                'EXECUTION_LOG_VERBOSITY', 'EVENT_QUEUE_MAX_EVENTS',
+                'EVENT_QUEUE_OVERFLOW', 'WS_COMPRESSION', 'HTTP_POOL_SIZE',
+                'HTTP_TIMEOUT', 'RESULT_SPOOL_FSYNC', 'PLAN_CACHE_SIZE',
+                'PLAN_CACHE_DIR', 'INBOUND_QUEUE_MAX_MESSAGES',
+                'RESULT_UPLOAD_MODE', 'RESULT_STREAM_CHUNK_SIZE',
+            }
@@ -0,0 +1,73 @@
+"""Tests for keyword decorators and call descriptors."""
+
+from unittest.mock import Mock
+
+from keycase_agent.decorators import (
+    KeywordCallDescriptor,
+    get_call_descriptor,
+    input_param,
+    keyword,
+    output_param,
+)
+
+
+class TestCallDescriptor:
+    """Test suite for keyword call descriptors."""
+
+    def test_keyword_descriptor_built_on_first_lookup(self):
+        """Test a keyword's call descriptor is built once and then reused."""
+
+        @keyword("test_descriptor_keyword")
+        @input_param("name", required=True)
+        @output_param("greeting")
+        def greet(name: str, prefix: str = "Hi") -> dict:
+            return {"greeting": f"{prefix} {name}"}
+
+        descriptor = get_call_descriptor(greet)
+
+        assert isinstance(descriptor, KeywordCallDescriptor)
+        assert descriptor.keyword_name == "test_descriptor_keyword"
+        assert descriptor.arg_names == ("name", "prefix")
+        assert descriptor.required_args == frozenset({"name"})
+        assert not descriptor.accepts_var_kwargs
+        assert set(descriptor.input_params) == {"name", "prefix"}
+        assert descriptor.required_inputs == frozenset({"name"})
+        assert descriptor.output_names == ("greeting",)
+        assert get_call_descriptor(greet) is descriptor
+
+    def test_param_above_keyword_is_included(self):
+        """Test @input_param applied after @keyword still reaches the descriptor."""
+
+        @input_param("name", required=True)
+        @keyword("test_descriptor_param_above")
+        def greet(name: str = "World") -> dict:
+            return {"greeting": f"Hi {name}"}
+
+        descriptor = get_call_descriptor(greet)
+
+        assert descriptor.required_inputs == frozenset({"name"})
+        assert descriptor.input_params["name"].required
+
+    def test_descriptor_detects_var_kwargs(self):
+        """Test **kwargs keywords are flagged as accepting extra inputs."""
+
+        @keyword("test_descriptor_var_kwargs")
+        def flexible(a, **options):
+            return None
+
+        descriptor = get_call_descriptor(flexible)
+
+        assert descriptor.accepts_var_kwargs
+        assert descriptor.arg_names == ("a",)
+
+    def test_descriptor_built_lazily_and_cached(self):
+        """Test callables without a descriptor get one built and cached on first use."""
+        func = Mock(return_value=None)
+        func.keyword_params = []
+        func.keyword_name = "mocked"
+
+        descriptor = get_call_descriptor(func)
+
+        assert isinstance(descriptor, KeywordCallDescriptor)
+        assert func.call_descriptor is descriptor
+        assert get_call_descriptor(func) is descriptor
@@ -0,0 +1,152 @@
+"""Tests for EventHandler."""
+
+import json
+import threading
+from concurrent.futures import Future
+from unittest.mock import Mock
+
+from keycase_agent.event_handler import EventHandler
+from keycase_agent.models.websocket_event_types import WebSocketEventType
+
+
+def execute_message(run_id=100, project_id=1):
+    """Build an execute plan command."""
+    return json.dumps({
+        'event': WebSocketEventType.AGENT_EXECUTE_PLAN_COMMAND.value,
+        'payload': {'runId': run_id, 'projectId': project_id},
+    })
+
+
+class TestExecutePlan:
+    """Test suite for handling execute plan commands."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.execution_manager = Mock()
+        self.state_tracker = Mock()
+        self.state_tracker.try_acquire_slot.return_value = True
+        self.event_sender = Mock()
+        self.get_execution_plan = Mock(return_value={'flows': []})
+        self.handler = EventHandler(
+            execution_manager=self.execution_manager,
+            state_tracker=self.state_tracker,
+            get_execution_plan=self.get_execution_plan,
+            event_sender=self.event_sender,
+        )
+
+    def teardown_method(self):
+        """Stop the plan fetch threads."""
+        self.handler.shutdown()
+
+    def test_plan_fetched_off_the_message_thread(self):
+        """Test the run starts with a future while the plan is fetched."""
+        fetch_threads = []
+        release = threading.Event()
+
+        def fetch(project_id, run_id):
+            fetch_threads.append(threading.current_thread())
+            release.wait(5)
+            return {'flows': []}
+
+        self.get_execution_plan.side_effect = fetch
+
+        self.handler.handle(execute_message())
+
+        self.event_sender.accepted_execution.assert_called_once()
+        start_execution = self.execution_manager.start_execution
+        project_id, run_id, plan_future = start_execution.call_args[0]
+        assert (project_id, run_id) == (1, 100)
+        assert isinstance(plan_future, Future)
+        assert not plan_future.done()
+
+        release.set()
+        assert plan_future.result(timeout=5) == {'flows': []}
+        assert fetch_threads[0] is not threading.current_thread()
+
+    def test_fetch_failure_reaches_the_run(self):
+        """Test a failed fetch is raised from the plan future, not handle()."""
+        self.get_execution_plan.side_effect = Exception(
+            'Failed to fetch execution plan'
+        )
+
+        self.handler.handle(execute_message())
+
+        plan_future = self.execution_manager.start_execution.call_args[0][2]
+        assert isinstance(plan_future.exception(timeout=5), Exception)
+        self.state_tracker.release_slot.assert_not_called()
+
+    def test_busy_agent_rejects_without_fetching(self):
+        """Test no plan is fetched when no run slot is free."""
+        self.state_tracker.try_acquire_slot.return_value = False
+
+        self.handler.handle(execute_message())
+
+        self.event_sender.busy_message.assert_called_once()
+        self.get_execution_plan.assert_not_called()
+        self.execution_manager.start_execution.assert_not_called()
+
+    def test_reject_declines_execute_command(self):
+        """Test a rejected execute command is answered as busy."""
+        self.handler.reject(json.loads(execute_message(run_id=7)))
+
+        self.event_sender.busy_message.assert_called_once_with(
+            WebSocketEventType.AGENT_EXECUTION_DENIED_NOTIFY, 7, 'Agent is busy'
+        )
+        self.state_tracker.try_acquire_slot.assert_not_called()
+
+
+class TestStopExecution:
+    """Test suite for handling stop execution commands."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.execution_manager = Mock()
+        self.state_tracker = Mock()
+        self.event_sender = Mock()
+        self.handler = EventHandler(
+            execution_manager=self.execution_manager,
+            state_tracker=self.state_tracker,
+            get_execution_plan=Mock(),
+            event_sender=self.event_sender,
+        )
+
+    def teardown_method(self):
+        """Stop the plan fetch threads."""
+        self.handler.shutdown()
+
+    def test_stop_does_not_wait_for_the_run(self):
+        """Test the run is signalled and the abort sent, keeping its slot."""
+        self.handler.handle_event({
+            'event': WebSocketEventType.AGENT_STOP_EXECUTION_COMMAND.value,
+            'payload': {'runId': 7},
+        })
+
+        self.execution_manager.stop_run.assert_called_once_with(7, wait=False)
+        self.state_tracker.release_slot.assert_not_called()
+        self.event_sender.send_event.assert_called_once_with(
+            WebSocketEventType.AGENT_EXECUTION_ABORTED_NOTIFY, {'runId': 7}, True
+        )
+
+
+class TestAuthentication:
+    """Test suite for authentication responses."""
+
+    def test_auth_success_payload_reaches_callback(self):
+        """Test the server's auth response is passed on, e.g. for compression."""
+        on_authenticated = Mock()
+        handler = EventHandler(
+            execution_manager=Mock(),
+            state_tracker=Mock(),
+            get_execution_plan=Mock(),
+            event_sender=Mock(),
+            on_authenticated=on_authenticated,
+        )
+        try:
+            handler.handle_event({
+                'event': WebSocketEventType.AUTH_SUCCESS_RESPONSE.value,
+                'payload': {'compression': 'deflate'},
+            })
+        finally:
+            handler.shutdown()
+
+        on_authenticated.assert_called_once_with({'compression': 'deflate'})
@@ -0,0 +1,249 @@
+"""Tests for event batching in EventSender."""
+
+import json
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from keycase_agent.utils import event_sender
+from keycase_agent.utils.event_sender import EventSender
+from keycase_agent.models.websocket_event_types import WebSocketEventType
+
+
+def _sent_events(ws):
+    """Decode every batch frame sent on a mock websocket."""
+    return [json.loads(call.args[0])["events"] for call in ws.send.call_args_list]
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestEventBatching:
+    """Test suite for adaptive event batching."""
+
+    def setup_method(self):
+        """Create senders on a mock websocket with a long latency."""
+        self.ws = Mock()
+        self.senders = []
+
+    def teardown_method(self):
+        """Stop the flush threads without sending queued events."""
+        for sender in self.senders:
+            sender.stop(flush=False)
+
+    def _sender(self, ws=None, **limits):
+        limits.setdefault("flush_interval", 60.0)
+        sender = EventSender(ws or self.ws, **limits)
+        sender.start()
+        self.senders.append(sender)
+        return sender
+
+    def test_flushes_when_event_count_reached(self):
+        """Test a batch is sent as soon as max_batch_events are queued."""
+        sender = self._sender(max_batch_events=3)
+
+        for i in range(3):
+            sender.send_event("custom", {"i": i})
+
+        assert _wait_for(lambda: self.ws.send.called)
+        assert _sent_events(self.ws) == [[
+            {"event": "custom", "payload": {"i": i}} for i in range(3)
+        ]]
+
+    def test_flushes_after_max_latency(self):
+        """Test a lone event is sent once it has waited flush_interval."""
+        sender = self._sender(flush_interval=0.1)
+
+        sender.send_event("custom", {"i": 1})
+
+        assert _wait_for(lambda: self.ws.send.called)
+
+    def test_lone_event_flushed_by_idle_flush_thread(self):
+        """Test an event reaching an idle, empty queue is sent after flush_interval."""
+        sender = self._sender(flush_interval=0.2)
+        time.sleep(0.3)  # The flush thread is now waiting on the empty queue
+
+        sent_at = time.monotonic()
+        sender.send_event("custom", {"i": 1})
+
+        assert _wait_for(lambda: self.ws.send.called, timeout=1.0)
+        assert time.monotonic() - sent_at < 1.0
+
+    def test_terminal_event_flushes_immediately(self):
+        """Test a completed-flow progress event triggers an early flush."""
+        sender = self._sender()
+        flow_result = Mock(id=1, status=Mock(value="PASSED"), runAt=None,
+                           completedAt=None, failedOnStepId=None, message=None)
+        flow_result.name = "flow"
+
+        sender.send_event("custom", {"status": "RUNNING"})
+        assert not _wait_for(lambda: self.ws.send.called, timeout=0.2)
+
+        sender.progress_event(
+            WebSocketEventType.AGENT_EXECUTION_PROGRESS_NOTIFY, 7, flow_result
+        )
+
+        assert _wait_for(lambda: self.ws.send.called)
+        assert len(_sent_events(self.ws)[0]) == 2
+
+    def test_frames_respect_byte_limit(self):
+        """Test a backlog is split into frames no larger than max_batch_bytes."""
+        sender = self._sender(max_batch_events=1000, max_batch_bytes=200)
+        for i in range(20):
+            sender._enqueue(json.dumps({"event": "e", "i": i}))
+
+        sender.flush()
+        assert _wait_for(lambda: sender.queued_event_count() == 0)
+
+        frames = [call.args[0] for call in self.ws.send.call_args_list]
+        assert len(frames) > 1
+        assert all(len(frame) <= 200 + len('{"events": []}') for frame in frames)
+        events = [event for batch in _sent_events(self.ws) for event in batch]
+        assert [event["i"] for event in events] == list(range(20))
+
+    def test_new_connection_receives_queued_events(self):
+        """Test events queued while disconnected go out on the new connection."""
+        sender = self._sender(ws=Mock(), flush_interval=0.05)
+        sender.set_connection(None)
+        sender.send_event("custom", {"i": 0})
+        assert not _wait_for(lambda: self.ws.send.called, timeout=0.2)
+
+        sender.set_connection(self.ws)
+
+        assert _wait_for(lambda: self.ws.send.called)
+        assert _sent_events(self.ws) == [[{"event": "custom", "payload": {"i": 0}}]]
+
+    def test_senders_are_independent(self):
+        """Test two senders keep their own queues and connections."""
+        other_ws = Mock()
+        first = self._sender(max_batch_events=1)
+        second = self._sender(ws=other_ws)
+
+        second.send_event("custom", {"agent": 2})
+        first.send_event("custom", {"agent": 1})
+
+        assert _wait_for(lambda: self.ws.send.called)
+        assert _sent_events(self.ws) == [[{"event": "custom", "payload": {"agent": 1}}]]
+        assert not other_ws.send.called
+        assert second.queued_event_count() == 1
+
+    def test_stop_flushes_queued_events(self):
+        """Test stop() sends what is still queued."""
+        sender = EventSender(self.ws, flush_interval=60.0)
+        sender.start()
+        sender.send_event("custom", {"i": 0})
+
+        sender.stop()
+
+        assert not sender.is_running
+        assert len(_sent_events(self.ws)) == 1
+
+    def test_module_functions_use_default_sender(self):
+        """Test the module-level helpers queue on the default sender."""
+        before = event_sender.default_sender.queued_event_count()
+
+        event_sender.send_event("custom", {"i": 0})
+
+        assert event_sender.default_sender.queued_event_count() == before + 1
+        with event_sender.default_sender._lock:
+            event_sender.default_sender._take_batches()
+
+    @pytest.mark.parametrize("payload, terminal", [
+        ({"status": "FAILED"}, True),
+        ({"status": "RUNNING"}, False),
+        ({"status": "AVAILABLE"}, False),
+    ])
+    def test_terminal_detection(self, payload, terminal):
+        """Test only flow-ending statuses count as terminal."""
+        assert event_sender._is_terminal("custom", payload) is terminal
+        assert event_sender._is_terminal("agent_execution_completed_notify", {})
+
+
+class TestEventQueueBounds:
+    """Test suite for coalescing and the bounded event queue."""
+
+    def setup_method(self):
+        """Create a websocket-less sender so events stay queued."""
+        self.sender = EventSender(None, flush_interval=60.0)
+
+    def _queued(self):
+        with self.sender._lock:
+            return [json.loads(e) for e in self.sender._queue.values()]
+
+    def test_progress_events_coalesce_per_flow(self):
+        """Test a newer progress event replaces the queued one for its flow."""
+        self.sender.send_event("other", {"n": 1})
+        self.sender.send_event("progress", {"status": "RUNNING", "id": 1},
+                               coalesce_key=("progress", 7, 1))
+        self.sender.send_event("progress", {"status": "RUNNING", "id": 2},
+                               coalesce_key=("progress", 7, 2))
+        self.sender.send_event("progress", {"status": "DONE", "id": 1},
+                               coalesce_key=("progress", 7, 1))
+
+        assert [e["payload"] for e in self._queued()] == [
+            {"n": 1},
+            {"status": "DONE", "id": 1},
+            {"status": "RUNNING", "id": 2},
+        ]
+        expected_bytes = sum(len(e) + 1 for e in self.sender._queue.values())
+        assert self.sender._queued_bytes == expected_bytes
+
+    @pytest.mark.parametrize("policy, kept", [
+        ("drop_oldest", [2, 3, 4]),
+        ("drop_newest", [0, 1, 2]),
+    ])
+    def test_overflow_policy(self, policy, kept):
+        """Test a full queue drops the oldest or the newest event."""
+        self.sender.configure(
+            flush_interval=60.0, max_queue_events=3, overflow_policy=policy
+        )
+
+        for i in range(5):
+            self.sender.send_event("custom", {"i": i})
+
+        assert [e["payload"]["i"] for e in self._queued()] == kept
+        assert self.sender.dropped_event_count() == 2
+
+    def test_unknown_overflow_policy_rejected(self):
+        """Test the overflow policy is validated."""
+        with pytest.raises(ValueError, match="overflow_policy"):
+            EventSender(overflow_policy="explode")
+
+    def test_failed_send_keeps_events_queued(self):
+        """Test events survive a failed send and precede newer events."""
+        ws = Mock()
+        ws.send.side_effect = OSError("connection lost")
+        self.sender.set_connection(ws)
+        self.sender.send_event("custom", {"i": 0})
+
+        self.sender.flush()
+        self.sender.send_event("custom", {"i": 1})
+
+        assert [e["payload"]["i"] for e in self._queued()] == [0, 1]
+
+    def test_completion_jumps_ahead_of_queued_batches(self):
+        """Test a run completion is queued ahead of a reconnect backlog."""
+        from keycase_agent.websocket_client import WebSocketClient
+
+        client = WebSocketClient("ws://test", Mock(), Mock(), Mock(), Mock())
+        self.sender.set_connection(client)
+        for i in range(3):
+            self.sender.send_event("progress", {"i": i})
+            self.sender.flush()
+
+        self.sender.completed_execution(
+            WebSocketEventType.AGENT_EXECUTION_COMPLETED_NOTIFY, 7, {7: "run"}
+        )
+
+        first = json.loads(client.pending_messages.get())
+        assert first == {
+            "event": "agent_execution_completed_notify", "payload": {"runId": 7}
+        }
+        assert client.pending_messages.qsize() == 3
@@ -0,0 +1,200 @@
+"""Tests for execution plan parsing and compilation."""
+
+import json
+
+import pytest
+
+from keycase_agent.models.execute_plan import (
+    CompiledPlan,
+    FlowConnection,
+    FlowStep,
+    Param,
+    LazyCompiledPlan,
+    build_connection_index,
+    compile_execution_plan,
+    compile_plan_data,
+    execute_plan_from_json,
+)
+
+
+def _plan_dict():
+    return {
+        "keywordInstances": [
+            {
+                "id": 10,
+                "keywordName": "produce",
+                "keywordId": 1,
+                "name": "Produce",
+                "params": [
+                    {
+                        "id": 100,
+                        "name": "value",
+                        "direction": "output",
+                        "type": "string",
+                        "isMandatory": False,
+                        "value": None,
+                    }
+                ],
+            },
+            {
+                "id": 20,
+                "keywordName": "consume",
+                "keywordId": 2,
+                "name": "Consume",
+                "params": [
+                    {
+                        "id": 200,
+                        "name": "value",
+                        "direction": "input",
+                        "type": "string",
+                        "isMandatory": True,
+                        "value": "default",
+                    }
+                ],
+            },
+        ],
+        "flows": [
+            {
+                "id": 1,
+                "name": "Flow 1",
+                "steps": [
+                    {"id": 1, "instanceId": 10, "sequenceOrder": 1},
+                    {"id": 2, "instanceId": 20, "sequenceOrder": 2},
+                ],
+                "connections": [
+                    {
+                        "id": 1,
+                        "fromStepId": 1,
+                        "toStepId": 2,
+                        "fromParamId": 100,
+                        "toParamId": 200,
+                    }
+                ],
+            }
+        ],
+    }
+
+
+class TestCompiledPlan:
+    """Test suite for CompiledPlan indexes."""
+
+    def test_compile_indexes_instances_by_id(self):
+        """Test keyword instances are resolvable by ID."""
+        plan = compile_execution_plan(*execute_plan_from_json(json.dumps(_plan_dict())))
+
+        assert isinstance(plan, CompiledPlan)
+        assert plan.get_instance(10).keyword_name == "produce"
+        assert plan.get_instance(20).keyword_name == "consume"
+        assert plan.get_instance(99) is None
+
+    def test_duplicate_instance_id_resolves_to_first(self):
+        """Test the first of two instances sharing an ID is the one looked up."""
+        data = _plan_dict()
+        duplicate = dict(data["keywordInstances"][1], id=10)
+        data["keywordInstances"].append(duplicate)
+
+        eager = compile_execution_plan(*execute_plan_from_json(json.dumps(data)))
+        lazy = compile_plan_data(data)
+
+        assert eager.get_instance(10).keyword_name == "produce"
+        assert lazy.get_instance(10).keyword_name == "produce"
+
+    def test_connection_index_built_once_per_flow(self):
+        """Test connection index maps targets to sources and is cached."""
+        plan = compile_execution_plan(*execute_plan_from_json(json.dumps(_plan_dict())))
+        flow = plan.flows[0]
+
+        index = plan.get_connection_index(flow)
+
+        assert index == {(2, 200): [(1, 100)]}
+        assert plan.get_connection_index(flow) is index
+
+    def test_build_connection_index_keeps_source_order(self):
+        """Test multiple sources for the same target keep declaration order."""
+        connections = [
+            FlowConnection(
+                1, from_step_id=1, to_step_id=3, from_param_id=1, to_param_id=9
+            ),
+            FlowConnection(
+                2, from_step_id=2, to_step_id=3, from_param_id=2, to_param_id=9
+            ),
+        ]
+
+        assert build_connection_index(connections) == {(3, 9): [(1, 1), (2, 2)]}
+        assert build_connection_index([]) == {}
+
+
+class TestLazyCompiledPlan:
+    """Test suite for plans compiled straight from a decoded dict."""
+
+    def test_nothing_is_parsed_up_front(self):
+        """Test instances and flows are parsed only when first accessed."""
+        plan = compile_plan_data(_plan_dict())
+
+        assert isinstance(plan, LazyCompiledPlan)
+        assert plan.instances_by_id == {}
+        assert plan.flows._flows == [None]
+
+        flow = plan.flows[0]
+        assert flow.name == "Flow 1"
+        assert plan.flows[0] is flow
+        assert plan.get_instance(20).keyword_name == "consume"
+        assert list(plan.instances_by_id) == [20]
+
+    def test_matches_eager_parsing(self):
+        """Test the lazy plan exposes the same structure as the eager one."""
+        lazy = compile_plan_data(_plan_dict())
+        eager = compile_execution_plan(
+            *execute_plan_from_json(json.dumps(_plan_dict()))
+        )
+
+        assert [i.id for i in lazy.keyword_instances] == [
+            i.id for i in eager.keyword_instances
+        ]
+        assert lazy.get_instance(99) is None
+        assert lazy.get_connection_index(lazy.flows[0]) == eager.get_connection_index(
+            eager.flows[0]
+        )
+        assert [f.id for f in lazy.flows] == [f.id for f in eager.flows]
+
+    def test_malformed_flow_becomes_invalid_flow(self):
+        """Test a flow that cannot be parsed is kept as a flow with an error."""
+        plan_data = _plan_dict()
+        plan_data["flows"].append(
+            {"id": 2, "name": "Broken", "steps": [{"id": 3, "instanceId": 10}]}
+        )
+        plan = compile_plan_data(plan_data)
+
+        broken = plan.flows[1]
+
+        assert plan.flows[0].error is None
+        assert (broken.id, broken.name, broken.steps) == (2, "Broken", [])
+        assert broken.error == "Invalid flow data: missing field 'sequenceOrder'"
+
+    def test_rejects_plan_without_sections(self):
+        """Test a dict missing instances or flows is rejected immediately."""
+        with pytest.raises(ValueError):
+            compile_plan_data({"flows": []})
+
+
+class TestSlottedModels:
+    """Test suite for the compact plan model classes."""
+
+    def test_models_have_no_instance_dict(self):
+        """Test plan models store attributes in slots."""
+        param = Param(1, "value", "input", "string", True, "x")
+        step = FlowStep(1, 10, 2)
+
+        assert not hasattr(param, "__dict__")
+        assert not hasattr(step, "__dict__")
+        with pytest.raises(AttributeError):
+            param.unknown = 1
+
+    def test_legacy_aliases_still_work(self):
+        """Test camelCase aliases read the slotted attributes."""
+        param = Param(1, "value", "input", "string", True, "x")
+        step = FlowStep(1, 10, 2)
+
+        assert param.isMandatory is True
+        assert step.instanceId == 10
+        assert step.sequenceOrder == 2
@@ -4,6 +4,7 @@ import pytest
 import json
 import threading
 import time
+from concurrent.futures import Future
 from unittest.mock import Mock, patch, MagicMock
 from keycase_agent.execution_manager import ExecutionManager
 from keycase_agent.models.execution_result import ExecutionResultData, FlowResult, StatusEnum
@@ -55,7 +56,8 @@ class TestExecutionManager:
 
         self.manager.stop()
 
-        mock_thread.join.assert_called_once_with(timeout=10)
+        mock_thread.join.assert_called_once()
+        assert 9 < mock_thread.join.call_args.kwargs['timeout'] <= 10
 
     @patch('keycase_agent.execution_manager.execute_plan_from_json')
     @patch('keycase_agent.execution_manager.set_context')
@@ -83,7 +85,7 @@ class TestExecutionManager:
         mock_clear_context.assert_called_once()
 
         # Verify status callback
-        self.update_status_callback.assert_called_with(False)
+        self.update_status_callback.assert_called_with(False, 100)
 
     def test_process_plan_handles_empty_plan(self):
         """Test processing handles empty execution plan by logging error."""
@@ -92,7 +94,7 @@ class TestExecutionManager:
         self.manager._process_plan(1, 100, "")
 
         # Verify status callback was still called (in finally block)
-        self.update_status_callback.assert_called_with(False)
+        self.update_status_callback.assert_called_with(False, 100)
 
     @patch('keycase_agent.decorators.keyword_registry')
     def test_execute_flow_success(self, mock_registry):
@@ -306,6 +308,149 @@ class TestExecutionManager:
         # Clean up
         self.manager.stop()
 
+    @patch('keycase_agent.execution_manager.execute_plan_from_json')
+    def test_process_plan_accepts_decoded_dict(self, mock_execute_plan):
+        """Test a plan dict is executed without a JSON round trip."""
+        plan = {
+            "keywordInstances": [],
+            "flows": [{"id": 1, "name": "skipped", "runMode": "skip", "steps": []}],
+        }
+
+        self.manager._process_plan(1, 100, plan)
+
+        mock_execute_plan.assert_not_called()
+        result = self.send_result_callback.call_args[0][2]
+        assert result["flowResults"][0]["status"] == "SKIPPED"
+
+    def test_process_plan_awaits_plan_future_after_hooks(self):
+        """Test a plan still being fetched is awaited after the before hooks."""
+        plan = {
+            "keywordInstances": [],
+            "flows": [{"id": 1, "name": "skipped", "runMode": "skip", "steps": []}],
+        }
+        plan_future = Future()
+
+        def resolve_plan():
+            plan_future.set_result(plan)
+
+        with patch('keycase_agent.execution_manager.before_run_hooks', [resolve_plan]):
+            self.manager._process_plan(1, 100, plan_future)
+
+        result = self.send_result_callback.call_args[0][2]
+        assert result["flowResults"][0]["status"] == "SKIPPED"
+
+    def test_hooks_run_on_the_keyword_call_thread(self):
+        """Test thread-local state set up by a before hook reaches keywords."""
+        from keycase_agent.decorators import keyword
+
+        local = threading.local()
+        seen = []
+
+        def open_session():
+            local.session = "session"
+
+        @keyword("test_hook_thread_local")
+        def use_session() -> None:
+            seen.append(getattr(local, "session", None))
+
+        def close_session():
+            seen.append(local.__dict__.pop("session", None))
+
+        plan = {
+            "keywordInstances": [{"id": 1, "keywordName": "test_hook_thread_local",
+                                  "keywordId": 1, "name": "use", "params": []}],
+            "flows": [{"id": 1, "name": "flow", "runMode": "default",
+                       "steps": [{"id": 1, "instanceId": 1, "sequenceOrder": 1}]}],
+        }
+        hooks = 'keycase_agent.execution_manager.%s_run_hooks'
+        with patch(hooks % 'before', [open_session]), \
+                patch(hooks % 'after', [close_session]):
+            self.manager._process_plan(1, 100, plan)
+
+        assert seen == ["session", "session"]
+
+    def test_malformed_plan_parts_fail_their_flow(self):
+        """Test lazily parsed flows and instances that are malformed fail alone."""
+        from keycase_agent.decorators import keyword
+
+        @keyword("test_lazy_plan_noop")
+        def noop() -> None:
+            pass
+
+        def flow(flow_id, instance_id):
+            return {"id": flow_id, "name": f"flow-{flow_id}", "runMode": "default",
+                    "steps": [{"id": flow_id, "instanceId": instance_id,
+                               "sequenceOrder": 1}]}
+
+        plan = {
+            "keywordInstances": [
+                {"id": 1, "keywordName": "test_lazy_plan_noop", "keywordId": 1,
+                 "name": "noop", "params": []},
+                {"id": 2, "keywordName": "test_lazy_plan_noop", "keywordId": 1,
+                 "name": "no params"},
+            ],
+            "flows": [flow(1, 1), flow(2, 2), {"id": 3, "name": "flow-3",
+                                               "steps": [{"id": 3}]}, flow(4, 1)],
+        }
+
+        self.manager._process_plan(1, 100, plan)
+
+        results = self.send_result_callback.call_args[0][2]["flowResults"]
+        assert [(r["id"], r["status"]) for r in results] == [
+            (1, "PASSED"), (2, "FAILED"), (3, "FAILED"), (4, "PASSED")
+        ]
+        assert results[1]["message"] == (
+            "Invalid keyword instance 2: missing field 'params'"
+        )
+        assert results[2]["message"] == "Invalid flow data: missing field 'instanceId'"
+
+    def test_stop_run_while_plan_is_fetched(self):
+        """Test a run waiting for its plan stops without sending a result."""
+        plan_future = Future()
+
+        thread = self.manager.start_execution(1, 100, plan_future)
+        self.manager.stop_run(100)
+
+        assert not thread.is_alive()
+        assert plan_future.cancelled()
+        self.send_result_callback.assert_not_called()
+        self.update_status_callback.assert_called_once_with(False, 100)
+
+    def test_stop_run_before_run_starts(self):
+        """Test a stop that arrives before its run starts is honoured."""
+        plan_future = Future()
+
+        self.manager.stop_run(100)
+        thread = self.manager.start_execution(1, 100, plan_future)
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert plan_future.cancelled()
+        self.send_result_callback.assert_not_called()
+        self.update_status_callback.assert_called_once_with(False, 100)
+        assert not self.manager._pending_stops
+
+    def test_flow_results_streamed_to_callback(self):
+        """Test flow results go to the callback and the result only counts them."""
+        streamed = []
+        manager = ExecutionManager(
+            send_result_callback=self.send_result_callback,
+            update_status_callback=self.update_status_callback,
+            flow_result_callback=lambda *args: streamed.append(args),
+        )
+        plan = {
+            "keywordInstances": [],
+            "flows": [{"id": 1, "name": "skipped", "runMode": "skip", "steps": []}],
+        }
+
+        manager._process_plan(1, 100, plan)
+
+        [(project_id, run_id, flow_result)] = streamed
+        assert (project_id, run_id, flow_result["status"]) == (1, 100, "SKIPPED")
+        result = self.send_result_callback.call_args[0][2]
+        assert result["flowResultCount"] == 1
+        assert "flowResults" not in result
+
     def test_create_skipped_flow_result(self):
         """Test creating a skipped flow result."""
         # Setup
@@ -354,3 +499,357 @@ class TestExecutionManager:
         flow_result = result_data['flowResults'][0]
         assert flow_result['status'] == 'SKIPPED'
         assert flow_result['name'] == 'skipped_flow'
+
+    def test_execute_flow_passes_connected_values(self):
+        """Test connected output values feed downstream inputs via the compiled plan."""
+        from keycase_agent.decorators import keyword
+        from keycase_agent.models.execute_plan import (
+            compile_execution_plan,
+            execute_plan_from_json,
+        )
+
+        received = {}
+
+        @keyword("test_compiled_produce")
+        def produce() -> dict:
+            return {"value": "from-producer"}
+
+        @keyword("test_compiled_consume")
+        def consume(value: str) -> None:
+            received["value"] = value
+
+        plan_json = json.dumps({
+            "keywordInstances": [
+                {"id": 10, "keywordName": "test_compiled_produce", "keywordId": 1,
+                 "name": "Produce", "params": [
+                     {"id": 100, "name": "value", "direction": "output",
+                      "type": "string", "isMandatory": False, "value": None}]},
+                {"id": 20, "keywordName": "test_compiled_consume", "keywordId": 2,
+                 "name": "Consume", "params": [
+                     {"id": 200, "name": "value", "direction": "input",
+                      "type": "string", "isMandatory": True, "value": "default"}]},
+            ],
+            "flows": [{
+                "id": 1, "name": "connected_flow",
+                "steps": [
+                    {"id": 1, "instanceId": 10, "sequenceOrder": 1},
+                    {"id": 2, "instanceId": 20, "sequenceOrder": 2},
+                ],
+                "connections": [
+                    {"id": 1, "fromStepId": 1, "toStepId": 2,
+                     "fromParamId": 100, "toParamId": 200},
+                ],
+            }],
+        })
+        plan = compile_execution_plan(*execute_plan_from_json(plan_json))
+
+        result = self.manager._execute_flow(100, plan.flows[0], plan, set())
+
+        assert result.status == StatusEnum.PASSED
+        assert received["value"] == "from-producer"
+
+    def test_execute_flow_does_not_inspect_signature_per_step(self):
+        """Test steps use the cached call descriptor instead of inspect.signature."""
+        from keycase_agent.decorators import get_call_descriptor, keyword
+        from keycase_agent.models.execute_plan import Flow, FlowStep, KeywordInstance
+
+        @keyword("test_cached_descriptor_keyword")
+        def noop() -> None:
+            return None
+
+        instance = KeywordInstance(1, "test_cached_descriptor_keyword", 1, "Noop", [])
+        flow = Flow(1, 1, "default", "repeat_flow",
+                    [FlowStep(i, 1, i) for i in range(1, 51)])
+        get_call_descriptor(noop)  # Built on first lookup
+
+        with patch('keycase_agent.decorators.inspect.signature') as mock_signature:
+            result = self.manager._execute_flow(100, flow, [instance], set())
+
+        assert result.status == StatusEnum.PASSED
+        mock_signature.assert_not_called()
+
+
+class TestParallelStepScheduler:
+    """Test suite for the DAG-based parallel step scheduler."""
+
+    def setup_method(self):
+        """Set up a manager running up to four steps concurrently."""
+        self.manager = ExecutionManager(mode="local", max_parallel_steps=4)
+
+    @staticmethod
+    def _plan(keyword_names, connections=()):
+        """Build a compiled single-flow plan with one step per keyword name.
+
+        Each instance has an input 'value' (param id 1000+i) and an output
+        'value' (param id 2000+i); step i+1 uses instance i+1.
+        """
+        from keycase_agent.models.execute_plan import (
+            Flow, FlowConnection, FlowStep, KeywordInstance, Param,
+            compile_execution_plan,
+        )
+
+        instances = []
+        steps = []
+        for i, name in enumerate(keyword_names, start=1):
+            instances.append(KeywordInstance(i, name, i, name, [
+                Param(1000 + i, "value", "input", "string", False, f"default-{i}"),
+                Param(2000 + i, "value", "output", "string", False, None),
+            ]))
+            steps.append(FlowStep(i, i, i))
+        flow_connections = [
+            FlowConnection(n, src, dst, 2000 + src, 1000 + dst)
+            for n, (src, dst) in enumerate(connections, start=1)
+        ]
+        flow = Flow(1, 1, "default", "parallel_flow", steps, flow_connections)
+        return compile_execution_plan(instances, [flow]), flow
+
+    def test_independent_steps_run_concurrently(self):
+        """Test steps without connections overlap in time."""
+        from keycase_agent.decorators import keyword
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        @keyword("test_parallel_wait")
+        def wait_for_peers(value: str) -> dict:
+            barrier.wait()  # Only returns if all three steps run at once
+            return {"value": value}
+
+        plan, flow = self._plan(["test_parallel_wait"] * 3)
+        executed_steps = set()
+
+        result = self.manager._execute_flow(1, flow, plan, executed_steps)
+
+        assert result.status == StatusEnum.PASSED
+        assert executed_steps == {(1, 1), (1, 2), (1, 3)}
+
+    def test_connected_steps_wait_for_upstream(self):
+        """Test a step consuming another step's output runs after it."""
+        from keycase_agent.decorators import keyword
+
+        calls = []
+
+        @keyword("test_parallel_slow_source")
+        def slow_source(value: str) -> dict:
+            time.sleep(0.05)
+            calls.append("source")
+            return {"value": "from-source"}
+
+        @keyword("test_parallel_sink")
+        def sink(value: str) -> dict:
+            calls.append(f"sink:{value}")
+            return {"value": value}
+
+        plan, flow = self._plan(
+            ["test_parallel_slow_source", "test_parallel_sink"], connections=[(1, 2)]
+        )
+
+        result = self.manager._execute_flow(1, flow, plan, set())
+
+        assert result.status == StatusEnum.PASSED
+        assert calls == ["source", "sink:from-source"]
+
+    def test_failure_reports_lowest_sequence_and_skips_dependents(self):
+        """Test failures keep failedOnStepId semantics and stop new steps."""
+        from keycase_agent.decorators import keyword
+
+        ran = []
+
+        @keyword("test_parallel_fail")
+        def fail(value: str) -> dict:
+            raise RuntimeError(f"boom {value}")
+
+        @keyword("test_parallel_record")
+        def record(value: str) -> dict:
+            ran.append(value)
+            return {"value": value}
+
+        plan, flow = self._plan(
+            ["test_parallel_fail", "test_parallel_record"], connections=[(1, 2)]
+        )
+        executed_steps = set()
+
+        result = self.manager._execute_flow(1, flow, plan, executed_steps)
+
+        assert result.status == StatusEnum.FAILED
+        assert result.failedOnStepId == 1
+        assert result.message == "boom default-1"
+        assert ran == []
+        assert executed_steps == {(1, 1)}
+
+
+class TestParallelFlows:
+    """Test suite for concurrent flow execution within a run."""
+
+    @staticmethod
+    def _plan(flow_specs):
+        """Build a plan dict with one single-step flow per (keyword, run mode)."""
+        instances = []
+        flows = []
+        for i, (keyword_name, run_mode) in enumerate(flow_specs, start=1):
+            instances.append({"id": i, "keywordName": keyword_name, "keywordId": i,
+                              "name": keyword_name, "params": []})
+            flows.append({"id": i, "name": f"flow-{i}", "runMode": run_mode,
+                          "steps": [{"id": i, "instanceId": i, "sequenceOrder": 1}]})
+        return {"keywordInstances": instances, "flows": flows}
+
+    def test_independent_flows_run_concurrently_in_plan_order(self):
+        """Test default flows overlap and results keep plan order."""
+        from keycase_agent.decorators import keyword
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        @keyword("test_parallel_flow_wait")
+        def wait_for_peers() -> None:
+            barrier.wait()
+
+        manager = ExecutionManager(mode="local", max_parallel_flows=3)
+        results = manager.execute_local(
+            self._plan([("test_parallel_flow_wait", "default")] * 3), run_id="r1"
+        )
+
+        flow_results = results["result"]["flowResults"]
+        assert [r["id"] for r in flow_results] == [1, 2, 3]
+        assert all(r["status"] == "PASSED" for r in flow_results)
+
+    def test_abort_on_failure_is_a_barrier(self):
+        """Test flows after a failed AbortOnFailure flow never start."""
+        from keycase_agent.decorators import keyword
+
+        events = []
+
+        @keyword("test_parallel_flow_slow")
+        def slow() -> None:
+            time.sleep(0.05)
+            events.append("slow")
+
+        @keyword("test_parallel_flow_fail")
+        def fail() -> None:
+            events.append("fail")
+            raise RuntimeError("abort")
+
+        @keyword("test_parallel_flow_after")
+        def after() -> None:
+            events.append("after")
+
+        manager = ExecutionManager(mode="local", max_parallel_flows=4)
+        results = manager.execute_local(self._plan([
+            ("test_parallel_flow_slow", "default"),
+            ("test_parallel_flow_fail", "abortOnFailure"),
+            ("test_parallel_flow_after", "default"),
+        ]), run_id="r2")
+
+        assert events == ["slow", "fail"]
+        statuses = [(r["id"], r["status"]) for r in results["result"]["flowResults"]]
+        assert statuses == [(1, "PASSED"), (2, "FAILED"), (3, "ABORTED")]
+
+    def test_keyword_call_threads_released_after_run(self):
+        """Test parallel flow and step workers close their keyword call threads."""
+        from keycase_agent.decorators import keyword
+
+        @keyword("test_parallel_flow_noop")
+        def noop() -> None:
+            pass
+
+        instances = [{"id": 1, "keywordName": "test_parallel_flow_noop",
+                      "keywordId": 1, "name": "noop", "params": []}]
+        flows = [{"id": f, "name": f"flow-{f}", "runMode": "default",
+                  "steps": [{"id": s, "instanceId": 1, "sequenceOrder": s}
+                            for s in range(1, 5)]}
+                 for f in range(1, 5)]
+        manager = ExecutionManager(
+            mode="local", max_parallel_flows=4, max_parallel_steps=4
+        )
+        existing = set(threading.enumerate())
+        manager.execute_local(
+            {"keywordInstances": instances, "flows": flows}, run_id="r3"
+        )
+
+        def call_threads():
+            return [t for t in threading.enumerate()
+                    if t.name.startswith("KeywordCall") and t not in existing]
+
+        deadline = time.time() + 2
+        while call_threads() and time.time() < deadline:
+            time.sleep(0.01)
+        assert call_threads() == []
+
+
+class TestConcurrentRuns:
+    """Test suite for running several runs on one manager."""
+
+    def test_stop_run_only_stops_that_run(self):
+        """Test each run has its own thread and stop event."""
+        from keycase_agent.decorators import keyword
+
+        started = threading.Semaphore(0)
+
+        @keyword("test_concurrent_run_loop")
+        def loop() -> None:
+            started.release()
+            time.sleep(0.05)
+
+        plan = json.dumps({
+            "keywordInstances": [
+                {"id": i, "keywordName": "test_concurrent_run_loop",
+                 "keywordId": 1, "name": "Loop", "params": []} for i in range(1, 11)
+            ],
+            "flows": [{"id": 1, "name": "loop", "steps": [
+                {"id": i, "instanceId": i, "sequenceOrder": i} for i in range(1, 11)
+            ]}],
+        })
+        manager = ExecutionManager(mode="local")
+
+        thread_a = manager.start_execution("p", "run-a", plan)
+        thread_b = manager.start_execution("p", "run-b", plan)
+        started.acquire(timeout=5)
+        started.acquire(timeout=5)
+
+        assert thread_a is not thread_b
+        assert manager.is_running("run-a") and manager.is_running("run-b")
+
+        manager.stop_run("run-a")
+        thread_b.join(timeout=5)
+
+        result_a = manager.local_results["run-a"]["result"]["flowResults"]
+        result_b = manager.local_results["run-b"]["result"]["flowResults"]
+        assert any(r["status"] == "ABORTED" for r in result_a)
+        assert [r["status"] for r in result_b] == ["PASSED"]
+        assert manager.active_run_ids() == []
+
+    def test_stop_run_without_waiting(self):
+        """Test stop_run(wait=False) signals the run and returns at once."""
+        from keycase_agent.execution_manager import RunHandle
+
+        manager = ExecutionManager(mode="local")
+        thread = Mock()
+        thread.is_alive.return_value = True
+        handle = RunHandle("run-a", thread, threading.Event())
+        manager._runs["run-a"] = handle
+
+        manager.stop_run("run-a", wait=False)
+
+        assert handle.stop_event.is_set()
+        thread.join.assert_not_called()
+
+    def test_stop_waits_for_all_runs_against_one_deadline(self):
+        """Test stop() shares its timeout between runs instead of per run."""
+        from keycase_agent.execution_manager import RunHandle
+
+        joins = []
+
+        def join(timeout):
+            joins.append(timeout)
+            time.sleep(timeout)
+
+        manager = ExecutionManager(mode="local")
+        for run_id in ("run-a", "run-b"):
+            thread = Mock(join=join)
+            thread.is_alive.return_value = True
+            manager._runs[run_id] = RunHandle(run_id, thread, threading.Event())
+
+        started = time.monotonic()
+        manager.stop(timeout=0.2)
+
+        assert time.monotonic() - started < 0.35
+        assert joins[0] <= 0.2
+        assert joins[1] < 0.05
@@ -0,0 +1,59 @@
+"""Tests for the pooled HTTP client."""
+
+from unittest.mock import Mock, patch
+
+from keycase_agent.utils.auth_helper import auth_request_with_details
+from keycase_agent.utils.http_client import HttpClient
+
+
+class TestHttpClient:
+    """Test suite for HttpClient."""
+
+    def test_session_reused_across_requests(self):
+        """Test every request goes through one pooled session."""
+        client = HttpClient(pool_size=4, timeout=7)
+
+        with patch('requests.Session.request') as mock_request:
+            client.get('http://test.com/a')
+            client.post('http://test.com/b', json={'x': 1})
+
+        assert mock_request.call_count == 2
+        session = client._get_session()
+        adapter = session.get_adapter('https://test.com')
+        assert adapter._pool_maxsize == 4
+        assert session.get_adapter('http://test.com') is adapter
+
+    def test_default_and_per_call_timeout(self):
+        """Test requests use the client timeout unless the call passes one."""
+        client = HttpClient(timeout=(1.0, 2.0))
+
+        with patch('requests.Session.request') as mock_request:
+            client.get('http://test.com')
+            client.get('http://test.com', timeout=9)
+
+        timeouts = [call.kwargs['timeout'] for call in mock_request.call_args_list]
+        assert timeouts == [(1.0, 2.0), 9]
+
+    def test_close_discards_session(self):
+        """Test close() drops the session and a later request opens a new one."""
+        client = HttpClient()
+        session = client._get_session()
+
+        client.close()
+
+        assert client._get_session() is not session
+
+    def test_auth_request_uses_given_client(self):
+        """Test the auth helpers send through the client they are given."""
+        client = Mock()
+        client.request.return_value = Mock(
+            status_code=200, content=b'{}', headers={'Content-Type': 'application/json'}
+        )
+        client.request.return_value.json.return_value = {'ok': True}
+
+        response = auth_request_with_details(
+            'POST', 'http://test.com', 'token', data={}, http_client=client
+        )
+
+        assert response.success
+        assert client.request.call_args.kwargs['timeout'] is None
@@ -0,0 +1,106 @@
+"""Tests for the inbound message dispatcher."""
+
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+from keycase_agent.inbound_dispatcher import InboundDispatcher
+from keycase_agent.models.websocket_event_types import WebSocketEventType
+
+
+def message(event_type, run_id=100):
+    """Encode a message of the given type."""
+    return json.dumps({'event': event_type.value, 'payload': {'runId': run_id}})
+
+
+class TestInboundDispatcher:
+    """Test suite for InboundDispatcher."""
+
+    def setup_method(self):
+        """Create a dispatcher whose execute commands block until released."""
+        self.release = threading.Event()
+        self.handled = []
+        self.handled_stop = threading.Event()
+        self.on_overflow = Mock()
+        self.dispatcher = InboundDispatcher(
+            handle_event=self._handle_event,
+            on_overflow=self.on_overflow,
+            max_messages=2,
+        )
+
+    def teardown_method(self):
+        """Release blocked handlers and stop the dispatcher."""
+        self.release.set()
+        self.dispatcher.stop()
+
+    def _handle_event(self, data):
+        event_type = data['event']
+        if event_type == WebSocketEventType.AGENT_EXECUTE_PLAN_COMMAND.value:
+            self.release.wait(5)
+        self.handled.append((event_type, threading.current_thread().name))
+        if event_type == WebSocketEventType.AGENT_STOP_EXECUTION_COMMAND.value:
+            self.handled_stop.set()
+
+    def test_control_lane_not_blocked_by_commands(self):
+        """Test a stop command is handled while an execute command blocks."""
+        self.dispatcher.start()
+
+        self.dispatcher.dispatch(message(WebSocketEventType.AGENT_EXECUTE_PLAN_COMMAND))
+        self.dispatcher.dispatch(
+            message(WebSocketEventType.AGENT_STOP_EXECUTION_COMMAND)
+        )
+
+        assert self.handled_stop.wait(5)
+        assert self.handled == [
+            (WebSocketEventType.AGENT_STOP_EXECUTION_COMMAND.value, 'InboundControl')
+        ]
+
+    def test_auth_responses_handled_inline(self):
+        """Test authentication responses are handled on the receive thread."""
+        self.dispatcher.dispatch(message(WebSocketEventType.AUTH_SUCCESS_RESPONSE))
+
+        assert self.handled == [
+            (
+                WebSocketEventType.AUTH_SUCCESS_RESPONSE.value,
+                threading.current_thread().name,
+            )
+        ]
+
+    def test_full_lane_rejects_message(self):
+        """Test messages beyond the lane bound go to on_overflow."""
+        execute = message(WebSocketEventType.AGENT_EXECUTE_PLAN_COMMAND)
+        for _ in range(3):
+            self.dispatcher.dispatch(execute)
+
+        assert self.dispatcher.queued_message_count() == 2
+        assert self.dispatcher.dropped_message_count() == 1
+        self.on_overflow.assert_called_once_with(json.loads(execute))
+
+    def test_undecodable_message_ignored(self):
+        """Test invalid JSON is dropped without reaching a handler."""
+        self.dispatcher.dispatch('not json')
+        self.dispatcher.dispatch('[1, 2]')
+
+        assert self.dispatcher.queued_message_count() == 0
+        assert self.handled == []
+
+    def test_stop_discards_queued_messages(self):
+        """Test stopping does not handle messages still waiting."""
+        self.dispatcher.start()
+        self.dispatcher.dispatch(message(WebSocketEventType.AGENT_EXECUTE_PLAN_COMMAND))
+        self.dispatcher.dispatch(
+            message(WebSocketEventType.AGENT_EXECUTE_PLAN_COMMAND, 101)
+        )
+
+        # The first command is still being handled when the lane stops
+        self.dispatcher.stop(timeout=0.1)
+        self.release.set()
+        deadline = time.monotonic() + 5
+        while not self.handled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+        assert self.handled == [
+            (WebSocketEventType.AGENT_EXECUTE_PLAN_COMMAND.value, 'InboundCommands')
+        ]
@@ -0,0 +1,77 @@
+"""Tests for the pluggable JSON codec."""
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from keycase_agent.utils import json_codec
+
+
+def installed_backends():
+    """Get the backends that can be loaded here."""
+    names = []
+    for name in json_codec.BACKENDS:
+        try:
+            json_codec._load_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+@pytest.fixture(params=installed_backends())
+def backend(request):
+    """Switch to each installed backend in turn."""
+    original = json_codec.backend_name()
+    json_codec.use_backend(request.param)
+    yield request.param
+    json_codec.use_backend(original)
+
+
+class TestJsonCodec:
+    """Test suite for json_codec, run against every installed backend."""
+
+    def test_round_trip(self, backend):
+        """Test values survive encoding and decoding."""
+        value = {'runId': 1, 'flows': [{'name': 'Login/Logout', 'ok': True}], 'x': None}
+
+        assert json_codec.loads(json_codec.dumps(value)) == value
+
+    def test_loads_bytes(self, backend):
+        """Test UTF-8 bytes are decoded like text."""
+        assert json_codec.loads(b'{"name": "caf\xc3\xa9"}') == {'name': 'café'}
+
+    def test_dates_encoded_as_iso_8601(self, backend):
+        """Test datetimes and dates are encoded like isoformat()."""
+        run_at = datetime(2025, 8, 16, 11, 5, 28, 366248, tzinfo=timezone.utc)
+
+        encoded = json_codec.dumps({'runAt': run_at, 'day': date(2025, 8, 16)})
+
+        assert json_codec.loads(encoded) == {
+            'runAt': '2025-08-16T11:05:28.366248+00:00',
+            'day': '2025-08-16',
+        }
+
+    def test_default_hook(self, backend):
+        """Test unknown objects go through default, or raise TypeError."""
+        class Token:
+            pass
+
+        assert json_codec.dumps([Token()], default=lambda obj: 'token') == '["token"]'
+        with pytest.raises(TypeError):
+            json_codec.dumps([Token()])
+
+    def test_indent(self, backend):
+        """Test indented output spans several lines."""
+        assert '\n' in json_codec.dumps({'a': [1, 2]}, indent=True)
+
+    def test_invalid_json_raises_value_error(self, backend):
+        """Test decoding errors are ValueErrors for every backend."""
+        with pytest.raises(ValueError):
+            json_codec.loads('{not json')
+
+
+def test_unknown_backend_rejected():
+    """Test only known backends can be selected."""
+    with pytest.raises(ValueError):
+        json_codec.use_backend('simplejson')
@@ -0,0 +1,121 @@
+"""Tests for lazily formatted execution log values."""
+
+import logging
+
+import pytest
+
+from keycase_agent.decorators import keyword
+from keycase_agent.execution_manager import ExecutionManager
+from keycase_agent.models.execute_plan import (
+    Flow,
+    FlowConnection,
+    FlowStep,
+    KeywordInstance,
+    Param,
+    compile_execution_plan,
+)
+from keycase_agent.utils.log_values import LogValue, format_log_value
+
+
+class CountingValue:
+    """Value that records how often it is converted to a string."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "counted"
+
+
+class TestLogValue:
+    """Test suite for LogValue and format_log_value."""
+
+    def test_long_values_are_truncated(self):
+        """Test strings and containers are cut to the maximum length."""
+        text = format_log_value("x" * 1000, max_length=10)
+        assert text == "xxxxxxxxxx... (truncated)"
+
+        payload = format_log_value({"body": "y" * 10_000}, max_length=50)
+        assert len(payload) <= 50 + len("... (truncated)")
+
+    def test_short_and_untruncated_values_are_unchanged(self):
+        """Test short values and max_length=None keep the full text."""
+        assert format_log_value({"a": 1}) == "{'a': 1}"
+        assert format_log_value("z" * 500, max_length=None) == "z" * 500
+
+    def test_value_is_formatted_only_when_logged(self, caplog):
+        """Test a filtered-out record never formats its value."""
+        value = CountingValue()
+        logger = logging.getLogger("test_log_values")
+
+        with caplog.at_level(logging.WARNING, logger="test_log_values"):
+            logger.info("value: %s", LogValue(value))
+        assert value.formatted == 0
+
+        with caplog.at_level(logging.INFO, logger="test_log_values"):
+            logger.info("value: %s", LogValue(value))
+        assert value.formatted >= 1
+        assert "value: counted" in caplog.text
+
+
+class TestExecutionLogVerbosity:
+    """Test suite for ExecutionManager log verbosity."""
+
+    @staticmethod
+    def _flow():
+        instance = KeywordInstance(1, "test_log_echo", 1, "echo", [
+            Param(1, "value", "input", "string", True, "secret-" + "v" * 500),
+            Param(2, "result", "output", "string", False, None),
+        ])
+        return [instance], Flow(1, 1, "default", "log_flow", [FlowStep(1, 1, 1)])
+
+    @pytest.fixture(autouse=True)
+    def register_keyword(self):
+        @keyword("test_log_echo")
+        def echo(value: str) -> dict:
+            return {"result": value}
+
+    @pytest.mark.parametrize("verbosity, logged, truncated", [
+        ("off", False, False),
+        ("summary", True, True),
+        ("full", True, False),
+    ])
+    def test_verbosity_controls_value_logging(
+        self, caplog, verbosity, logged, truncated
+    ):
+        """Test values are omitted, truncated or logged in full."""
+        manager = ExecutionManager(mode="local", execution_log_verbosity=verbosity)
+        instances, flow = self._flow()
+
+        with caplog.at_level(logging.INFO, logger="keycase_agent.execution_manager"):
+            manager._execute_flow(1, flow, instances, set())
+        manager.shutdown()
+
+        assert "Executing step test_log_echo" in caplog.text
+        assert ("secret-" in caplog.text) == logged
+        assert ("(truncated)" in caplog.text) == truncated
+
+    def test_connected_value_formatted_only_at_debug(self, caplog):
+        """Test a connected input value is not formatted unless DEBUG is on."""
+        manager = ExecutionManager(mode="local")
+        flow = Flow(1, 1, "default", "connected",
+                    [FlowStep(1, 1, 1), FlowStep(2, 1, 2)],
+                    [FlowConnection(1, 1, 2, 12, 21)])
+        plan = compile_execution_plan([], [flow])
+        value = CountingValue()
+        outputs = {1: {12: value}}
+
+        with caplog.at_level(logging.INFO, logger="keycase_agent.execution_manager"):
+            assert manager._get_connected_value(plan, flow, 2, 21, outputs) is value
+        assert value.formatted == 0
+
+        with caplog.at_level(logging.DEBUG, logger="keycase_agent.execution_manager"):
+            manager._get_connected_value(plan, flow, 2, 21, outputs)
+        assert value.formatted >= 1
+        manager.shutdown()
+
+    def test_unknown_verbosity_is_rejected(self):
+        """Test an unknown verbosity raises ValueError."""
+        with pytest.raises(ValueError):
+            ExecutionManager(mode="local", execution_log_verbosity="loud")
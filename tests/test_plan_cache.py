@@ -0,0 +1,143 @@
+"""Tests for the execution plan cache."""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from keycase_agent.plan_cache import PlanCache, plan_cache_key
+
+
+def make_plan(name='Login', run_id=1):
+    """Build a minimal execution plan."""
+    return {
+        'runId': run_id,
+        'keywordInstances': [],
+        'flows': [{'id': 1, 'name': name, 'steps': []}],
+    }
+
+
+class TestPlanCache:
+    """Test suite for PlanCache."""
+
+    def setup_method(self):
+        """Create a temporary directory for the on-disk store."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_put_reuses_compiled_plan(self):
+        """Test a plan sent again with the same ETag is compiled once."""
+        cache = PlanCache()
+
+        first = cache.put(make_plan(run_id=1), '"v1"')
+        second = cache.put(make_plan(run_id=2), '"v1"')
+
+        assert second.compiled is first.compiled
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    def test_put_rejects_invalid_plan(self):
+        """Test a plan that cannot be compiled raises ValueError."""
+        cache = PlanCache()
+
+        with pytest.raises(ValueError):
+            cache.put({'runId': 1}, '"v1"')
+
+    def test_least_recently_used_evicted(self):
+        """Test the cache keeps at most max_entries plans."""
+        cache = PlanCache(max_entries=2)
+        cache.put(make_plan('A'), '"a"')
+        cache.put(make_plan('B'), '"b"')
+        cache.get_by_etag('"a"')
+        cache.put(make_plan('C'), '"c"')
+
+        assert cache.get_by_etag('"a"') is not None
+        assert cache.get_by_etag('"b"') is None
+
+    def test_bounded_by_approximate_size(self):
+        """Test plans are evicted once their total size exceeds max_bytes."""
+        cache = PlanCache(max_bytes=1000)
+        cache.put(make_plan('A'), '"a"', size=600)
+        cache.put(make_plan('B'), '"b"', size=300)
+        cache.put(make_plan('C'), '"c"', size=300)
+
+        assert cache.known_etags() == ['"c"', '"b"']
+        assert cache.size_bytes() == 600
+
+    def test_size_measured_when_not_given(self):
+        """Test a plan's size defaults to the length of its JSON."""
+        cache = PlanCache()
+
+        entry = cache.put(make_plan(), '"v1"')
+
+        assert 0 < entry.size == cache.size_bytes()
+
+    def test_get_by_etag(self):
+        """Test plans are found by the ETag they were sent with."""
+        cache = PlanCache()
+        entry = cache.put(make_plan(), etag='"v1"')
+
+        assert cache.get_by_etag('"v1"') is entry
+        assert cache.get_by_etag('"v2"') is None
+        assert cache.get_by_etag(None) is None
+
+    def test_known_etags_newest_first(self):
+        """Test ETags are listed newest first and limited."""
+        cache = PlanCache()
+        cache.put(make_plan('A'), etag='"a"')
+        cache.put(make_plan('B'), etag='"b"')
+        cache.put(make_plan('C'), etag='"c"')
+        cache.get_by_etag('"a"')
+
+        assert cache.known_etags() == ['"a"', '"c"', '"b"']
+        assert cache.known_etags(limit=1) == ['"a"']
+
+    def test_disk_store_survives_restart(self):
+        """Test plans written to the directory are found by a new cache."""
+        directory = os.path.join(self.test_dir, 'plans')
+        entry = PlanCache(directory=directory).put(make_plan(), etag='"v1"')
+
+        cache = PlanCache(directory=directory)
+        assert cache.known_etags() == ['"v1"']
+        restored = cache.get_by_etag('"v1"')
+
+        assert restored is not None
+        assert restored.key == entry.key
+        assert restored.compiled.flows[0].name == 'Login'
+
+    def test_disk_store_pruned_to_bounds(self):
+        """Test the directory keeps only the most recently used plans."""
+        cache = PlanCache(max_entries=2, directory=self.test_dir)
+        cache.put(make_plan('A'), '"a"')
+        cache.put(make_plan('B'), '"b"')
+        cache.put(make_plan('C'), '"c"')
+
+        files = sorted(os.listdir(self.test_dir))
+        assert len(files) == 4
+        assert 'plan-%s.json' % plan_cache_key('"a"') not in files
+        restarted = PlanCache(directory=self.test_dir)
+        assert sorted(restarted.known_etags()) == ['"b"', '"c"']
+
+    def test_plan_without_etag_file_removed(self):
+        """Test a stored plan whose ETag is unknown is removed at startup."""
+        path = os.path.join(self.test_dir, 'plan-0123.json')
+        with open(path, 'w') as f:
+            f.write('{}')
+
+        cache = PlanCache(directory=self.test_dir)
+
+        assert cache.known_etags() == []
+        assert not os.path.exists(path)
+
+    def test_unreadable_cached_plan_ignored(self):
+        """Test a corrupt file in the store is treated as a miss."""
+        cache = PlanCache(directory=self.test_dir)
+        key = plan_cache_key('"v1"')
+        with open(os.path.join(self.test_dir, f'plan-{key}.json'), 'w') as f:
+            f.write('{not json')
+
+        assert cache.get_by_etag('"v1"') is None
@@ -0,0 +1,134 @@
+"""Tests for the process pool keyword backend."""
+
+import os
+import time
+
+from keycase_agent.decorators import get_call_descriptor, keyword
+from keycase_agent.execution_manager import ExecutionManager
+from keycase_agent.models.execute_plan import (
+    Flow,
+    FlowConnection,
+    FlowStep,
+    KeywordInstance,
+    Param,
+    compile_execution_plan,
+)
+from keycase_agent.models.execution_result import StatusEnum
+from keycase_agent.process_pool import KeywordProcessPool
+
+
+# Process keywords must be defined at module level so workers can import them
+@keyword("test_process_square", run_in_process=True)
+def square(value: str) -> dict:
+    return {"result": str(int(value) ** 2), "pid": os.getpid()}
+
+
+@keyword("test_process_fail", run_in_process=True)
+def fail(value: str) -> None:
+    raise ValueError(f"bad value {value}")
+
+
+@keyword("test_process_hang", run_in_process=True)
+def hang(value: str) -> None:
+    time.sleep(60)
+
+
+@keyword("test_process_echo")
+def echo(value: str) -> dict:
+    return {"result": value}
+
+
+class TestKeywordProcessPool:
+    """Test suite for KeywordProcessPool."""
+
+    def setup_method(self):
+        """Set up a small pool."""
+        self.pool = KeywordProcessPool(max_workers=1)
+
+    def teardown_method(self):
+        """Stop worker processes."""
+        self.pool.shutdown()
+
+    def test_descriptor_flag(self):
+        """Test run_in_process is recorded on the call descriptor."""
+        assert get_call_descriptor(square).run_in_process
+        assert not get_call_descriptor(echo).run_in_process
+
+    def test_call_runs_in_worker_process(self):
+        """Test keyword calls execute in another process and return results."""
+        future = self.pool.submit(square, "test_process_square", {"value": "7"})
+        result = future.result(timeout=30)
+
+        assert result["result"] == "49"
+        assert result["pid"] != os.getpid()
+
+    def test_abandoned_call_replaces_workers(self):
+        """Test a hung call given up does not keep the only worker busy."""
+        hung = self.pool.submit(hang, "test_process_hang", {"value": "1"})
+        while not hung.running():
+            time.sleep(0.01)
+        processes = list(self.pool._executor._processes.values())
+
+        self.pool.abandon(hung)
+        future = self.pool.submit(square, "test_process_square", {"value": "3"})
+
+        assert future.result(timeout=30)["result"] == "9"
+        deadline = time.monotonic() + 10
+        while any(p.is_alive() for p in processes) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not any(p.is_alive() for p in processes)
+
+    def test_pool_starts_lazily(self):
+        """Test no worker process is started before the first call."""
+        assert self.pool._executor is None
+
+
+class TestProcessKeywordExecution:
+    """Test suite for process keywords inside flows."""
+
+    def setup_method(self):
+        """Set up a manager with one worker process."""
+        self.manager = ExecutionManager(mode="local", max_process_workers=1)
+
+    def teardown_method(self):
+        """Stop worker processes."""
+        self.manager.shutdown()
+
+    def _flow(self, first_keyword):
+        instances = [
+            KeywordInstance(1, first_keyword, 1, "first", [
+                Param(11, "value", "input", "string", True, "6"),
+                Param(12, "result", "output", "string", False, None),
+            ]),
+            KeywordInstance(2, "test_process_echo", 2, "second", [
+                Param(21, "value", "input", "string", True, "default"),
+                Param(22, "result", "output", "string", False, None),
+            ]),
+        ]
+        flow = Flow(1, 1, "default", "process_flow",
+                    [FlowStep(1, 1, 1), FlowStep(2, 2, 2)],
+                    [FlowConnection(1, 1, 2, 12, 21)])
+        return compile_execution_plan(instances, [flow]), flow
+
+    def test_process_output_feeds_connections(self):
+        """Test outputs from a process keyword flow into the next step."""
+        plan, flow = self._flow("test_process_square")
+        step_outputs = {}
+
+        error = self.manager._execute_step(1, flow, flow.steps[0], plan, step_outputs)
+        assert error is None
+        error = self.manager._execute_step(1, flow, flow.steps[1], plan, step_outputs)
+        assert error is None
+
+        assert step_outputs[1][12] == "36"
+        assert step_outputs[2][22] == "36"
+
+    def test_process_exception_fails_step(self):
+        """Test exceptions raised in the worker fail the step with their message."""
+        plan, flow = self._flow("test_process_fail")
+
+        result = self.manager._execute_flow(1, flow, plan, set())
+
+        assert result.status == StatusEnum.FAILED
+        assert result.failedOnStepId == 1
+        assert result.message == "bad value 6"
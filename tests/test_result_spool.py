@@ -0,0 +1,195 @@
+"""Tests for the durable result spool and its replayer."""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from keycase_agent.exceptions import ResultRejectedError
+from keycase_agent.result_spool import ResultSpool, SpoolReplayer
+
+
+class TestResultSpool:
+    """Test suite for ResultSpool."""
+
+    def setup_method(self):
+        """Create a spool in a temporary directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, 'spool', 'results.db')
+        self.spool = ResultSpool(self.path)
+
+    def teardown_method(self):
+        """Close the spool and remove its directory."""
+        self.spool.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_no_file_until_first_append(self):
+        """Test reading an unused spool does not create the database."""
+        assert self.spool.peek() == []
+        assert self.spool.count() == 0
+        assert not os.path.exists(self.path)
+
+    def test_entries_kept_in_order_and_removed(self):
+        """Test results are returned oldest first and removed by ID."""
+        first = self.spool.append(1, 10, {'status': 'PASSED'}, 'timeout')
+        self.spool.append(1, 11, {'status': 'FAILED'}, 'timeout')
+
+        assert [e.run_id for e in self.spool.peek()] == [10, 11]
+
+        self.spool.remove(first)
+        self.spool.record_attempt(self.spool.peek()[0].id)
+
+        [entry] = self.spool.peek()
+        assert entry.run_id == 11
+        assert entry.result == {'status': 'FAILED'}
+        assert entry.attempts == 1
+
+    def test_entries_survive_reopen(self):
+        """Test spooled results are still there after a restart."""
+        self.spool.append(1, 10, {'status': 'PASSED'}, 'timeout')
+        self.spool.close()
+
+        reopened = ResultSpool(self.path)
+        try:
+            assert [e.run_id for e in reopened.peek()] == [10]
+        finally:
+            reopened.close()
+
+    @pytest.mark.parametrize('policy, synchronous', [
+        ('always', 2), ('normal', 1), ('off', 0),
+    ])
+    def test_fsync_policy(self, policy, synchronous):
+        """Test the fsync policy sets SQLite's synchronous mode."""
+        spool = ResultSpool(self.path, fsync_policy=policy)
+        spool.append(1, 10, {}, 'timeout')
+
+        assert spool._conn.execute('PRAGMA synchronous').fetchone()[0] == synchronous
+        spool.close()
+
+    def test_unknown_fsync_policy_rejected(self):
+        """Test an unknown fsync policy is rejected."""
+        with pytest.raises(ValueError, match='fsync_policy'):
+            ResultSpool(self.path, fsync_policy='sometimes')
+
+    def test_import_legacy_files(self):
+        """Test result files from earlier versions are moved into the spool."""
+        legacy_dir = os.path.join(self.test_dir, 'failed_results')
+        os.makedirs(legacy_dir)
+        saved = {'metadata': {'project_id': 1, 'run_id': 10, 'reason': 'timeout'},
+                 'result': {'status': 'PASSED'}}
+        legacy_file = os.path.join(legacy_dir, 'result_p1_r10_20250101_000000.json')
+        with open(legacy_file, 'w') as f:
+            json.dump(saved, f)
+        with open(os.path.join(legacy_dir, 'failed_results_summary.json'), 'w') as f:
+            json.dump({'failed_results': []}, f)
+
+        assert self.spool.import_legacy_files(legacy_dir) == 1
+
+        [entry] = self.spool.peek()
+        assert (entry.run_id, entry.reason) == (10, 'timeout')
+        assert os.listdir(legacy_dir) == []
+
+    def test_kind_kept_and_added_to_old_spools(self):
+        """Test entries keep their upload kind, also in spools without one."""
+        os.makedirs(os.path.dirname(self.path))
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE results (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "project_id INTEGER NOT NULL, run_id INTEGER NOT NULL, reason TEXT, "
+            "spooled_at TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "result TEXT NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO results (project_id, run_id, spooled_at, result) "
+            "VALUES (1, 10, 'now', '{}')"
+        )
+        conn.commit()
+        conn.close()
+
+        self.spool.append(1, 11, {'sequence': 0}, 'timeout', kind='flow_results')
+
+        assert [e.kind for e in self.spool.peek()] == ['result', 'flow_results']
+
+
+class TestSpoolReplayer:
+    """Test suite for SpoolReplayer."""
+
+    def setup_method(self):
+        """Create a spool with two results."""
+        self.test_dir = tempfile.mkdtemp()
+        self.spool = ResultSpool(os.path.join(self.test_dir, 'results.db'))
+        self.spool.append(1, 10, {'n': 1}, 'timeout')
+        self.spool.append(1, 11, {'n': 2}, 'timeout')
+
+    def teardown_method(self):
+        """Close the spool and remove its directory."""
+        self.spool.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_replay_drains_spool(self):
+        """Test a replay pass uploads and removes every result in order."""
+        upload = Mock(return_value=True)
+        replayer = SpoolReplayer(self.spool, upload)
+
+        assert replayer.replay_pending() is True
+
+        assert [c.args[0].run_id for c in upload.call_args_list] == [10, 11]
+        assert self.spool.count() == 0
+
+    def test_replay_stops_at_first_failure(self):
+        """Test a failed upload ends the pass and keeps the results."""
+        upload = Mock(side_effect=Exception('unreachable'))
+        replayer = SpoolReplayer(self.spool, upload)
+
+        assert replayer.replay_pending() is False
+
+        assert upload.call_count == 1
+        assert [e.attempts for e in self.spool.peek()] == [1, 0]
+
+    def test_rejected_result_dead_lettered_and_pass_continues(self):
+        """Test a result the server rejects no longer blocks the spool."""
+        upload = Mock(side_effect=[ResultRejectedError(422, 'invalid'), True])
+        replayer = SpoolReplayer(self.spool, upload)
+
+        assert replayer.replay_pending() is True
+
+        assert [c.args[0].run_id for c in upload.call_args_list] == [10, 11]
+        assert self.spool.count() == 0
+        assert self.spool.dead_letter_count() == 1
+
+    def test_result_dead_lettered_after_max_attempts(self):
+        """Test a result failing max_attempts times stops being replayed."""
+        upload = Mock(return_value=False)
+        replayer = SpoolReplayer(self.spool, upload, max_attempts=2)
+
+        assert replayer.replay_pending() is False
+        assert replayer.replay_pending() is False
+
+        assert [e.run_id for e in self.spool.peek()] == [11]
+        assert self.spool.dead_letter_count() == 1
+
+    def test_thread_backs_off_and_wake_retries(self):
+        """Test the thread retries after a failure and wake() replays at once."""
+        upload = Mock(side_effect=[False, True, True])
+        replayer = SpoolReplayer(self.spool, upload, initial_delay=60,
+                                 poll_interval=60)
+        replayer.start()
+        try:
+            deadline = time.monotonic() + 2
+            while upload.call_count < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert self.spool.count() == 2
+
+            replayer.wake()
+
+            deadline = time.monotonic() + 2
+            while self.spool.count() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert self.spool.count() == 0
+        finally:
+            replayer.stop()
@@ -0,0 +1,83 @@
+"""Tests for streaming flow results while a run executes."""
+
+from unittest.mock import Mock
+
+from keycase_agent.result_stream import ResultStreamer
+from keycase_agent.result_uploader import (
+    UPLOAD_CLOSE_RUN,
+    UPLOAD_FLOW_RESULTS,
+    UploadJob,
+)
+
+
+class TestResultStreamer:
+    """Test suite for ResultStreamer."""
+
+    def setup_method(self):
+        """Create a streamer on a mock uploader."""
+        self.uploader = Mock()
+        self.on_give_up = Mock()
+        self.streamer = ResultStreamer(self.uploader, self.on_give_up, chunk_size=2)
+
+    def _submitted(self):
+        """Get (kind, result) of every submitted job."""
+        calls = self.uploader.submit.call_args_list
+        return [(c.kwargs['kind'], c.args[2]) for c in calls]
+
+    def _job(self, sequence):
+        result = {'runId': 10, 'sequence': sequence}
+        return UploadJob(1, 10, result, kind=UPLOAD_FLOW_RESULTS)
+
+    def test_chunks_sent_as_flows_complete(self):
+        """Test a chunk is submitted each time chunk_size results are added."""
+        for flow_id in range(1, 4):
+            self.streamer.add_flow_result(1, 10, {'id': flow_id})
+
+        assert self._submitted() == [
+            (UPLOAD_FLOW_RESULTS, {'runId': 10, 'sequence': 0,
+                                   'flowResults': [{'id': 1}, {'id': 2}]}),
+        ]
+
+    def test_run_closed_after_all_chunks_uploaded(self):
+        """Test the summary is sent only once every chunk was accepted."""
+        for flow_id in range(1, 4):
+            self.streamer.add_flow_result(1, 10, {'id': flow_id})
+        summary = {'runId': 10, 'flowResultCount': 3}
+
+        self.streamer.finish(1, 10, summary)
+        assert [kind for kind, _ in self._submitted()] == [UPLOAD_FLOW_RESULTS] * 2
+
+        self.streamer.chunk_uploaded(self._job(0))
+        self.streamer.chunk_uploaded(self._job(1))
+
+        assert self._submitted()[-1] == (UPLOAD_CLOSE_RUN, summary)
+        assert self.streamer.open_run_count() == 0
+
+    def test_run_without_flows_closed_at_once(self):
+        """Test a run with no flow results is closed when it finishes."""
+        self.streamer.finish(1, 10, {'runId': 10, 'flowResultCount': 0})
+
+        assert self._submitted() == [
+            (UPLOAD_CLOSE_RUN, {'runId': 10, 'flowResultCount': 0})
+        ]
+
+    def test_summary_spooled_after_given_up_chunk(self):
+        """Test the summary follows a spooled chunk into the spool."""
+        self.streamer.add_flow_result(1, 10, {'id': 1})
+        self.streamer.add_flow_result(1, 10, {'id': 2})
+        summary = {'runId': 10, 'flowResultCount': 2}
+        self.streamer.finish(1, 10, summary)
+
+        self.streamer.chunk_given_up(self._job(0))
+
+        assert [kind for kind, _ in self._submitted()] == [UPLOAD_FLOW_RESULTS]
+        job, reason = self.on_give_up.call_args[0]
+        assert (job.kind, job.result) == (UPLOAD_CLOSE_RUN, summary)
+        assert self.streamer.open_run_count() == 0
+
+    def test_chunk_of_closed_run_ignored(self):
+        """Test a chunk reported for an unknown run changes nothing."""
+        self.streamer.chunk_uploaded(self._job(0))
+
+        self.uploader.submit.assert_not_called()
+        assert self.streamer.open_run_count() == 0
@@ -0,0 +1,104 @@
+"""Tests for the background result uploader."""
+
+import threading
+import time
+from unittest.mock import Mock
+
+from keycase_agent.exceptions import ResultRejectedError
+from keycase_agent.result_uploader import ResultUploader
+
+
+class TestResultUploader:
+    """Test suite for ResultUploader."""
+
+    def setup_method(self):
+        """Record uploads and given-up jobs."""
+        self.given_up = []
+
+    def _uploader(self, upload, **kwargs):
+        kwargs.setdefault('initial_retry_delay', 0.01)
+        return ResultUploader(
+            upload, lambda job, reason: self.given_up.append((job.run_id, reason)),
+            **kwargs
+        )
+
+    def test_submit_returns_before_upload_finishes(self):
+        """Test submit() does not wait for a slow server."""
+        release = threading.Event()
+        uploader = self._uploader(lambda job: release.wait(5))
+
+        start = time.monotonic()
+        uploader.submit(1, 10, {})
+        assert time.monotonic() - start < 0.5
+        assert uploader.pending_count() == 1
+
+        release.set()
+        assert uploader.wait_idle(timeout=2)
+        uploader.stop()
+
+    def test_failed_upload_is_retried(self):
+        """Test a failed attempt is retried until it succeeds."""
+        upload = Mock(side_effect=[False, Exception('timeout'), True])
+        uploader = self._uploader(upload)
+
+        uploader.submit(1, 10, {'status': 'PASSED'})
+
+        assert uploader.wait_idle(timeout=2)
+        assert upload.call_count == 3
+        assert upload.call_args.args[0].attempts == 3
+        assert self.given_up == []
+        uploader.stop()
+
+    def test_gives_up_after_max_attempts(self):
+        """Test a result is handed to on_give_up after the last attempt."""
+        upload = Mock(return_value=False)
+        uploader = self._uploader(upload, max_attempts=2)
+
+        uploader.submit(1, 10, {})
+
+        assert uploader.wait_idle(timeout=2)
+        assert upload.call_count == 2
+        assert self.given_up == [(10, 'All 2 upload attempts failed')]
+        uploader.stop()
+
+    def test_rejected_result_given_up_without_retry(self):
+        """Test a result the server rejects is not retried."""
+        upload = Mock(side_effect=ResultRejectedError(400, 'bad request'))
+        uploader = self._uploader(upload)
+
+        uploader.submit(1, 10, {})
+
+        assert uploader.wait_idle(timeout=2)
+        assert upload.call_count == 1
+        assert self.given_up == [
+            (10, 'Result rejected with status 400: bad request')
+        ]
+        uploader.stop()
+
+    def test_retry_does_not_block_other_results(self):
+        """Test a result waiting for a retry lets later results through."""
+        uploaded = []
+
+        def upload(job):
+            uploaded.append(job.run_id)
+            return job.run_id != 10
+
+        uploader = self._uploader(upload, workers=1, initial_retry_delay=60)
+        uploader.submit(1, 10, {})
+        uploader.submit(1, 11, {})
+
+        deadline = time.monotonic() + 2
+        while 11 not in uploaded and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert uploaded == [10, 11]
+        assert uploader.pending_count() == 1
+
+        uploader.stop(timeout=1)
+        assert self.given_up == [(10, 'Agent shutting down')]
+
+    def test_retry_delay_grows_and_is_capped(self):
+        """Test the retry schedule backs off exponentially up to the cap."""
+        uploader = self._uploader(Mock(), initial_retry_delay=2,
+                                  retry_backoff=2, max_retry_delay=10)
+
+        assert [uploader._retry_delay(n) for n in range(1, 6)] == [2, 4, 8, 10, 10]
@@ -0,0 +1,60 @@
+"""Tests for AgentStateTracker slot management."""
+
+from keycase_agent.state_tracker import AgentStateTracker
+
+
+class TestAgentStateTracker:
+    """Test suite for capacity-based agent state."""
+
+    def test_single_slot_matches_busy_flag(self):
+        """Test the default single slot behaves like the busy flag."""
+        tracker = AgentStateTracker()
+
+        assert tracker.try_acquire_slot(1)
+        assert tracker.is_busy()
+        assert not tracker.try_acquire_slot(2)
+
+        assert tracker.release_slot(1) == "AVAILABLE"
+        assert not tracker.is_busy()
+
+    def test_multiple_slots(self):
+        """Test runs are accepted until every slot is taken."""
+        tracker = AgentStateTracker(max_slots=2)
+
+        assert tracker.try_acquire_slot(1)
+        assert not tracker.is_busy()
+        assert tracker.available_slots() == 1
+        assert tracker.try_acquire_slot(2)
+        assert not tracker.try_acquire_slot(3)
+        assert sorted(tracker.active_runs()) == [1, 2]
+
+        assert tracker.get_capacity() == {
+            "status": "BUSY", "maxSlots": 2, "availableSlots": 0
+        }
+
+    def test_same_run_cannot_take_two_slots(self):
+        """Test a run already holding a slot is rejected."""
+        tracker = AgentStateTracker(max_slots=2)
+
+        assert tracker.try_acquire_slot("run-1")
+        assert not tracker.try_acquire_slot("run-1")
+
+    def test_release_is_idempotent(self):
+        """Test releasing an unknown or already released run is a no-op."""
+        tracker = AgentStateTracker(max_slots=2)
+        tracker.try_acquire_slot(1)
+
+        tracker.release_slot(1)
+        tracker.release_slot(1)
+        tracker.release_slot(99)
+
+        assert tracker.available_slots() == 2
+
+    def test_set_busy_false_releases_all_slots(self):
+        """Test the legacy set_busy(False) frees every slot."""
+        tracker = AgentStateTracker(max_slots=2)
+        tracker.try_acquire_slot(1)
+        tracker.try_acquire_slot(2)
+
+        assert tracker.set_busy(False) == "AVAILABLE"
+        assert tracker.active_runs() == []
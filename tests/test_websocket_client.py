@@ -8,7 +8,11 @@ import threading
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
 
-from keycase_agent.websocket_client import WebSocketClient, ConnectionState
+from keycase_agent.websocket_client import (
+    ConnectionState,
+    PendingMessageQueue,
+    WebSocketClient,
+)
 
 
 class TestWebSocketClient:
@@ -201,7 +205,8 @@ class TestWebSocketClient:
         result = self.client.send_json(data)
         
         assert result is True
-        mock_ws.send.assert_called_once_with(json.dumps(data))
+        mock_ws.send.assert_called_once()
+        assert json.loads(mock_ws.send.call_args[0][0]) == data
 
     def test_is_connected_true(self):
         """Test is_connected returns True when connected."""
@@ -400,4 +405,281 @@ class TestWebSocketClient:
         assert small_client.send("msg3") is False  # Should be dropped
         
         # Verify only 2 messages are queued
-        assert small_client.pending_messages.qsize() == 2
\ No newline at end of file
+        assert small_client.pending_messages.qsize() == 2
+
+    def _connect(self):
+        mock_ws = Mock()
+        mock_ws.sock.connected = True
+        self.client.ws = mock_ws
+        self.client.state = ConnectionState.CONNECTED
+        return mock_ws
+
+    def test_send_keeps_order_behind_queued_messages(self):
+        """Test a send while messages are queued replays them first."""
+        self.client.send("queued")
+        mock_ws = self._connect()
+
+        assert self.client.send("new") is True
+
+        assert [call.args[0] for call in mock_ws.send.call_args_list] == [
+            "queued", "new"
+        ]
+        assert self.client.pending_messages.empty()
+
+    def test_failed_send_is_queued(self):
+        """Test a message whose send fails is kept for the next connection."""
+        mock_ws = self._connect()
+        mock_ws.send.side_effect = OSError("broken pipe")
+
+        assert self.client.send("message") is False
+
+        assert self.client.pending_messages.get() == "message"
+
+    def test_failed_replay_keeps_message_first(self):
+        """Test replay stops at a failed message and keeps it at the front."""
+        self.client.pending_messages.put("message1")
+        self.client.pending_messages.put("message2")
+        mock_ws = self._connect()
+        mock_ws.send.side_effect = [None, OSError("broken pipe")]
+
+        self.client._process_queued_messages()
+
+        assert self.client.pending_messages.get() == "message2"
+        assert self.client.pending_messages.empty()
+
+    def test_batches_replayed_after_reconnect(self):
+        """Test event batches flushed while disconnected are sent on open."""
+        from keycase_agent.utils.event_sender import EventSender
+
+        sender = EventSender(self.client, flush_interval=60.0)
+        sender.send_event("custom", {"i": 0})
+        sender.flush()
+        sender.send_event("custom", {"i": 1})
+        sender.flush()
+        assert self.client.pending_messages.qsize() == 2
+
+        mock_ws = Mock()
+        mock_ws.sock.connected = True
+        self.client.ws = mock_ws
+        self.client._on_open_wrapper(mock_ws)
+
+        frames = [json.loads(call.args[0]) for call in mock_ws.send.call_args_list]
+        assert [f["events"][0]["payload"]["i"] for f in frames] == [0, 1]
+        self.on_open.assert_called_once_with(mock_ws)
+
+    def test_auth_sent_before_queued_messages(self):
+        """Test messages sent by on_open go out before the queue is replayed."""
+        self.client.send('queued-1')
+        self.client.send('queued-2', priority=True)
+
+        mock_ws = Mock()
+        mock_ws.sock.connected = True
+        self.client.ws = mock_ws
+        self.on_open.side_effect = lambda ws: self.client.send('auth', priority=True)
+        self.client._on_open_wrapper(mock_ws)
+
+        sent = [call.args[0] for call in mock_ws.send.call_args_list]
+        assert sent == ['auth', 'queued-2', 'queued-1']
+
+    def test_other_threads_wait_for_on_open(self):
+        """Test messages from other threads are queued while on_open runs."""
+        mock_ws = Mock()
+        mock_ws.sock.connected = True
+        self.client.ws = mock_ws
+
+        def on_open(ws):
+            other = threading.Thread(target=self.client.send, args=('progress',))
+            other.start()
+            other.join()
+            self.client.send('auth', priority=True)
+
+        self.on_open.side_effect = on_open
+        self.client._on_open_wrapper(mock_ws)
+
+        sent = [call.args[0] for call in mock_ws.send.call_args_list]
+        assert sent == ['auth', 'progress']
+
+
+class TestPendingMessageQueue:
+    """Test suite for the two-lane pending message queue."""
+
+    def test_priority_messages_jump_ahead(self):
+        """Test a priority message is delivered before a large backlog."""
+        pending = PendingMessageQueue(maxsize=10000)
+        for i in range(5000):
+            pending.put(f"progress{i}")
+
+        pending.put("completed", priority=True)
+        pending.put("stop", priority=True)
+
+        assert pending.get_nowait() == "completed"
+        assert pending.get_nowait() == "stop"
+        assert pending.get_nowait() == "progress0"
+        assert pending.qsize() == 4999
+
+    def test_full_queue_drops_normal_message(self):
+        """Test a normal message is dropped when the queue is full."""
+        pending = PendingMessageQueue(maxsize=2)
+        pending.put("a")
+        pending.put("b")
+
+        assert pending.put("c") is False
+
+        assert [pending.get(), pending.get()] == ["a", "b"]
+        assert pending.dropped == 1
+
+    def test_full_queue_priority_evicts_oldest_normal(self):
+        """Test a priority message replaces the oldest normal message."""
+        pending = PendingMessageQueue(maxsize=2)
+        pending.put("a")
+        pending.put("b")
+
+        assert pending.put("auth", priority=True) is True
+
+        assert [pending.get(), pending.get()] == ["auth", "b"]
+        assert pending.qsize() == 0
+        assert pending.dropped == 1
+
+    def test_priority_dropped_when_only_priority_queued(self):
+        """Test the bound holds when the queue is all priority messages."""
+        pending = PendingMessageQueue(maxsize=1)
+        pending.put("auth", priority=True)
+
+        assert pending.put("stop", priority=True) is False
+        assert pending.put_front("retry") is False
+        assert pending.qsize() == 1
+
+    def test_put_front_precedes_priority_lane(self):
+        """Test a message put back after a failed send is delivered first."""
+        pending = PendingMessageQueue()
+        pending.put("normal")
+        pending.put("priority", priority=True)
+
+        pending.put_front("retry")
+
+        assert [pending.get(), pending.get(), pending.get()] == [
+            "retry", "priority", "normal"
+        ]
+        with pytest.raises(queue.Empty):
+            pending.get_nowait()
+
+    def test_concurrent_producers_respect_bound(self):
+        """Test concurrent puts never exceed maxsize."""
+        pending = PendingMessageQueue(maxsize=100)
+
+        def produce(priority):
+            for i in range(500):
+                pending.put(str(i), priority=priority)
+
+        threads = [threading.Thread(target=produce, args=(i % 2 == 0,))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert pending.qsize() == 100
+
+
+class TestCompression:
+    """Test suite for deflate compression of outgoing messages."""
+
+    def _client(self, compression):
+        client = WebSocketClient("ws://test", Mock(), Mock(), Mock(), Mock(),
+                                 compression=compression)
+        client.ws = Mock()
+        client.ws.sock.connected = True
+        client.state = ConnectionState.CONNECTED
+        return client
+
+    def test_large_message_sent_as_compressed_binary(self):
+        """Test a large message is sent as a zlib-compressed binary frame."""
+        import websocket
+        import zlib
+
+        client = self._client("deflate")
+        client.confirm_compression("deflate")
+        data = json.dumps({"events": [{"status": "RUNNING"}] * 200})
+
+        assert client.send(data) is True
+
+        args, kwargs = client.ws.send.call_args
+        assert kwargs == {"opcode": websocket.ABNF.OPCODE_BINARY}
+        assert zlib.decompress(args[0]).decode("utf-8") == data
+        assert len(args[0]) < len(data)
+        stats = client.get_connection_stats()
+        assert stats["bytes_before_compression"] == len(data)
+        assert stats["bytes_after_compression"] == len(args[0])
+
+    def test_small_message_stays_text(self):
+        """Test messages below the threshold are not compressed."""
+        client = self._client("deflate")
+        client.confirm_compression("deflate")
+
+        client.send("ping")
+
+        client.ws.send.assert_called_once_with("ping")
+
+    def test_compression_off_by_default(self):
+        """Test large messages are sent as text without compression."""
+        client = self._client("off")
+        data = "x" * 5000
+
+        client.send(data)
+
+        client.ws.send.assert_called_once_with(data)
+
+    def test_queued_message_compressed_when_replayed(self):
+        """Test messages are queued as text and compressed when sent."""
+        client = self._client("deflate")
+        client.state = ConnectionState.DISCONNECTED
+        client.send("x" * 5000)
+        assert client.pending_messages.qsize() == 1
+
+        client.state = ConnectionState.CONNECTED
+        client.confirm_compression("deflate")
+        client.send("ping")
+
+        sent = [call.args[0] for call in client.ws.send.call_args_list]
+        assert isinstance(sent[0], bytes)
+        assert sent[1] == "ping"
+
+    def test_not_compressed_until_server_confirms(self):
+        """Test deflate is only used once the server accepted it."""
+        client = self._client("deflate")
+        data = "x" * 5000
+
+        client.send(data)
+        client.confirm_compression(None)
+        client.send(data)
+
+        assert [c.args[0] for c in client.ws.send.call_args_list] == [data, data]
+        assert client.get_connection_stats()["compression_active"] is False
+
+    def test_large_priority_messages_compressed(self):
+        """Test priority messages, such as status responses, are compressed."""
+        import zlib
+
+        client = self._client("deflate")
+        client.confirm_compression("deflate")
+        data = "x" * 5000
+
+        client.send(data, priority=True)
+
+        sent = client.ws.send.call_args[0][0]
+        assert zlib.decompress(sent).decode("utf-8") == data
+
+    def test_new_connection_renegotiates_compression(self):
+        """Test compression is off again after reconnecting until confirmed."""
+        client = self._client("deflate")
+        client.confirm_compression("deflate")
+
+        client._on_open_wrapper(client.ws)
+
+        assert client.compression_active is False
+
+    def test_unknown_compression_rejected(self):
+        """Test an unknown compression mode is rejected."""
+        with pytest.raises(ValueError, match="compression"):
+            WebSocketClient("ws://test", Mock(), Mock(), Mock(), Mock(),
+                            compression="brotli")